@@ -0,0 +1,65 @@
+"""
+Сравнивает скорость движков извлечения форм (см. src/extractor/extractor.py).
+
+Страница генерируется: FILLER блоков разметки без форм, между которыми
+расставлены формы с несколькими полями, и скрипт в начале страницы.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_extract [--forms N] [--filler N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from src.extractor.extractor import ENGINES, extract_forms
+
+FORM = (
+    '<form action="/f{i}" method="post" id="f{i}">'
+    '<input name="user{i}" required><input type="password" name="pass{i}">'
+    '<textarea name="note{i}">text</textarea><input type="submit"></form>'
+)
+FILLER = (
+    '<div class="row"><p>Lorem ipsum <a href="/x">dolor</a> sit amet</p>'
+    "<ul><li>one</li><li>two</li></ul></div>"
+)
+
+
+def build_page(forms: int, filler: int) -> str:
+    """Возвращает страницу с forms формами среди filler блоков разметки."""
+    step = max(filler // max(forms, 1), 1)
+    parts = ["<html><head><script>var x = 1;</script></head><body>"]
+    for i in range(filler):
+        parts.append(FILLER)
+        if i % step == 0 and i // step < forms:
+            parts.append(FORM.format(i=i // step))
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def measure(page: str, engine: str, repeat: int) -> float:
+    """Возвращает лучшее время извлечения форм движком engine в секундах."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        extract_forms(page, "https://bench.local/", engine=engine)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--forms", type=int, default=200)
+    parser.add_argument("--filler", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    page = build_page(args.forms, args.filler)
+    print(f"page: {len(page) / 1024:.0f} KiB, forms: {args.forms}")
+    timings = {engine: measure(page, engine, args.repeat) for engine in ENGINES}
+    slowest = max(timings.values())
+    for engine, seconds in timings.items():
+        print(f"{engine:>5}: {seconds * 1000:8.1f} ms  x{slowest / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
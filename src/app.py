@@ -3,7 +3,10 @@
 
 Эндпоинты:
     /api/parse – парсинг форм с целевого URL.
-    /api/scan  – сканирование целевого URL на уязвимости.
+    /api/scan  – сканирование целевого URL на уязвимости; необязательные
+                 параметры types, match и severity ограничивают набор payloads
+                 (например, ?types=SQLI&severity=HIGH); параметр incremental
+                 (1/0) включает повторный скан только изменившихся форм.
 """
 
 import sys
@@ -12,16 +15,44 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import json
+import asyncio
 import requests
+from functools import partial
+from typing import Callable, Optional, Sequence
 from flask import Flask, request, jsonify
 
-from src.extractor.extractor import extract_forms, fetch_html
-from src.extractor.auth import try_login_dvwa, try_login_bwapp
-from src.storage.db import init_db, save_scan
-from src.scanner.scanner import scan_forms
-from src.scanner.types import load_payloads, Payload
+from src.extractor.extractor import load_forms
+from src.extractor.auth_cache import AUTH_CACHE
+from src.storage.db import (
+    init_db,
+    save_scan,
+    save_scan_forms,
+    get_latest_scan_forms,
+)
+from src.net.sessions import SESSION_POOL
+from src.scanner.scanner import scan_forms, scan_forms_async
+from src.scanner.context import ScanContext
+from src.scanner.session_guard import AuthGuard
+from src.scanner.incremental import (
+    fingerprint_forms,
+    form_results,
+    payloads_digest,
+    split_forms,
+)
+from src.scanner.types import (
+    Payload,
+    PayloadSet,
+    load_payload_set,
+    parse_payload_filter,
+)
 from src.ml.aggregator import prepare_and_cluster
-from src.config import RATE_LIMIT, PAYLOADS_PATH, DEFAULT_HEADER
+from src.config import (
+    RATE_LIMIT,
+    PAYLOADS_PATH,
+    DEFAULT_HEADER,
+    SCAN_BACKEND,
+    INCREMENTAL_SCAN,
+)
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -31,14 +62,17 @@ app = Flask(__name__)
 ERROR_MISSING_URL = "Missing 'url' parameter"
 ERROR_SCANNER_NOT_INIT = "Scanner not initialized"
 ERROR_FETCH_FAILED = "fetch_failed"
+ERROR_BAD_FILTER = "Invalid payload filter"
+# ошибки загрузки страницы (потоковое чтение поднимает и OSError/ValueError)
+FETCH_ERRORS = (requests.RequestException, OSError, ValueError)
 
 try:
-    PAYLOADS: list[Payload] = load_payloads(PAYLOADS_PATH)
+    PAYLOADS: PayloadSet = load_payload_set(PAYLOADS_PATH)
 except Exception as e:
     logger.exception(
         "Failed to load payloads on startup", extra={"path": PAYLOADS_PATH}
     )
-    PAYLOADS = []
+    PAYLOADS = PayloadSet([])
 
 
 def save_scan_results(target: str, results_json: str) -> int:
@@ -48,38 +82,126 @@ def save_scan_results(target: str, results_json: str) -> int:
     return scan_id
 
 
-def prepare_session() -> requests.Session:
-    """Создаёт и настраивает сессию."""
-    session = requests.Session()
-    session.headers.update(DEFAULT_HEADER)
-    return session
+def parse_flag(value: Optional[str], default: bool) -> bool:
+    """Разбирает булев параметр запроса ("1", "true", "yes" — включено)."""
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
 
 
-def attempt_dvwa_login(session: requests.Session, url: str) -> None:
-    """Пытается выполнить автоматический вход в DVWA, логирует ошибки."""
+def load_previous_forms(target: str, digest: str) -> Optional[tuple[int, dict]]:
+    """
+    Возвращает находки форм предыдущего скана цели с тем же набором payloads.
+
+    Ошибка чтения БД не прерывает скан: он выполняется полностью.
+    """
     try:
-        try_login_dvwa(session, url)
-    except Exception:
-        logger.exception("DVWA autologin failed", extra={"url": url})
+        return get_latest_scan_forms(target, digest)
+    except Exception as e:
+        logger.warning(
+            "previous scan forms unavailable", extra={"target": target, "error": str(e)}
+        )
+        return None
+
+
+def save_form_results(
+    scan_id: int,
+    forms: list[dict],
+    findings: list[dict],
+    digest: str,
+    failed: Sequence[str] = (),
+) -> None:
+    """
+    Сохраняет отпечатки, статусы и находки форм скана для инкрементальных
+    сканов; формы с отпечатками из failed сохраняются как проверенные
+    не полностью.
+    """
+    try:
+        save_scan_forms(scan_id, form_results(forms, findings, failed), digest)
+    except Exception as e:
+        logger.warning(
+            "scan forms not saved", extra={"scan_id": scan_id, "error": str(e)}
+        )
+
+
+def prepare_session(url: str) -> requests.Session:
+    """
+    Создаёт сессию для целевого URL.
+
+    Соединения берутся из общего пула процесса (SESSION_POOL), поэтому
+    keep-alive соединения переиспользуются между API-запросами; сессию
+    нужно закрыть, чтобы вернуть их в пул.
+    """
+    return SESSION_POOL.session(url, headers=DEFAULT_HEADER)
+
 
+def prewarm_connections(session: requests.Session, forms: list[dict]) -> None:
+    """Открывает соединения к origin форм до начала перебора payloads."""
+    for action in dict.fromkeys(form.get("action") or "" for form in forms):
+        if action:
+            SESSION_POOL.prewarm(session, action)
 
-def attempt_bwapp_login(session: requests.Session, url: str) -> None:
+
+def attempt_login(session: requests.Session, url: str) -> bool:
+    """
+    Выполняет автоматический вход, если приложение распознано, логирует ошибки.
+
+    Способ входа выбирается по отпечатку цели (см. LOGIN_FLOWS); для
+    нераспознанных целей вход не выполняется.
+    """
     try:
-        try_login_bwapp(session, url)
+        return AUTH_CACHE.authenticate(session, url) is not None
     except Exception:
-        logger.exception("bWAPP autologin failed", extra={"url": url})
+        logger.exception("Autologin failed", extra={"url": url})
+        return False
+
 
+def load_forms_as_dicts(url: str, session: requests.Session) -> list[dict]:
+    """
+    Загружает страницу и возвращает её формы в виде списка словарей.
 
-def extract_forms_from_response(html: str, url: str) -> list[dict]:
-    """Извлекает формы из HTML-ответа и возвращает их в виде списка словарей."""
-    forms = extract_forms(html, url)
+    Формы преобразуются после разбора всей страницы (см. load_forms).
+
+    Исключения:
+        requests.RequestException, OSError, ValueError: страница недоступна.
+    """
+    forms = load_forms(url, session)
     return [f.to_dict() for f in forms]
 
 
-def perform_scan(forms: list[dict], session: requests.Session) -> list[dict]:
-    """Запускает сканирование форм с использованием загруженных полезных нагрузок."""
-    findings = scan_forms(forms, PAYLOADS, RATE_LIMIT, session)
-    return [f.to_dict() for f in findings]
+def perform_scan(
+    forms: list[dict],
+    session: requests.Session,
+    payloads: Sequence[Payload] = PAYLOADS,
+    reauth: Optional[Callable[[], bool]] = None,
+) -> tuple[list[dict], dict]:
+    """
+    Запускает сканирование форм с использованием загруженных полезных нагрузок
+    (или их подмножества payloads).
+
+    Бэкенд выбирается параметром SCAN_BACKEND: "async" выполняет сканирование
+    корутинами в собственном цикле событий, "thread" — пулом потоков (перед
+    этим соединения к origin форм прогреваются). Представление Flask остаётся
+    синхронным: WSGI-сервер всё равно выделяет запросу поток, а цикл событий
+    нужен только асинхронному бэкенду. Сессию закрывает вызывающий код.
+
+    Если передан reauth, истёкшая посреди скана сессия восстанавливается
+    повторным входом (см. src/scanner/session_guard.py).
+
+    Возвращает:
+        Кортеж (находки, сводка скана: счётчики и состояние контроллеров частоты).
+    """
+    context = ScanContext(session=session, rate_limit=RATE_LIMIT)
+    if reauth is not None:
+        context.auth_guard = AuthGuard(reauth)
+    if SCAN_BACKEND == "async":
+        findings = asyncio.run(
+            scan_forms_async(forms, payloads, RATE_LIMIT, session, context=context)
+        )
+    else:
+        prewarm_connections(session, forms)
+        findings = scan_forms(forms, payloads, RATE_LIMIT, session, context=context)
+    return [f.to_dict() for f in findings], context.report()
 
 
 @app.route("/api/scan", methods=["GET"])
@@ -95,25 +217,54 @@ def api_scan():
         logger.error("No payloads loaded")
         return jsonify({"error": ERROR_SCANNER_NOT_INIT}), 500
 
-    session = prepare_session()
-    if not attempt_dvwa_login(session, url):
-        attempt_bwapp_login(session, url)
-
     try:
-        html = fetch_html(url, session)
-    except requests.RequestException as e:
-        return jsonify({"error": ERROR_FETCH_FAILED, "reason": str(e)}), 400
-
-    forms = extract_forms_from_response(html, url)
-    findings = perform_scan(forms, session)
+        payload_filter = parse_payload_filter(
+            request.args.get("types"),
+            request.args.get("match"),
+            request.args.get("severity"),
+        )
+    except ValueError as e:
+        return jsonify({"error": ERROR_BAD_FILTER, "reason": str(e)}), 400
+    payloads = PAYLOADS.select(**payload_filter)
+    incremental = parse_flag(request.args.get("incremental"), INCREMENTAL_SCAN)
+    digest = payloads_digest(payloads)
+
+    with prepare_session(url) as session:
+        reauth = None
+        if attempt_login(session, url):
+            reauth = partial(AUTH_CACHE.reauthenticate, session, url)
+
+        try:
+            forms = load_forms_as_dicts(url, session)
+        except FETCH_ERRORS as e:
+            return jsonify({"error": ERROR_FETCH_FAILED, "reason": str(e)}), 400
+
+        fingerprint_forms(forms)
+        to_scan, reused = forms, []
+        previous = load_previous_forms(url, digest) if incremental else None
+        if previous is not None:
+            previous_scan_id, previous_forms = previous
+            to_scan, reused = split_forms(forms, previous_forms, previous_scan_id)
+        findings, scan_stats = perform_scan(to_scan, session, payloads, reauth)
+    findings = findings + reused
     aggregated_findings = prepare_and_cluster(findings)
 
     result_data = {
         "findings": findings,
         "findings_count": len(findings),
         "aggregated_findings": aggregated_findings,
+        "scan_stats": scan_stats,
     }
-    save_scan_results(target=url, results_json=json.dumps(result_data))
+    if incremental:
+        result_data["incremental"] = {
+            "previous_scan_id": previous[0] if previous is not None else None,
+            "forms_scanned": len(to_scan),
+            "forms_reused": len(forms) - len(to_scan),
+        }
+    scan_id = save_scan_results(target=url, results_json=json.dumps(result_data))
+    save_form_results(
+        scan_id, forms, findings, digest, scan_stats.get("failed_forms", [])
+    )
 
     return jsonify(result_data), 200
 
@@ -127,16 +278,13 @@ def api_parse():
         logger.warning("Missing url parameter")
         return jsonify({"error": ERROR_MISSING_URL}), 400
 
-    session = prepare_session()
-    if not attempt_dvwa_login(session, url):
-        attempt_bwapp_login(session, url)
-
-    try:
-        html = fetch_html(url, session)
-    except requests.RequestException as e:
-        return jsonify({"error": ERROR_FETCH_FAILED, "reason": str(e)}), 400
+    with prepare_session(url) as session:
+        attempt_login(session, url)
 
-    forms = extract_forms_from_response(html, url)
+        try:
+            forms = load_forms_as_dicts(url, session)
+        except FETCH_ERRORS as e:
+            return jsonify({"error": ERROR_FETCH_FAILED, "reason": str(e)}), 400
 
     result_data = {
         "forms": forms,
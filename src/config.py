@@ -5,11 +5,163 @@
 # HTTP / scanner
 REQUEST_TIMEOUT = 8
 TIME_DELAY_THRESHOLD_MS = 2000
+# минимальный интервал между запросами в секундах (0 — без ограничения сверху)
 RATE_LIMIT = 0.0
+# максимальное число одновременных запросов сканера (1 — последовательный режим)
+SCAN_MAX_WORKERS = 8
+# бэкенд сканирования для API: "thread" (пул потоков) или "async" (asyncio/aiohttp)
+SCAN_BACKEND = "thread"
+# движок извлечения форм (src/extractor/extractor.py): "bs4" (BeautifulSoup
+# с html.parser), "lxml" (один обход дерева libxml2, быстрее на больших
+# страницах) или "stream" (потоковый парсер без дерева документа,
+# src/extractor/streaming.py)
+EXTRACT_ENGINE = "bs4"
+# максимальное число запросов в полёте для асинхронного бэкенда
+SCAN_MAX_IN_FLIGHT = 64
+# отдельная полоса для TIME_BASED payloads: столько из них выполняется
+# одновременно, не занимая места быстрых запросов (0 — без отдельной полосы)
+SCAN_TIMED_LANE = 16
+# декодирование тел ответов без charset (src/net/decoding.py): кодировка
+# определяется по первым DECODE_SNIFF_BYTES байтам один раз на адрес; кэш
+# кодировок хранит не больше DECODE_CACHE_MAX_ENTRIES адресов (и origin),
+# давно не использованные вытесняются
+DECODE_SNIFF_BYTES = 65536
+DECODE_CACHE_MAX_ENTRIES = 1024
+DECODE_FALLBACK_ENCODING = "utf-8"
+# потоковое чтение ответов сканера (src/scanner/streaming.py): тело читается
+# частями по STREAM_CHUNK_SIZE байт и не больше RESPONSE_MAX_BYTES байт, ответы
+# на payloads проверяются детекторами по мере чтения
+STREAM_RESPONSES = True
+RESPONSE_MAX_BYTES = 2 * 1024 * 1024
+STREAM_CHUNK_SIZE = 65536
+# перекрытие соседних частей в символах (не меньше самой длинной сигнатуры):
+# сигнатура SQL-ошибки с ".*" на границе частей находится, если укладывается в него
+STREAM_OVERLAP = 1024
 DEFAULT_HEADER = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:147.0 Gecko/20100101 Firefox/147.0"
 }
 
+# адаптивное ограничение частоты запросов (AIMD) для каждого origin.
+# Включено по умолчанию, что меняет прежнее поведение: скан без ограничения
+# (RATE_LIMIT = 0) теперь начинается с RATE_INITIAL_RPS запросов в секунду на
+# origin и разгоняется до RATE_MAX_RPS, пока сервер отвечает без перегрузки.
+# RATE_ADAPTIVE = False возвращает фиксированную паузу RATE_LIMIT между запросами
+RATE_ADAPTIVE = True
+RATE_INITIAL_RPS = 10.0
+RATE_MIN_RPS = 0.5
+RATE_MAX_RPS = 200.0
+RATE_INCREASE_STEP = 0.5
+RATE_DECREASE_FACTOR = 0.5
+RATE_LATENCY_SPIKE_FACTOR = 3.0
+RATE_MAX_RETRY_AFTER = 60.0
+
+# досрочная остановка: после EARLY_EXIT_MAX_CONFIRMED подтверждённых находок
+# уровня не ниже EARLY_EXIT_MIN_SEVERITY по паре (поле, VulnType) оставшиеся
+# payloads этого типа не отправляются (0 — политика выключена)
+EARLY_EXIT_MAX_CONFIRMED = 1
+EARLY_EXIT_MIN_SEVERITY = "HIGH"
+# останавливать тип уязвимости сразу после находки уровня CRITICAL
+EARLY_EXIT_ON_CRITICAL = True
+
+# пробные запросы перед перебором payloads: поле, ответ на которое не меняется
+# и не отражает пробное значение, считается нечувствительным
+PROBE_FIELDS = True
+# действие для нечувствительных полей: "reduce" — только PROBE_REDUCED_MATCH_TYPES,
+# "skip" — поле не сканируется. Сокращённый набор сохраняет все способы
+# срабатывания SQLi: слепая инъекция (BOOLEAN, UNION) не меняет ответ на
+# безобидную пробу, поэтому «нечувствительное» поле может быть уязвимо
+PROBE_INSENSITIVE_ACTION = "reduce"
+PROBE_REDUCED_MATCH_TYPES = ("BOOLEAN", "UNION", "TIME_BASED", "ERROR_BASED")
+# канареечный этап XSS: payloads XSS отправляются только в поля, где отражается
+# уникальный маркер, и только подходящие к контексту отражения
+XSS_CANARY = True
+# групповое тестирование: один payload отправляется сразу в группу до
+# GROUP_TEST_SIZE полей формы; сработавшая группа делится пополам до отдельных
+# полей. TIME_BASED payloads всегда отправляются в поля по одному
+GROUP_TESTING = False
+GROUP_TEST_SIZE = 8
+# повторные запросы в пределах скана (src/scanner/memo.py): одинаковые формы
+# объединяются до скана, а ответы на одинаковые отправки (кроме TIME_BASED)
+# берутся из кэша на REQUEST_MEMO_MAX_ENTRIES ответов
+COLLAPSE_DUPLICATE_FORMS = True
+REQUEST_MEMO = True
+REQUEST_MEMO_MAX_ENTRIES = 256
+# инкрементальный повторный скан (src/scanner/incremental.py): payloads
+# отправляются только в новые и изменившиеся формы, находки остальных
+# переносятся из последнего скана цели с тем же набором payloads
+INCREMENTAL_SCAN = False
+
+# anti-CSRF токены: скрытые поля, имя которых соответствует CSRF_FIELD_PATTERN,
+# получают свежий токен для каждого запроса; CSRF_POOL_SIZE токенов страницы
+# формы запрашиваются заранее в CSRF_PREFETCH_WORKERS потоков (0 — токен
+# запрашивается перед каждой отправкой). Ответ с CSRF_REJECTION_MARKERS
+# повторяется не более CSRF_MAX_RETRIES раз с последовательным получением токена
+# (общим для всех форм origin — токен сессионный); отклонённый и после повторов
+# запрос считается невыполненным, а форма — проверенной не полностью
+CSRF_TOKENS = True
+CSRF_FIELD_PATTERN = r"csrf|xsrf|token|nonce|authenticity"
+CSRF_POOL_SIZE = 8
+CSRF_PREFETCH_WORKERS = 4
+CSRF_MAX_RETRIES = 1
+CSRF_REJECTION_MARKERS = (
+    "csrf token is incorrect",
+    "invalid csrf",
+    "csrf token mismatch",
+    "csrf verification failed",
+)
+
+# общий пул соединений по origin (src/net/sessions.py): размер пула на origin
+# соответствует параллельности сканера вместе с потоками предварительного
+# получения CSRF-токенов (они используют тот же адаптер); простаивающие пулы
+# закрываются
+SESSION_POOL_MAXSIZE = SCAN_MAX_WORKERS + SCAN_TIMED_LANE + CSRF_PREFETCH_WORKERS
+SESSION_IDLE_TIMEOUT = 300.0
+# число соединений, открываемых до перебора payloads (0 — без прогрева)
+SESSION_PREWARM_CONNECTIONS = SCAN_MAX_WORKERS
+
+# evidence-паттерны payloads: учитываются только для этих способов срабатывания
+# и только паттерны не короче EVIDENCE_MIN_PATTERN_LEN символов
+EVIDENCE_MATCH_TYPES = ("BOOLEAN", "UNION", "ERROR_BASED")
+EVIDENCE_MIN_PATTERN_LEN = 4
+# общие слова из evidence-паттернов: встречаются на обычных страницах, поэтому
+# сами по себе уязвимость не подтверждают — находка требует хотя бы одного
+# нового специфичного паттерна (сигнатуры СУБД, вывода команд и т.п.)
+EVIDENCE_GENERIC_PATTERNS = (
+    "admin",
+    "authentication",
+    "bypass",
+    "columns",
+    "conditional",
+    "dynamic",
+    "error",
+    "exists",
+    "false",
+    "floor",
+    "logged in",
+    "password",
+    "schema",
+    "success",
+    "true",
+    "user",
+    "users",
+    "version",
+    "write",
+)
+
+# подтверждение TIME_BASED: ответ медленный, если он дольше медианы задержек
+# формы на max(TIME_DELAY_THRESHOLD_MS, TIMING_MAD_K * MAD); подозрение
+# проверяется последовательным тестом (SPRT) с ошибками ALPHA/BETA
+TIMING_CONFIRM = True
+TIMING_WINDOW_SIZE = 50
+TIMING_MIN_SAMPLES = 3
+TIMING_MAD_K = 3.0
+TIMING_SPRT_ALPHA = 0.01
+TIMING_SPRT_BETA = 0.01
+# вероятность медленного ответа без уязвимости (P0) и при ней (P1)
+TIMING_SPRT_P0 = 0.05
+TIMING_SPRT_P1 = 0.95
+TIMING_MAX_EXTRA_REQUESTS = 3
+
 # data
 SQL_ERRORS_PATH = "data/sql_errors.json"
 PAYLOADS_PATH = "data/payloads.json"
@@ -19,7 +171,24 @@ DEFAULT_DB_PATH = "data/data.db"
 LOG_LEVEL = "INFO"
 
 # authentication
+# кэш входа по origin и учётным данным (src/extractor/auth_cache.py): время
+# жизни сессии, интервал проверки через verify_login_success и время, на которое
+# запоминается неудачный вход (все значения в секундах)
+AUTH_SESSION_TTL = 1800.0
+AUTH_VERIFY_INTERVAL = 60.0
+AUTH_FAILURE_TTL = 300.0
+# отпечаток приложения (способ входа) кэшируется по корню приложения (origin и
+# первый сегмент пути); при отпечатке читаются не более FINGERPRINT_MAX_BYTES
+# символов страницы
+AUTH_FINGERPRINT_TTL = 1800.0
+# потеря сессии во время скана: не более AUTH_MAX_REAUTH повторных входов за
+# скан и не более AUTH_MAX_RETRIES повторов одного запроса после входа
+AUTH_MAX_REAUTH = 3
+AUTH_MAX_RETRIES = 2
+FINGERPRINT_MAX_BYTES = 65536
 LOGIN_PATH = "/login.php"
+# страница входа bWAPP относительно целевого URL
+BWAPP_LOGIN_PATH = "login.php"
 SECURITY_COOKIE_NAME = "security"
 SECURITY_COOKIE_VALUE = "low"
 LOGIN_FORM_FIELDS = {"username", "password", "user_token"}
@@ -30,3 +199,8 @@ VERIFICATION_FAILURE_INDICATORS = [
     'name="username"',
     "csrf token is incorrect",
 ]
+# признаки страницы входа в ответе формы (потеря сессии посреди скана); отказ
+# по CSRF-токену сюда не входит — его обрабатывают CSRF_REJECTION_MARKERS
+SESSION_LOST_INDICATORS = tuple(
+    i for i in VERIFICATION_FAILURE_INDICATORS if i not in CSRF_REJECTION_MARKERS
+)
@@ -1,20 +1,35 @@
 """
-Модуль аутентификации в DVWA.
+Модуль аутентификации в DVWA и bWAPP.
+
+Способы входа регистрируются в LOGIN_FLOWS вместе с дешёвым отпечатком
+приложения (фрагменты заголовка страницы, пути и имена cookies), по которому
+fingerprint_target выбирает единственный подходящий способ входа.
+
+Классы:
+    LoginFlow – способ входа и отпечаток приложения.
 
 Функции:
-    try_login_dvwa() - производит попытку аутентифицироваться в DVWA.
+    try_login_dvwa()      - производит попытку аутентифицироваться в DVWA.
+    try_login_bwapp()     - производит попытку аутентифицироваться в bWAPP.
+    register_login_flow() - регистрирует способ входа.
+    fingerprint_target()  - определяет способ входа для целевого URL.
 """
 
+import re
 import requests
-from urllib.parse import urljoin
-from typing import Optional
+from dataclasses import dataclass
+from urllib.parse import urljoin, urlparse
+from typing import Callable, Dict, Iterable, Optional, Tuple
 
 from src.logger import get_logger
 from src.extractor.models import Form
 from src.extractor.extractor import extract_forms
+from src.net.decoding import BODY_DECODER
 from src.config import (
     DEFAULT_HEADER,
     LOGIN_PATH,
+    BWAPP_LOGIN_PATH,
+    FINGERPRINT_MAX_BYTES,
     SECURITY_COOKIE_NAME,
     SECURITY_COOKIE_VALUE,
     LOGIN_FORM_FIELDS,
@@ -273,7 +288,7 @@ def try_login_bwapp(
         6. Verify success with verify_login_success.
     """
     try:
-        login_url = "http://localhost/bWAPP/login.php"
+        login_url = urljoin(target_url, BWAPP_LOGIN_PATH)
 
         login_page_response = fetch_login_page(session, login_url, timeout)
         if login_page_response is None:
@@ -313,3 +328,129 @@ def try_login_bwapp(
             extra={"target_url": target_url, "error": str(e)},
         )
         return False
+
+
+TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+
+@dataclass(frozen=True)
+class LoginFlow:
+    """
+    Способ входа в приложение и его отпечаток.
+
+    Атрибуты:
+        name:    имя способа входа (ключ в LOGIN_FLOWS и в кэше входа)
+        login:   функция входа вида try_login_dvwa
+        titles:  фрагменты заголовка <title> (в нижнем регистре)
+        paths:   фрагменты пути URL (в нижнем регистре)
+        cookies: имена cookies, выставляемых приложением
+    """
+
+    name: str
+    login: Callable[..., bool]
+    titles: Tuple[str, ...] = ()
+    paths: Tuple[str, ...] = ()
+    cookies: Tuple[str, ...] = ()
+
+    def matches(self, title: str, urls: Iterable[str], cookies: Iterable[str]) -> bool:
+        """Проверяет, совпадает ли отпечаток с признаками ответа."""
+        if any(marker in title for marker in self.titles):
+            return True
+        paths = [urlparse(url).path.lower() for url in urls]
+        if any(marker in path for marker in self.paths for path in paths):
+            return True
+        return any(name in self.cookies for name in cookies)
+
+
+LOGIN_FLOWS: Dict[str, LoginFlow] = {}
+
+
+def register_login_flow(flow: LoginFlow) -> LoginFlow:
+    """
+    Регистрирует способ входа; порядок регистрации задаёт приоритет проверки.
+
+    Возвращает:
+        Зарегистрированный LoginFlow.
+    """
+    LOGIN_FLOWS[flow.name] = flow
+    return flow
+
+
+register_login_flow(
+    LoginFlow(
+        "dvwa",
+        try_login_dvwa,
+        titles=("damn vulnerable web application",),
+        paths=("/dvwa",),
+    )
+)
+register_login_flow(
+    LoginFlow(
+        "bwapp",
+        try_login_bwapp,
+        titles=("bwapp",),
+        paths=("/bwapp",),
+        cookies=("security_level",),
+    )
+)
+
+
+def page_title(html_text: str) -> str:
+    """Возвращает содержимое <title> в нижнем регистре (без разбора HTML)."""
+    match = TITLE_RE.search(html_text[:FINGERPRINT_MAX_BYTES])
+    return " ".join(match.group(1).split()).lower() if match else ""
+
+
+def _read_head(response: requests.Response, limit: int) -> bytes:
+    """Читает не больше limit байт тела потокового ответа."""
+    head = bytearray()
+    for chunk in response.iter_content(min(limit, 8192) or 1):
+        head += chunk
+        if len(head) >= limit:
+            break
+    return bytes(head[:limit])
+
+
+def fingerprint_target(
+    session: requests.Session, target_url: str, timeout: int = 8
+) -> Optional[LoginFlow]:
+    """
+    Определяет способ входа для целевого URL одним GET-запросом.
+
+    Признаки берутся из заголовка итоговой страницы (после перенаправлений,
+    например на страницу входа), путей запрошенного и итогового URL и имён
+    cookies, выставленных ответами. Тело читается потоково, не больше
+    FINGERPRINT_MAX_BYTES байт.
+
+    Параметры:
+        session:    сессия requests для выполнения запроса
+        target_url: целевой URL
+        timeout:    таймаут запроса в секундах
+
+    Возвращает:
+        Подходящий LoginFlow или None, если приложение не распознано.
+
+    Исключения:
+        requests.RequestException – если запрос не удался.
+    """
+    response = session.get(target_url, timeout=timeout, stream=True)
+    try:
+        head = _read_head(response, FINGERPRINT_MAX_BYTES)
+    finally:
+        response.close()
+    title = page_title(
+        BODY_DECODER.decode(response.url, head, response.headers.get("content-type"))
+    )
+    responses = [*response.history, response]
+    urls = [target_url, *(r.url for r in responses)]
+    cookies = {cookie.name for r in responses for cookie in r.cookies}
+
+    for flow in LOGIN_FLOWS.values():
+        if flow.matches(title, urls, cookies):
+            logger.debug(
+                "Target fingerprinted",
+                extra={"url": target_url, "flow": flow.name, "title": title},
+            )
+            return flow
+    logger.debug("Target not recognised", extra={"url": target_url, "title": title})
+    return None
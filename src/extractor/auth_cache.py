@@ -0,0 +1,293 @@
+"""
+Модуль кэширует аутентифицированные сессии по origin и учётным данным.
+
+Вход в DVWA/bWAPP стоит нескольких HTTP-запросов и разборов HTML, поэтому
+cookies успешного входа сохраняются и переносятся в новые сессии того же
+origin. Запись живёт AUTH_SESSION_TTL секунд; не чаще раза в
+AUTH_VERIFY_INTERVAL она проверяется через verify_login_success, и вход
+повторяется только если проверка показала, что сессия истекла. Неудачный
+вход запоминается на AUTH_FAILURE_TTL секунд, чтобы цели без формы входа
+не опрашивались заново при каждом запросе.
+
+Способ входа определяется отпечатком приложения (fingerprint_target) один
+раз на корень приложения и кэшируется на AUTH_FINGERPRINT_TTL секунд, так
+что для нераспознанных целей вход не выполняется вовсе.
+
+Классы:
+    AuthSessionCache – кэш аутентифицированных сессий.
+
+Объекты:
+    AUTH_CACHE – кэш процесса.
+"""
+
+from dataclasses import dataclass, field
+from hashlib import sha256
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.cookies import RequestsCookieJar
+
+from src.extractor.auth import (
+    LOGIN_FLOWS,
+    LoginFlow,
+    fingerprint_target,
+    verify_login_success,
+)
+from src.net.urls import origin_of
+from src.config import (
+    REQUEST_TIMEOUT,
+    AUTH_SESSION_TTL,
+    AUTH_VERIFY_INTERVAL,
+    AUTH_FAILURE_TTL,
+    AUTH_FINGERPRINT_TTL,
+)
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+LoginFunc = Callable[..., bool]
+CacheKey = Tuple[str, str, str]
+
+
+def app_root(url: str) -> str:
+    """
+    Возвращает корень приложения: origin и первый сегмент каталога пути.
+
+    Несколько учебных приложений часто размещаются на одном origin
+    (http://localhost/DVWA, http://localhost/bWAPP), поэтому отпечаток
+    кэшируется не по origin, а по корню приложения. Последний сегмент пути
+    считается файлом, только если в нём есть расширение: http://localhost/DVWA
+    и http://localhost/DVWA/ дают один корень, http://localhost/index.php —
+    сам origin.
+    """
+    segments = [s for s in urlparse(url).path.split("/") if s]
+    if segments and "." in segments[-1]:
+        segments.pop()
+    return origin_of(url) + ("/" + segments[0] if segments else "")
+
+
+@dataclass
+class _AuthEntry:
+    """Результат входа: cookies (None — вход не удался) и время проверок."""
+
+    cookies: Optional[RequestsCookieJar]
+    created: float = field(default_factory=monotonic)
+    verified: float = field(default_factory=monotonic)
+
+
+class AuthSessionCache:
+    """
+    Кэш аутентифицированных сессий по (origin, способ входа, учётные данные).
+
+    Параметры:
+        ttl:             время жизни успешного входа (сек)
+        verify_interval: как часто проверять кэшированную сессию (сек)
+        failure_ttl:     время, на которое запоминается неудачный вход (сек)
+        fingerprint_ttl: время жизни отпечатка приложения (сек)
+    """
+
+    def __init__(
+        self,
+        ttl: float = AUTH_SESSION_TTL,
+        verify_interval: float = AUTH_VERIFY_INTERVAL,
+        failure_ttl: float = AUTH_FAILURE_TTL,
+        fingerprint_ttl: float = AUTH_FINGERPRINT_TTL,
+    ):
+        self.ttl = ttl
+        self.verify_interval = verify_interval
+        self.failure_ttl = failure_ttl
+        self.fingerprint_ttl = fingerprint_ttl
+        self._entries: Dict[CacheKey, _AuthEntry] = {}
+        self._flows: Dict[str, Tuple[Optional[str], float]] = {}
+        self._lock = Lock()
+        self.stats = {
+            "hits": 0,
+            "logins": 0,
+            "verifications": 0,
+            "expired": 0,
+            "fingerprints": 0,
+        }
+
+    @staticmethod
+    def key(url: str, flow: str, credentials: dict) -> CacheKey:
+        """Строит ключ кэша; учётные данные хранятся только в виде хэша."""
+        digest = sha256(repr(sorted(credentials.items())).encode()).hexdigest()
+        return origin_of(url), flow, digest
+
+    def _count(self, name: str) -> None:
+        """Увеличивает счётчик stats под блокировкой."""
+        with self._lock:
+            self.stats[name] += 1
+
+    def _lookup(self, key: CacheKey, now: float) -> Optional[_AuthEntry]:
+        """Возвращает неистёкшую запись или None, удаляя истёкшую."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            ttl = self.ttl if entry.cookies is not None else self.failure_ttl
+            if now - entry.created > ttl:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                return None
+            return entry
+
+    def login(
+        self,
+        session: requests.Session,
+        target_url: str,
+        flow: str,
+        login: LoginFunc,
+        timeout: int = REQUEST_TIMEOUT,
+        **credentials,
+    ) -> bool:
+        """
+        Аутентифицирует сессию, используя кэш.
+
+        Параметры:
+            session:     сессия, в которую переносятся cookies входа
+            target_url:  целевой URL (по нему определяется origin и
+                         проверяется вход)
+            flow:        имя способа входа (например, "dvwa")
+            login:       функция входа вида try_login_dvwa
+            timeout:     таймаут запросов проверки и входа
+            credentials: учётные данные, передаваемые в login
+
+        Возвращает:
+            True, если сессия аутентифицирована.
+        """
+        key = self.key(target_url, flow, credentials)
+        now = monotonic()
+        entry = self._lookup(key, now)
+
+        if entry is not None and entry.cookies is None:
+            self._count("hits")
+            return False
+
+        if entry is not None:
+            session.cookies.update(entry.cookies)
+            if now - entry.verified <= self.verify_interval:
+                self._count("hits")
+                return True
+            self._count("verifications")
+            if verify_login_success(session, target_url, timeout):
+                entry.verified = monotonic()
+                self._count("hits")
+                return True
+            logger.info(
+                "Cached session expired, logging in again",
+                extra={"origin": key[0], "flow": flow},
+            )
+            self.invalidate(target_url, flow)
+
+        self._count("logins")
+        success = login(session, target_url, timeout=timeout, **credentials)
+        cookies = session.cookies.copy() if success else None
+        with self._lock:
+            self._entries[key] = _AuthEntry(cookies)
+        return success
+
+    def identify(
+        self,
+        session: requests.Session,
+        target_url: str,
+        timeout: int = REQUEST_TIMEOUT,
+    ) -> Optional[LoginFlow]:
+        """
+        Возвращает способ входа для целевого URL, используя кэш отпечатков.
+
+        Возвращает:
+            LoginFlow или None, если приложение не распознано.
+        """
+        root = app_root(target_url)
+        now = monotonic()
+        with self._lock:
+            cached = self._flows.get(root)
+        if cached is not None and now - cached[1] <= self.fingerprint_ttl:
+            return LOGIN_FLOWS.get(cached[0]) if cached[0] else None
+
+        self._count("fingerprints")
+        try:
+            flow = fingerprint_target(session, target_url, timeout)
+        except requests.RequestException as e:
+            # сетевая ошибка не кэшируется: цель проверяется при следующем запросе
+            logger.warning(
+                "Request exception during target fingerprinting",
+                extra={"url": target_url, "error": str(e)},
+            )
+            return None
+        with self._lock:
+            self._flows[root] = (flow.name if flow else None, monotonic())
+        return flow
+
+    def authenticate(
+        self,
+        session: requests.Session,
+        target_url: str,
+        timeout: int = REQUEST_TIMEOUT,
+    ) -> Optional[str]:
+        """
+        Распознаёт приложение и выполняет только подходящий способ входа.
+
+        Возвращает:
+            Имя способа входа при успешной аутентификации, иначе None.
+        """
+        flow = self.identify(session, target_url, timeout)
+        if flow is None:
+            return None
+        if self.login(session, target_url, flow.name, flow.login, timeout):
+            return flow.name
+        return None
+
+    def reauthenticate(
+        self,
+        session: requests.Session,
+        target_url: str,
+        timeout: int = REQUEST_TIMEOUT,
+    ) -> bool:
+        """
+        Выполняет вход заново, отбрасывая кэшированную сессию.
+
+        Используется сканером, когда сессия истекла посреди скана.
+
+        Возвращает:
+            True, если вход выполнен успешно.
+        """
+        flow = self.identify(session, target_url, timeout)
+        if flow is None:
+            return False
+        self.invalidate(target_url, flow.name)
+        return self.login(session, target_url, flow.name, flow.login, timeout)
+
+    def invalidate(self, url: str, flow: Optional[str] = None) -> int:
+        """
+        Удаляет записи origin данного URL (только способа flow, если задан).
+
+        Возвращает:
+            Число удалённых записей.
+        """
+        origin = origin_of(url)
+        with self._lock:
+            stale = [
+                key
+                for key in self._entries
+                if key[0] == origin and (flow is None or key[1] == flow)
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def to_dict(self) -> dict:
+        """Возвращает счётчики кэша для диагностики."""
+        with self._lock:
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "fingerprinted": len(self._flows),
+            }
+
+
+AUTH_CACHE = AuthSessionCache()
@@ -6,17 +6,37 @@
 Функции:
     fetch_html() - получает html
     extract_forms() - извлекает формы из страницы в виде списка объектов Form
+    stream_forms() - выдаёт формы по мере загрузки страницы
+    load_forms() - загружает страницу и извлекает формы движком EXTRACT_ENGINE
+
+Движок разбора выбирается параметром EXTRACT_ENGINE: "bs4" — BeautifulSoup
+с html.parser, "lxml" строит дерево libxml2 и обходит его один раз (формы и
+признак скриптов страницы), "stream" — потоковый парсер без дерева документа
+(см. src/extractor/streaming.py). Все движки возвращают одинаковые объекты
+Form. libxml2 исправляет разметку иначе, чем html.parser (закрывает внешнюю
+форму перед вложенной, не разбирает теги внутри <textarea>), поэтому такие
+страницы движок "lxml" передаёт BeautifulSoup.
 """
 
+import re
 import requests
-from typing import List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 from src.extractor.models import Form
-from src.extractor.fetcher import fetch_info
+from src.extractor.fetcher import fetch_info, fetch_chunks
+from src.extractor.streaming import iter_forms
+from src.config import EXTRACT_ENGINE, STREAM_CHUNK_SIZE
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+# HTML передаётся в lxml байтами: строку с XML-декларацией кодировки
+# lxml не принимает
+LXML_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+# открывающие и закрывающие теги <form> (поиск вложенных форм)
+FORM_TAG_RE = re.compile(r"<(/?)form[\s/>]", re.IGNORECASE)
+
 
 def fetch_html(url: str, session: Optional[requests.Session] = None) -> Optional[str]:
     """
@@ -35,32 +55,179 @@ def fetch_html(url: str, session: Optional[requests.Session] = None) -> Optional
     return None
 
 
-def extract_forms(html: str, url: str) -> Optional[List[Form]]:
+def stream_forms(
+    url: str, session: Optional[requests.Session] = None
+) -> Iterator[Form]:
+    """
+    Загружает страницу по частям и выдаёт формы по мере закрытия </form>.
+
+    Страница целиком в памяти не хранится; первая форма доступна до
+    окончания загрузки.
+
+    Параметры:
+        url: адрес страницы (http, https или file)
+        session: текущая сессия (для правильной аутентификации)
+
+    Возвращает:
+        Итератор объектов Form.
+
+    Исключения:
+        ValueError, requests.RequestException, OSError: см. fetch_chunks.
+    """
+    return iter_forms(fetch_chunks(url, session), url)
+
+
+def load_forms(
+    url: str, session: Optional[requests.Session] = None, engine: Optional[str] = None
+) -> Optional[List[Form]]:
+    """
+    Загружает страницу и извлекает её формы.
+
+    При движке "stream" страница читается по частям и целиком в памяти не
+    хранится (см. stream_forms); список возвращается после разбора всей
+    страницы, когда признак likely_js форм окончателен.
+
+    Параметры:
+        url: адрес страницы
+        session: текущая сессия (для правильной аутентификации)
+        engine: движок разбора (по умолчанию EXTRACT_ENGINE)
+
+    Возвращает:
+        Список объектов Form или None (см. extract_forms).
+
+    Исключения:
+        requests.RequestException, OSError, ValueError: страница недоступна
+        при потоковой загрузке.
+    """
+    engine = engine or EXTRACT_ENGINE
+    if engine == "stream":
+        return list(stream_forms(url, session))
+    return extract_forms(fetch_html(url, session), url, engine)
+
+
+def extract_forms(
+    html: str, url: str, engine: Optional[str] = None
+) -> Optional[List[Form]]:
     """
     Извлекает все формы из HTML-кода страницы.
 
     Параметры:
         html - html-код страницы
         url - url страницы (используется для построения абсолютных ссылок)
+        engine - движок разбора (ключ ENGINES; по умолчанию EXTRACT_ENGINE)
 
     Возвращает:
         Список объектов Form. Если HTML пуст или произошла ошибка парсинга,
         возвращается None.
+
+    Исключения:
+        ValueError: неизвестный движок разбора.
     """
+    engine = engine or EXTRACT_ENGINE
+    extract = ENGINES.get(engine)
+    if extract is None:
+        raise ValueError(f"Unknown extract engine: {engine}")
     if not html:
         logger.warning("Empty HTML in extractor", extra={"url": url})
         return None
     try:
-        soup = BeautifulSoup(html, "html.parser")
-        forms = [
-            Form.from_soup_form(form_tag=f, url=url, page_js_hint=page_has_js(soup))
-            for f in soup.find_all("form")
-        ]
-        return forms
+        return extract(html, url)
     except Exception as e:
-        logger.exception("Error extracting forms", extra={"url": url, "error": str(e)})
+        logger.exception(
+            "Error extracting forms",
+            extra={"url": url, "engine": engine, "error": str(e)},
+        )
         return None
 
 
+def _extract_soup(html: str, url: str) -> List[Form]:
+    """Извлекает формы с помощью BeautifulSoup (html.parser)."""
+    soup = BeautifulSoup(html, "html.parser")
+    page_js_hint = page_has_js(soup)
+    return [
+        Form.from_soup_form(form_tag=f, url=url, page_js_hint=page_js_hint)
+        for f in soup.find_all("form")
+    ]
+
+
+def _extract_lxml(html: str, url: str) -> List[Form]:
+    """
+    Извлекает формы из дерева lxml.html.
+
+    Формы и скрипты собираются за один обход дерева; признак скриптов
+    относится ко всей странице, поэтому объекты Form строятся после обхода.
+    Страницы с вложенными формами или разметкой внутри <textarea> libxml2
+    разбирает иначе, чем html.parser, — их формы извлекает _extract_soup.
+    """
+    if has_nested_forms(html):
+        return _extract_soup(html, url)
+    try:
+        root = lxml_html.document_fromstring(
+            html.encode("utf-8", "replace"), parser=LXML_PARSER
+        )
+    except etree.ParserError:
+        # документ без элементов (например, только пробелы)
+        return []
+    form_elements = []
+    page_js_hint = False
+    for element in root.iter("form", "script"):
+        if element.tag == "script":
+            page_js_hint = True
+        else:
+            form_elements.append(element)
+    if any(_has_markup_in_textarea(element) for element in form_elements):
+        return _extract_soup(html, url)
+    return [
+        Form.from_lxml_form(element, url, page_js_hint) for element in form_elements
+    ]
+
+
+def _extract_stream(html: str, url: str) -> List[Form]:
+    """Извлекает формы потоковым парсером, подавая HTML частями."""
+    chunks = (
+        html[start : start + STREAM_CHUNK_SIZE]
+        for start in range(0, len(html), STREAM_CHUNK_SIZE)
+    )
+    return list(iter_forms(chunks, url))
+
+
+def has_nested_forms(html: str) -> bool:
+    """
+    Проверяет, открывается ли в HTML форма внутри другой формы.
+
+    Теги ищутся в исходном тексте: libxml2 закрывает внешнюю форму перед
+    вложенной, и по дереву lxml вложенность уже не восстановить. Совпадения
+    в комментариях и скриптах дают лишний переход на BeautifulSoup, но не
+    ошибку разбора.
+    """
+    depth = 0
+    for match in FORM_TAG_RE.finditer(html):
+        if match.group(1):
+            depth = max(depth - 1, 0)
+        else:
+            depth += 1
+            if depth > 1:
+                return True
+    return False
+
+
+def _has_markup_in_textarea(form_element) -> bool:
+    """
+    Проверяет, есть ли в <textarea> формы текст с "<".
+
+    libxml2 оставляет содержимое <textarea> текстом, а html.parser разбирает
+    в нём теги; "<", полученный из сущности (&lt;), тоже даёт переход на
+    BeautifulSoup.
+    """
+    return any("<" in (tag.text or "") for tag in form_element.iter("textarea"))
+
+
 def page_has_js(soup) -> bool:
-    return bool(soup.find_all("script"))
+    return soup.find("script") is not None
+
+
+ENGINES: Dict[str, Callable[[str, str], List[Form]]] = {
+    "lxml": _extract_lxml,
+    "bs4": _extract_soup,
+    "stream": _extract_stream,
+}
@@ -10,14 +10,16 @@
     fetch_local_file() - чтение локального файла.
     fetch_web() - загрузка данных с веб-ресурсов.
     create_response() - формирование ответа.
+    fetch_chunks() - чтение содержимого по частям (без загрузки целиком).
 """
 
 import os
 import requests
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Iterator
 from urllib.parse import urlparse
 from src.extractor.utils import url_to_path
-from src.config import REQUEST_TIMEOUT, DEFAULT_HEADER
+from src.net.decoding import BODY_DECODER
+from src.config import REQUEST_TIMEOUT, DEFAULT_HEADER, STREAM_CHUNK_SIZE
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -123,13 +125,14 @@ def fetch_web(url: str, session: requests.Session) -> FetchResponse:
             allow_redirects=True
         )
         resp.raise_for_status()
+        text = BODY_DECODER.decode_response(resp)
 
         return create_response(
             url=url,
             status=resp.status_code,
-            length=len(resp.text),
+            length=len(text),
             ok=True,
-            content=resp.text,
+            content=text,
         )
     except requests.HTTPError() as e:
         logger.warning(
@@ -176,3 +179,63 @@ def fetch_info(url: str, session: Optional[requests.Session] = None) -> FetchRes
             "Unexpected error in fetch_info", extra={"url": url, "error": str(e)}
         )
         return create_response(url=url, error=str(e))
+
+
+def fetch_chunks(
+    url: str,
+    session: Optional[requests.Session] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[str]:
+    """
+    Читает содержимое ресурса по частям, не загружая его целиком.
+
+    Параметры:
+        url: URL целевого ресурса (http, https или file)
+        session: текущая сессия (обязательна для веб-ресурсов)
+        chunk_size: размер части (в байтах для веб-ресурсов, в символах
+                    для локальных файлов)
+
+    Возвращает:
+        Итератор декодированных частей содержимого.
+
+    Исключения:
+        ValueError: пустой URL, неподдерживаемая схема или нет сессии.
+        requests.RequestException: ошибка запроса или HTTP-статус ошибки.
+        OSError: ошибка чтения локального файла.
+    """
+    if not url or not url.strip():
+        raise ValueError("Empty URL")
+    scheme = urlparse(url).scheme.lower()
+    if scheme == "file":
+        with open(url_to_path(url), "r", encoding="UTF-8") as file:
+            while chunk := file.read(chunk_size):
+                yield chunk
+        return
+    if not scheme:
+        url = "http://" + url
+    elif scheme not in ("http", "https"):
+        raise ValueError(f"Unsupported URL scheme: {scheme}")
+    if session is None:
+        raise ValueError("No session for web")
+
+    with session.get(
+        url,
+        allow_redirects=True,
+        stream=True,
+        headers=DEFAULT_HEADER,
+        timeout=REQUEST_TIMEOUT,
+    ) as resp:
+        resp.raise_for_status()
+        decoder = None
+        for chunk in resp.iter_content(chunk_size):
+            if not chunk:
+                continue
+            if decoder is None:
+                decoder = BODY_DECODER.incremental(
+                    resp.url, chunk, resp.headers.get("Content-Type")
+                )
+            yield BODY_DECODER.feed(decoder, chunk)
+        if decoder is not None:
+            tail = BODY_DECODER.feed(decoder, b"", final=True)
+            if tail:
+                yield tail
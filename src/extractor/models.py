@@ -8,13 +8,18 @@
 
 Функции:
     parse_form_inputs - преобразует теги полей формы в объекты InputField
+    parse_lxml_inputs - то же для элементов дерева lxml
 
+Формы строятся из тегов BeautifulSoup (from_soup_form), из элементов
+lxml.html (from_lxml_form) или из атрибутов тегов, собранных потоковым
+парсером (from_attrs, см. streaming.py) — результат одинаков.
 """
 
 from dataclasses import dataclass, asdict, field
 from urllib.parse import urljoin
 from typing import Optional, Any, List, Dict
 from bs4.element import Tag
+from lxml.html import HtmlElement
 
 from src.logger import get_logger
 
@@ -70,11 +75,66 @@ class InputField:
             placeholder=tag.get("placeholder"),
         )
 
+    @classmethod
+    def from_lxml_textarea(cls, element: HtmlElement) -> "InputField":
+        """Создаёт InputField из элемента lxml <textarea>."""
+        return cls(
+            name=element.get("name"),
+            field_type="textarea",
+            value=element.text_content() or None,
+            required="required" in element.attrib,
+            placeholder=element.get("placeholder"),
+        )
+
+    @classmethod
+    def from_lxml_input(cls, element: HtmlElement) -> "InputField":
+        """Создаёт InputField из элемента lxml <input>."""
+        return cls(
+            name=element.get("name"),
+            field_type=element.get("type", "text"),
+            value=element.get("value"),
+            required="required" in element.attrib,
+            placeholder=element.get("placeholder"),
+        )
+
+    @classmethod
+    def from_attrs(
+        cls, tag_name: str, attrs: Dict[str, str], text: Optional[str] = None
+    ) -> "InputField":
+        """
+        Создаёт InputField по имени тега и словарю его атрибутов.
+
+        Параметры:
+            tag_name: "input" или "textarea"
+            attrs: атрибуты тега (атрибут без значения — пустая строка)
+            text: содержимое <textarea>
+        """
+        is_textarea = tag_name == "textarea"
+        return cls(
+            name=attrs.get("name"),
+            field_type="textarea" if is_textarea else attrs.get("type", "text"),
+            value=(text or None) if is_textarea else attrs.get("value"),
+            required="required" in attrs,
+            placeholder=attrs.get("placeholder"),
+        )
+
+
+def detect_js_driven_form(
+    form: Tag, page_js_hint: bool, inputs: Optional[List[InputField]] = None
+) -> bool:
+    """
+    Определяет, отправляется ли форма скриптом.
 
-def detect_js_driven_form(form: Tag, page_js_hint: bool) -> bool:
+    Параметры:
+        form: тег <form> (BeautifulSoup или lxml)
+        page_js_hint: есть ли на странице скрипты
+        inputs: уже разобранные поля формы (иначе разбираются заново)
+    """
     if not form.get("action", ""):
         return True
-    if page_js_hint and parse_form_inputs(form) == []:
+    if inputs is None:
+        inputs = parse_form_inputs(form)
+    if page_js_hint and inputs == []:
         return True
     return False
 
@@ -115,6 +175,37 @@ class Form:
         Возвращает:
             Объект Form.
         """
+        return cls.from_attrs(form_tag, parse_form_inputs(form_tag), url, page_js_hint)
+
+    @classmethod
+    def from_lxml_form(
+        cls, element: HtmlElement, url: str, page_js_hint: bool
+    ) -> "Form":
+        """
+        Создаёт объект Form из элемента lxml.html.
+
+        Параметры:
+            element: элемент <form> дерева lxml
+            url: базовый URL страницы
+
+        Возвращает:
+            Объект Form.
+        """
+        return cls.from_attrs(element, parse_lxml_inputs(element), url, page_js_hint)
+
+    @classmethod
+    def from_attrs(
+        cls, form_tag, inputs: List[InputField], url: str, page_js_hint: bool
+    ) -> "Form":
+        """
+        Собирает Form по атрибутам тега и разобранным полям.
+
+        Параметры:
+            form_tag: тег <form> или словарь его атрибутов (нужен метод get)
+            inputs: поля формы
+            url: базовый URL страницы
+            page_js_hint: есть ли на странице скрипты
+        """
         action = form_tag.get("action", "")
         if action.endswith("#"):
             action = ""
@@ -127,10 +218,13 @@ class Form:
         return cls(
             action=urljoin(url, action),
             method=form_tag.get("method", "get").lower(),
-            inputs=parse_form_inputs(form_tag),
+            inputs=inputs,
             enctype=form_tag.get("enctype"),
             form_id=form_tag.get("id"),
-            meta={"likely_js": detect_js_driven_form(form_tag, page_js_hint)},
+            meta={
+                "likely_js": detect_js_driven_form(form_tag, page_js_hint, inputs),
+                "page_url": url,
+            },
         )
 
 
@@ -169,3 +263,35 @@ def parse_form_inputs(form_tag: Tag) -> List[InputField]:
                 },
             )
     return result
+
+
+def parse_lxml_inputs(element: HtmlElement) -> List[InputField]:
+    """
+    Извлекает все поля ввода из элемента формы lxml.
+
+    Параметры:
+        element: элемент <form> дерева lxml
+
+    Возвращает:
+        Список объектов InputField (как parse_form_inputs).
+    """
+    result: List[InputField] = []
+    parsers = {
+        "input": InputField.from_lxml_input,
+        "textarea": InputField.from_lxml_textarea,
+    }
+
+    for tag in element.iter("input", "textarea"):
+        if tag.tag == "input":
+            tag_type = (tag.get("type") or "text").lower()
+            if tag_type in IGNORED_INPUT_TYPES:
+                continue
+
+        try:
+            result.append(parsers[tag.tag](tag))
+        except Exception as e:
+            logger.exception(
+                "Failed to parse form field",
+                extra={"tag_name": tag.tag, "error": str(e)},
+            )
+    return result
@@ -0,0 +1,167 @@
+"""
+Модуль извлекает формы из HTML потоково, не строя дерево документа.
+
+StreamingFormParser получает HTML частями (push) и выдаёт объекты Form по
+мере закрытия тегов </form>. Сохраняются только атрибуты открытых форм и их
+поля; остальная разметка отбрасывается сразу после разбора, поэтому память
+не зависит от размера страницы. Формы строятся так же, как при разборе
+BeautifulSoup (см. models.Form.from_attrs): поля вложенных форм относятся
+ко всем открытым формам, вложенные формы выдаются вместе с внешней в порядке
+открывающих тегов, незакрытые — в конце документа.
+
+Признак скриптов страницы (page_js_hint) известен полностью только в конце
+документа. Форма без полей, закрытая до первого <script>, задерживается
+(вместе со следующими за ней формами, чтобы сохранить порядок) до первого
+<script> или конца документа: выданные формы больше не изменяются.
+
+Классы:
+    StreamingFormParser – потоковый парсер форм.
+
+Функции:
+    iter_forms – выдаёт формы из последовательности частей HTML.
+"""
+
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.extractor.models import Form, InputField, IGNORED_INPUT_TYPES
+
+# атрибуты, поля и позиция формы в блоке внешней формы
+OpenForm = Tuple[Dict[str, str], List[InputField], int]
+
+
+class StreamingFormParser(HTMLParser):
+    """
+    Потоковый парсер форм.
+
+    Использование: push(часть) для каждой части документа, затем finish().
+    Оба метода возвращают формы, разбор которых завершён.
+    """
+
+    def __init__(self, url: str):
+        super().__init__(convert_charrefs=True)
+        self.url = url
+        self.page_js_hint = False
+        self._open: List[OpenForm] = []
+        # формы текущей внешней формы (с вложенными) в порядке открытия
+        self._block: List[Optional[Form]] = []
+        # атрибуты, текст и поля внутри открытой <textarea>
+        self._textarea: Optional[Tuple[Dict[str, str], List[str], List[InputField]]] = (
+            None
+        )
+        self._ready: List[Form] = []
+        # формы без полей, закрытые до первого <script>: likely_js ещё не известен
+        self._pending_js: List[Form] = []
+
+    def push(self, chunk: str) -> List[Form]:
+        """Разбирает очередную часть документа и возвращает готовые формы."""
+        self.feed(chunk)
+        return self._take()
+
+    def finish(self) -> List[Form]:
+        """Завершает разбор и возвращает оставшиеся формы (в т.ч. незакрытые)."""
+        self.close()
+        self._close_textarea()
+        while self._open:
+            self._emit(*self._open.pop())
+        # скриптов на странице нет: признак likely_js окончателен
+        self._pending_js = []
+        return self._take()
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        if tag == "script":
+            self._mark_js()
+        elif tag == "form":
+            self._open.append((_attrs_dict(attrs), [], len(self._block)))
+            self._block.append(None)
+        elif not self._open:
+            return
+        elif tag == "input":
+            attrs_dict = _attrs_dict(attrs)
+            if (attrs_dict.get("type") or "text").lower() in IGNORED_INPUT_TYPES:
+                return
+            field = InputField.from_attrs(tag, attrs_dict)
+            if self._textarea is not None:
+                # html.parser разбирает теги внутри <textarea>, как и bs4:
+                # поле идёт после самой <textarea>
+                self._textarea[2].append(field)
+            else:
+                self._add_field(field)
+        elif tag == "textarea" and self._textarea is None:
+            self._textarea = (_attrs_dict(attrs), [], [])
+
+    def handle_data(self, data: str):
+        if self._textarea is not None:
+            self._textarea[1].append(data)
+
+    def handle_endtag(self, tag: str):
+        if tag == "textarea":
+            self._close_textarea()
+        elif tag == "form" and self._open:
+            self._close_textarea()
+            self._emit(*self._open.pop())
+
+    def _close_textarea(self) -> None:
+        """Добавляет разобранное поле <textarea> к открытым формам."""
+        if self._textarea is None:
+            return
+        attrs, parts, nested = self._textarea
+        self._textarea = None
+        self._add_field(InputField.from_attrs("textarea", attrs, "".join(parts)))
+        for field in nested:
+            self._add_field(field)
+
+    def _add_field(self, field: InputField) -> None:
+        for _, inputs, _ in self._open:
+            inputs.append(field)
+
+    def _emit(self, attrs: Dict[str, str], inputs: List[InputField], slot: int):
+        form = Form.from_attrs(attrs, inputs, self.url, self.page_js_hint)
+        if not self.page_js_hint and not inputs and not form.meta["likely_js"]:
+            self._pending_js.append(form)
+        self._block[slot] = form
+        if not self._open:
+            self._ready.extend(self._block)
+            self._block = []
+
+    def _mark_js(self) -> None:
+        """Отмечает скрипт на странице и завершает задержанные формы."""
+        if self.page_js_hint:
+            return
+        self.page_js_hint = True
+        for form in self._pending_js:
+            form.meta["likely_js"] = True
+        self._pending_js = []
+
+    def _take(self) -> List[Form]:
+        """Возвращает готовые формы до первой задержанной."""
+        count = len(self._ready)
+        if self._pending_js:
+            first = self._pending_js[0]
+            count = next(
+                (i for i, form in enumerate(self._ready) if form is first), count
+            )
+        ready, self._ready = self._ready[:count], self._ready[count:]
+        return ready
+
+
+def _attrs_dict(attrs: List[Tuple[str, Optional[str]]]) -> Dict[str, str]:
+    """Атрибуты тега; у атрибута без значения — пустая строка, как в bs4."""
+    return {name: "" if value is None else value for name, value in attrs}
+
+
+def iter_forms(chunks: Iterable[str], url: str) -> Iterator[Form]:
+    """
+    Выдаёт формы из последовательности частей HTML по мере их закрытия.
+
+    Параметры:
+        chunks: части документа (например, fetcher.fetch_chunks)
+        url: URL страницы (для построения абсолютных ссылок)
+
+    Возвращает:
+        Итератор объектов Form.
+    """
+    parser = StreamingFormParser(url)
+    for chunk in chunks:
+        yield from parser.push(chunk)
+    yield from parser.finish()
@@ -0,0 +1,225 @@
+"""
+Модуль декодирует тела HTTP-ответов без определения кодировки на каждом ответе.
+
+Если кодировка не указана в Content-Type, requests и aiohttp определяют её
+по всему телу (charset-normalizer), что на больших страницах занимает
+миллисекунды на каждый ответ. BodyDecoder определяет кодировку один раз —
+по <meta charset>, строгой попытке UTF-8 и только затем charset-normalizer —
+и кэширует её для адреса (origin + путь) и для origin; следующие ответы
+декодируются сразу. Кэш ограничен DECODE_CACHE_MAX_ENTRIES записями
+(вытесняются давно не использованные), поэтому декодер процесса
+BODY_DECODER не растёт без предела. Тела, читаемые по частям, декодируются инкрементальным
+декодером (кодировка определяется по первой части). Время декодирования
+учитывается в статистике.
+
+Классы:
+    BodyDecoder – декодер с кэшем кодировок и статистикой.
+
+Функции:
+    header_charset – кодировка из заголовка Content-Type.
+    sniff_encoding – определение кодировки по содержимому.
+
+Объекты:
+    BODY_DECODER – декодер процесса (для запросов вне скана).
+"""
+
+import codecs
+import re
+from collections import OrderedDict
+from threading import Lock
+from time import perf_counter
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from charset_normalizer import from_bytes
+
+from .urls import origin_of
+from src.config import (
+    DECODE_SNIFF_BYTES,
+    DECODE_FALLBACK_ENCODING,
+    DECODE_CACHE_MAX_ENTRIES,
+)
+
+CHARSET_RE = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+META_CHARSET_RE = re.compile(
+    rb"<meta[^>]+charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE
+)
+
+
+def _known(encoding: Optional[str]) -> Optional[str]:
+    """Возвращает каноническое имя кодировки или None, если она неизвестна."""
+    if not encoding:
+        return None
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return None
+
+
+def header_charset(content_type: Optional[str]) -> Optional[str]:
+    """Возвращает кодировку, явно указанную в Content-Type, или None."""
+    match = CHARSET_RE.search(content_type or "")
+    return _known(match.group(1)) if match else None
+
+
+def sniff_encoding(content: bytes) -> str:
+    """
+    Определяет кодировку тела: <meta charset>, затем строгий UTF-8,
+    затем charset-normalizer по первым DECODE_SNIFF_BYTES байтам.
+    """
+    match = META_CHARSET_RE.search(content[:DECODE_SNIFF_BYTES])
+    encoding = _known(match.group(1).decode("ascii")) if match else None
+    if encoding:
+        return encoding
+    try:
+        content.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    best = from_bytes(content[:DECODE_SNIFF_BYTES]).best()
+    return _known(best.encoding if best else None) or DECODE_FALLBACK_ENCODING
+
+
+def endpoint_of(url: Optional[str]) -> str:
+    """Возвращает адрес без query и fragment (origin + путь)."""
+    parts = urlsplit(url or "")
+    return origin_of(url) + parts.path
+
+
+class BodyDecoder:
+    """
+    Декодер тел ответов с кэшем определённых кодировок.
+
+    Потокобезопасен. Статистика: сколько тел декодировано по заголовку,
+    по кэшу, как ASCII и с определением кодировки, и суммарное время
+    декодирования.
+    """
+
+    def __init__(self, max_entries: int = DECODE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._by_endpoint: "OrderedDict[str, str]" = OrderedDict()
+        self._by_origin: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = Lock()
+        self.stats = {
+            "header": 0,
+            "cached": 0,
+            "ascii": 0,
+            "sniffed": 0,
+            "seconds": 0.0,
+        }
+
+    def _encoding(
+        self, url: Optional[str], content: bytes, content_type: Optional[str]
+    ) -> Tuple[str, str]:
+        """Возвращает кодировку тела и источник, из которого она получена."""
+        encoding = header_charset(content_type)
+        if encoding:
+            return encoding, "header"
+        endpoint, origin = endpoint_of(url), origin_of(url)
+        with self._lock:
+            encoding = self._cached(self._by_endpoint, endpoint) or self._cached(
+                self._by_origin, origin
+            )
+        if encoding:
+            return encoding, "cached"
+        if content.isascii():
+            # ASCII-тело (в т.ч. пустое) ничего не говорит о кодировке адреса
+            return "ascii", "ascii"
+        encoding = sniff_encoding(content)
+        with self._lock:
+            self._store(self._by_endpoint, endpoint, encoding)
+            if origin not in self._by_origin:
+                self._store(self._by_origin, origin, encoding)
+        return encoding, "sniffed"
+
+    @staticmethod
+    def _cached(cache: "OrderedDict[str, str]", key: str) -> Optional[str]:
+        """Возвращает кодировку из кэша, отмечая запись как использованную."""
+        encoding = cache.get(key)
+        if encoding is not None:
+            cache.move_to_end(key)
+        return encoding
+
+    def _store(self, cache: "OrderedDict[str, str]", key: str, encoding: str) -> None:
+        """Сохраняет кодировку, вытесняя давно не использованные записи."""
+        cache[key] = encoding
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    def decode(
+        self, url: Optional[str], content: Optional[bytes], content_type: Optional[str]
+    ) -> str:
+        """
+        Декодирует тело ответа.
+
+        Параметры:
+            url:          адрес ответа (ключ кэша кодировок)
+            content:      тело в байтах
+            content_type: значение заголовка Content-Type
+
+        Возвращает:
+            Тело в виде строки (недекодируемые байты заменяются).
+        """
+        start = perf_counter()
+        content = content or b""
+        encoding, source = self._encoding(url, content, content_type)
+        text = content.decode(encoding, errors="replace")
+        self._record(source, perf_counter() - start)
+        return text
+
+    def incremental(
+        self, url: Optional[str], first: bytes, content_type: Optional[str]
+    ) -> codecs.IncrementalDecoder:
+        """
+        Возвращает инкрементальный декодер для тела, читаемого по частям.
+
+        Параметры:
+            url:          адрес ответа (ключ кэша кодировок)
+            first:        первая часть тела
+            content_type: значение заголовка Content-Type
+
+        Возвращает:
+            Декодер для feed; ASCII в первой части не гарантирует ASCII
+            в остальных, поэтому вместо неё используется
+            DECODE_FALLBACK_ENCODING.
+        """
+        start = perf_counter()
+        encoding, source = self._encoding(url, first, content_type)
+        if source == "ascii":
+            encoding = DECODE_FALLBACK_ENCODING
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._record(source, perf_counter() - start)
+        return decoder
+
+    def feed(
+        self, decoder: codecs.IncrementalDecoder, chunk: bytes, final: bool = False
+    ) -> str:
+        """Декодирует очередную часть тела, учитывая время в статистике."""
+        start = perf_counter()
+        text = decoder.decode(chunk, final)
+        self._record(None, perf_counter() - start)
+        return text
+
+    def _record(self, source: Optional[str], elapsed: float) -> None:
+        with self._lock:
+            if source is not None:
+                self.stats[source] += 1
+            self.stats["seconds"] += elapsed
+
+    def decode_response(self, response: requests.Response) -> str:
+        """Декодирует тело ответа requests."""
+        return self.decode(
+            response.url, response.content, response.headers.get("content-type")
+        )
+
+    def to_dict(self) -> dict:
+        """Возвращает статистику декодирования для сводки скана."""
+        with self._lock:
+            stats = dict(self.stats)
+        seconds = stats.pop("seconds")
+        return {**stats, "decode_ms": round(seconds * 1000, 2)}
+
+
+BODY_DECODER = BodyDecoder()
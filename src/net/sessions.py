@@ -0,0 +1,209 @@
+"""
+Модуль предоставляет общий для процесса пул HTTP-соединений по origin.
+
+Каждый API-запрос получает собственную сессию requests (свои cookies и
+заголовки), но соединения к одному origin берутся из общего адаптера:
+keep-alive соединения переживают отдельные сканы, а размер пула
+соответствует параллельности сканера. Адаптеры, не использовавшиеся дольше
+SESSION_IDLE_TIMEOUT, закрываются.
+
+Классы:
+    PooledSession – сессия, не закрывающая общие адаптеры при close().
+    SessionPool   – пул адаптеров по origin.
+
+Объекты:
+    SESSION_POOL – пул процесса.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .urls import origin_of
+from src.config import (
+    DEFAULT_HEADER,
+    REQUEST_TIMEOUT,
+    SESSION_POOL_MAXSIZE,
+    SESSION_IDLE_TIMEOUT,
+    SESSION_PREWARM_CONNECTIONS,
+)
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _PoolEntry:
+    """Общий адаптер одного origin и учёт его использования."""
+
+    origin: str
+    adapter: HTTPAdapter
+    last_used: float = field(default_factory=monotonic)
+    in_use: int = 0
+    warmed: int = 0
+
+
+class PooledSession(requests.Session):
+    """
+    Сессия requests, использующая общий адаптер origin.
+
+    close() отключает общие адаптеры перед закрытием, поэтому их
+    соединения остаются в пуле для следующих сессий.
+    """
+
+    def __init__(self, pool: "SessionPool", entries: List[_PoolEntry]):
+        super().__init__()
+        self._pool = pool
+        self._entries = entries
+        self._closed = False
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for entry in self._entries:
+            self.adapters.pop(entry.origin + "/", None)
+        self._pool.release(self._entries)
+        super().close()
+
+
+class SessionPool:
+    """
+    Пул адаптеров requests по origin.
+
+    Параметры:
+        maxsize:      число keep-alive соединений на origin
+        idle_timeout: время простоя (сек), после которого адаптер закрывается
+    """
+
+    def __init__(
+        self,
+        maxsize: int = SESSION_POOL_MAXSIZE,
+        idle_timeout: float = SESSION_IDLE_TIMEOUT,
+    ):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self._entries: Dict[str, _PoolEntry] = {}
+        self._lock = Lock()
+
+    def _entry(self, origin: str) -> _PoolEntry:
+        """Возвращает (создавая при необходимости) запись origin; под блокировкой."""
+        entry = self._entries.get(origin)
+        if entry is None:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.maxsize)
+            entry = _PoolEntry(origin, adapter)
+            self._entries[origin] = entry
+        return entry
+
+    def session(self, url: str, headers: Optional[dict] = None) -> PooledSession:
+        """
+        Возвращает новую сессию с общим адаптером origin данного URL.
+
+        Сессию нужно закрыть (close() или with), чтобы пул учёл её освобождение.
+        """
+        self.evict_idle()
+        origin = origin_of(url)
+        with self._lock:
+            entry = self._entry(origin)
+            entry.in_use += 1
+            entry.last_used = monotonic()
+        session = PooledSession(self, [entry])
+        session.headers.update(DEFAULT_HEADER if headers is None else headers)
+        session.mount(origin + "/", entry.adapter)
+        return session
+
+    def release(self, entries: List[_PoolEntry]) -> None:
+        """Учитывает закрытие сессии, использовавшей записи entries."""
+        now = monotonic()
+        with self._lock:
+            for entry in entries:
+                entry.in_use = max(entry.in_use - 1, 0)
+                entry.last_used = now
+                if entry.in_use == 0:
+                    # между сканами сервер может закрыть соединения по таймауту
+                    entry.warmed = 0
+
+    def prewarm(
+        self,
+        session: requests.Session,
+        url: str,
+        connections: int = SESSION_PREWARM_CONNECTIONS,
+    ) -> int:
+        """
+        Заранее открывает keep-alive соединения к origin URL.
+
+        Отправляет до connections параллельных HEAD-запросов к корню origin;
+        пока адаптер используется, прогретые соединения повторно не прогреваются.
+        Живые соединения пула переиспользуются, новые открываются только
+        взамен закрытых сервером.
+
+        Возвращает:
+            Число успешно открытых соединений.
+        """
+        origin = origin_of(url)
+        with self._lock:
+            entry = self._entries.get(origin)
+            if entry is None:
+                return 0
+            needed = min(connections, self.maxsize) - entry.warmed
+            if needed <= 0:
+                return 0
+            entry.warmed += needed
+
+        def head(_) -> bool:
+            try:
+                session.head(
+                    origin + "/", timeout=REQUEST_TIMEOUT, allow_redirects=False
+                )
+                return True
+            except requests.RequestException:
+                return False
+
+        with ThreadPoolExecutor(max_workers=needed) as executor:
+            opened = sum(executor.map(head, range(needed)))
+        logger.debug(
+            "Connections prewarmed",
+            extra={"origin": origin, "requested": needed, "opened": opened},
+        )
+        return opened
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """
+        Закрывает адаптеры, не использовавшиеся дольше idle_timeout.
+
+        Возвращает:
+            Список origin, чьи адаптеры были закрыты.
+        """
+        now = monotonic() if now is None else now
+        with self._lock:
+            idle = [
+                entry
+                for entry in self._entries.values()
+                if entry.in_use == 0 and now - entry.last_used > self.idle_timeout
+            ]
+            for entry in idle:
+                del self._entries[entry.origin]
+        for entry in idle:
+            entry.adapter.close()
+        if idle:
+            logger.debug(
+                "Idle connection pools evicted",
+                extra={"origins": [entry.origin for entry in idle]},
+            )
+        return [entry.origin for entry in idle]
+
+    def to_dict(self) -> dict:
+        """Возвращает состояние пула для диагностики."""
+        with self._lock:
+            return {
+                entry.origin: {"in_use": entry.in_use, "warmed": entry.warmed}
+                for entry in self._entries.values()
+            }
+
+
+SESSION_POOL = SessionPool()
@@ -0,0 +1,15 @@
+"""
+Модуль содержит разбор URL, общий для сетевого слоя и сканера.
+
+Функции:
+    origin_of – возвращает origin (scheme://host:port) URL.
+"""
+
+from typing import Optional
+from urllib.parse import urlparse
+
+
+def origin_of(url: Optional[str]) -> str:
+    """Возвращает origin (scheme://netloc) для URL."""
+    parsed = urlparse(url or "")
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
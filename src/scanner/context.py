@@ -0,0 +1,342 @@
+"""
+Модуль предоставляет контекст одного сканирования — состояние, общее
+для всех единиц работы (форма, поле, payload) одного скана.
+
+Классы:
+    ScanStats   – потокобезопасные счётчики сканирования.
+    ScanContext – сессия, пул, контроллеры частоты и статистика скана.
+"""
+
+import asyncio
+import aiohttp
+import requests
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from .types import MatchType, Payload
+from .rate import RateController
+from .policy import ConfirmationPolicy, FieldState
+from .timing import LatencyWindow
+from .detectors import Baseline, BaselineProfile
+from .session_guard import AuthGuard
+from .csrf import TokenPool, TokenScope, token_fields
+from .streaming import StreamDetection
+from .memo import RequestMemo
+from .incremental import fingerprint_of
+from src.net.decoding import BodyDecoder
+from src.net.urls import origin_of
+from src.config import (
+    RATE_LIMIT,
+    RATE_ADAPTIVE,
+    RATE_MAX_RPS,
+    PROBE_FIELDS,
+    XSS_CANARY,
+    TIMING_CONFIRM,
+    CSRF_TOKENS,
+    STREAM_RESPONSES,
+    GROUP_TESTING,
+    GROUP_TEST_SIZE,
+    COLLAPSE_DUPLICATE_FORMS,
+    REQUEST_MEMO,
+    CSRF_POOL_SIZE,
+)
+
+Number = Union[int, float]
+
+
+class ScanStats:
+    """
+    Потокобезопасные именованные счётчики сканирования
+    (отправленные запросы, пропущенные запросы и т.п.).
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.counters: Dict[str, Number] = {}
+
+    def incr(self, name: str, value: Number = 1) -> None:
+        """Увеличивает счётчик name на value."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def get(self, name: str) -> Number:
+        """Возвращает значение счётчика (0, если он не заводился)."""
+        with self._lock:
+            return self.counters.get(name, 0)
+
+    def to_dict(self) -> Dict[str, Number]:
+        with self._lock:
+            return dict(self.counters)
+
+
+@dataclass
+class ScanContext:
+    """
+    Состояние одного скана.
+
+    Атрибуты:
+        session:       сессия requests синхронного пути
+        rate_limit:    минимальный интервал между запросами в секундах
+        adaptive_rate: использовать AIMD-контроллер частоты для каждого origin
+        executor:      пул потоков (None — последовательное сканирование)
+        timed_executor: пул полосы TIME_BASED payloads (None — общий путь)
+        async_session: сессия aiohttp асинхронного пути
+        semaphore:     ограничитель числа запросов в полёте (асинхронный путь)
+        timed_semaphore: ограничитель полосы TIME_BASED payloads (асинхронный путь)
+        policy:        политика досрочной остановки по подтверждённым находкам
+        probe_fields:  выполнять пробный этап перед перебором payloads поля
+        xss_canary:    отбирать XSS payloads по контекстам отражения маркера
+        group_testing: отправлять payload сразу в группу полей формы и делить
+                       сработавшую группу пополам (см. grouping.py)
+        group_size:    максимальный размер группы полей
+        collapse_duplicates: сканировать одинаковые формы один раз
+                       и переносить находки на копии (см. memo.py)
+        request_memo:  брать ответы на одинаковые отправки из memo
+        memo:          кэш ответов скана по содержимому запроса
+        form_copies:   копии объединённых форм по id представителя
+        failed_forms:  формы, проверенные не полностью (нет базового ответа,
+                       ошибка или отказ единицы работы), по id формы
+        timing_confirm: подтверждать TIME_BASED payloads по распределению
+                       задержек формы и последовательному тесту
+        auth_guard:    повторный вход при потере сессии (None — не отслеживается)
+        csrf_tokens:   выдавать каждому запросу свежий anti-CSRF токен
+        token_executor: пул предварительного получения токенов (None — токены
+                       запрашиваются по требованию)
+        decoder:       декодер тел ответов с кэшем кодировок и статистикой
+        stream_responses: читать тела ответов по частям с ограничением размера
+                       и проверять ответы на payloads по мере чтения
+        stats:         счётчики скана
+    """
+
+    session: Optional[requests.Session] = None
+    rate_limit: float = RATE_LIMIT
+    adaptive_rate: bool = RATE_ADAPTIVE
+    executor: Optional[Executor] = None
+    timed_executor: Optional[Executor] = None
+    async_session: Optional[aiohttp.ClientSession] = None
+    semaphore: Optional[asyncio.Semaphore] = None
+    timed_semaphore: Optional[asyncio.Semaphore] = None
+    policy: ConfirmationPolicy = field(default_factory=ConfirmationPolicy)
+    probe_fields: bool = PROBE_FIELDS
+    xss_canary: bool = XSS_CANARY
+    group_testing: bool = GROUP_TESTING
+    group_size: int = GROUP_TEST_SIZE
+    collapse_duplicates: bool = COLLAPSE_DUPLICATE_FORMS
+    request_memo: bool = REQUEST_MEMO
+    memo: RequestMemo = field(default_factory=RequestMemo)
+    form_copies: Dict[int, List[dict]] = field(default_factory=dict)
+    failed_forms: Dict[int, dict] = field(default_factory=dict)
+    timing_confirm: bool = TIMING_CONFIRM
+    decoder: BodyDecoder = field(default_factory=BodyDecoder)
+    stream_responses: bool = STREAM_RESPONSES
+    stats: ScanStats = field(default_factory=ScanStats)
+    rate_controllers: Dict[str, RateController] = field(default_factory=dict)
+    field_states: Dict[Tuple[int, str], FieldState] = field(default_factory=dict)
+    latency_windows: Dict[int, Tuple[dict, LatencyWindow]] = field(default_factory=dict)
+    auth_guard: Optional[AuthGuard] = None
+    csrf_tokens: bool = CSRF_TOKENS
+    csrf_pool_size: int = CSRF_POOL_SIZE
+    token_executor: Optional[Executor] = None
+    token_pools: Dict[int, Tuple[dict, Optional[TokenPool]]] = field(
+        default_factory=dict
+    )
+    token_scopes: Dict[str, TokenScope] = field(default_factory=dict)
+    baselines: Dict[int, Tuple[int, Union[Future, asyncio.Future]]] = field(
+        default_factory=dict
+    )
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    @staticmethod
+    def is_timed(payload: Optional[Payload]) -> bool:
+        """Проверяет, относится ли payload к полосе TIME_BASED."""
+        return payload is not None and payload.match_type == MatchType.TIME_BASED
+
+    def executor_for(self, payload: Payload) -> Optional[Executor]:
+        """Возвращает пул, в котором выполняется единица работы payload."""
+        if self.timed_executor is not None and self.is_timed(payload):
+            return self.timed_executor
+        return self.executor
+
+    def semaphore_for(self, payload: Optional[Payload]) -> asyncio.Semaphore:
+        """Возвращает семафор полосы, к которой относится запрос payload."""
+        if self.timed_semaphore is not None and self.is_timed(payload):
+            return self.timed_semaphore
+        return self.semaphore
+
+    def rate_controller(self, url: Optional[str]) -> Optional[RateController]:
+        """
+        Возвращает контроллер частоты для origin данного URL.
+
+        Если адаптивное ограничение выключено, возвращает None — тогда
+        используется фиксированная задержка rate_limit.
+        """
+        if not self.adaptive_rate:
+            return None
+        origin = origin_of(url)
+        with self._lock:
+            controller = self.rate_controllers.get(origin)
+            if controller is None:
+                max_rps = RATE_MAX_RPS
+                if self.rate_limit > 0:
+                    max_rps = min(max_rps, 1.0 / self.rate_limit)
+                controller = RateController(origin, max_rps=max_rps)
+                self.rate_controllers[origin] = controller
+            return controller
+
+    def field_state(self, form: dict, field: dict) -> FieldState:
+        """Возвращает состояние поля формы, общее для всех его единиц работы."""
+        key = (id(form), field.get("name"))
+        with self._lock:
+            state = self.field_states.get(key)
+            if state is None:
+                state = FieldState(form.get("form_id"), field.get("name"))
+                self.field_states[key] = state
+            return state
+
+    def latency_window(self, form: dict) -> LatencyWindow:
+        """Возвращает окно задержек формы, общее для всех её запросов."""
+        with self._lock:
+            entry = self.latency_windows.get(id(form))
+            if entry is None:
+                entry = (form, LatencyWindow())
+                self.latency_windows[id(form)] = entry
+            return entry[1]
+
+    def token_pool(self, form: dict) -> Optional[TokenPool]:
+        """
+        Возвращает пул anti-CSRF токенов формы или None, если форма
+        не содержит полей-токенов или неизвестна страница формы.
+
+        Пулы форм одного origin делят TokenScope: если токены окажутся
+        сессионными, формы origin получают их по очереди.
+        """
+        if not self.csrf_tokens:
+            return None
+        with self._lock:
+            entry = self.token_pools.get(id(form))
+            if entry is None:
+                fields = token_fields(form)
+                page_url = (form.get("meta") or {}).get("page_url")
+                pool = None
+                if fields and page_url:
+                    origin = origin_of(page_url)
+                    scope = self.token_scopes.get(origin)
+                    if scope is None:
+                        scope = self.token_scopes[origin] = TokenScope(origin)
+                    pool = TokenPool(page_url, fields, self.csrf_pool_size, scope)
+                entry = (form, pool)
+                self.token_pools[id(form)] = entry
+            return entry[1]
+
+    def stream_detection(
+        self, form: dict, baseline: Optional[Baseline], payload: Payload
+    ) -> Optional[StreamDetection]:
+        """
+        Возвращает пошаговую проверку ответа на payload или None, если тела
+        читаются целиком или базовый ответ неизвестен.
+        """
+        baseline = self.latest_baseline(form, baseline)
+        if not self.stream_responses or baseline is None:
+            return None
+        return StreamDetection(baseline, payload)
+
+    def latest_baseline(
+        self, form: dict, baseline: Optional[BaselineProfile]
+    ) -> Optional[BaselineProfile]:
+        """
+        Возвращает базовый ответ формы, перестроенный после повторного входа,
+        или baseline, если форма не перестраивалась.
+        """
+        with self._lock:
+            entry = self.baselines.get(id(form))
+        future = entry[1] if entry is not None else None
+        if future is None or not future.done() or future.cancelled():
+            return baseline
+        if future.exception() is not None:
+            return baseline
+        return future.result() or baseline
+
+    def rebuild_baseline(
+        self,
+        form: dict,
+        generation: int,
+        build: Callable[[], Optional[BaselineProfile]],
+    ) -> Optional[BaselineProfile]:
+        """
+        Перестраивает базовый ответ формы для поколения сессии generation.
+
+        Базовый ответ строится один раз на поколение: единицы работы,
+        обнаружившие потерю сессии одновременно, дожидаются общего результата.
+        """
+        with self._lock:
+            entry = self.baselines.get(id(form))
+            owner = entry is None or entry[0] < generation
+            if owner:
+                entry = (generation, Future())
+                self.baselines[id(form)] = entry
+        future = entry[1]
+        if owner:
+            try:
+                future.set_result(build())
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    async def rebuild_baseline_async(
+        self,
+        form: dict,
+        generation: int,
+        build: Callable[[], Awaitable[Optional[BaselineProfile]]],
+    ) -> Optional[BaselineProfile]:
+        """Асинхронный аналог rebuild_baseline."""
+        entry = self.baselines.get(id(form))
+        if entry is None or entry[0] < generation:
+            entry = (generation, asyncio.ensure_future(build()))
+            self.baselines[id(form)] = entry
+        return await asyncio.shield(entry[1])
+
+    def mark_failed(self, form: dict) -> None:
+        """
+        Отмечает форму как проверенную не полностью: её находки не
+        переносятся в инкрементальный скан, форма сканируется заново.
+        """
+        with self._lock:
+            self.failed_forms[id(form)] = form
+
+    def failed_fingerprints(self) -> List[str]:
+        """Возвращает отпечатки не полностью проверенных форм и их копий."""
+        with self._lock:
+            forms = list(self.failed_forms.values())
+        forms += [copy for form in forms for copy in self.form_copies.get(id(form), [])]
+        return sorted({fingerprint_of(form) for form in forms} - {None})
+
+    def report(self) -> dict:
+        """Возвращает сводку скана для включения в результат API."""
+        with self._lock:
+            controllers = list(self.rate_controllers.values())
+            states = list(self.field_states.values())
+            windows = list(self.latency_windows.values())
+        report = {
+            "counters": self.stats.to_dict(),
+            "decoding": self.decoder.to_dict(),
+            "rate_control": [c.to_dict() for c in controllers],
+            "fields": [s.to_dict() for s in states],
+            "latency": [
+                {"form_id": form.get("form_id"), **window.to_dict()}
+                for form, window in windows
+            ],
+        }
+        failed = self.failed_fingerprints()
+        if failed:
+            report["failed_forms"] = failed
+        if self.auth_guard is not None:
+            report["auth"] = self.auth_guard.to_dict()
+        if self.request_memo:
+            report["memo"] = self.memo.to_dict()
+        with self._lock:
+            pools = [pool for _, pool in self.token_pools.values() if pool]
+        if pools:
+            report["csrf"] = [pool.to_dict() for pool in pools]
+        return report
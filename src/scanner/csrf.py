@@ -0,0 +1,223 @@
+"""
+Модуль предоставляет пул одноразовых anti-CSRF токенов формы.
+
+Формы со скрытыми полями вида user_token отклоняют повторную отправку
+токена, полученного при извлечении формы. Для таких форм каждый запрос
+получает собственный токен: страница формы (meta["page_url"]) заранее
+запрашивается параллельно, а полученные токены складываются в пул.
+
+Некоторые приложения (например, DVWA) хранят в сессии только последний
+выданный токен — тогда заранее полученные токены отклоняются. Такой токен
+общий для всех форм сессии: получение токена для одной формы делает
+недействительным токен другой. Поэтому, увидев отказ, в последовательный
+режим переходят все пулы origin (TokenScope): токен запрашивается
+непосредственно перед отправкой под общей блокировкой origin.
+
+Классы:
+    TokenScope – общее состояние токенов одной сессии (origin).
+    TokenPool  – пул токенов одной формы.
+
+Функции:
+    is_token_field – проверяет, является ли поле anti-CSRF токеном.
+    token_fields   – имена полей-токенов формы.
+    parse_tokens   – значения полей-токенов из HTML страницы.
+"""
+
+import asyncio
+import re
+from collections import deque
+from html import unescape
+from threading import Lock
+from typing import Deque, Dict, List, Optional, Set
+
+from .models import ResponseSnapshot
+from src.net.urls import origin_of
+from src.config import (
+    CSRF_FIELD_PATTERN,
+    CSRF_POOL_SIZE,
+    CSRF_REJECTION_MARKERS,
+)
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+TOKEN_FIELD_RE = re.compile(CSRF_FIELD_PATTERN, re.IGNORECASE)
+INPUT_TAG_RE = re.compile(r"<input\b[^>]*>", re.IGNORECASE)
+ATTR_RE = re.compile(
+    r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE
+)
+
+
+def is_token_field(field: dict) -> bool:
+    """Скрытое поле, имя которого похоже на anti-CSRF токен."""
+    field_type = (field.get("type") or field.get("field_type") or "").lower()
+    name = field.get("name") or ""
+    return field_type == "hidden" and bool(TOKEN_FIELD_RE.search(name))
+
+
+def token_fields(form: dict) -> List[str]:
+    """Возвращает имена полей-токенов формы."""
+    return [f["name"] for f in form.get("inputs", []) if is_token_field(f)]
+
+
+def parse_tokens(html_text: str, fields: List[str]) -> Optional[Dict[str, str]]:
+    """
+    Извлекает значения полей-токенов из HTML без построения дерева.
+
+    Возвращает:
+        Словарь {имя поля: значение} или None, если какое-то поле не найдено.
+    """
+    wanted = set(fields)
+    tokens: Dict[str, str] = {}
+    for tag in INPUT_TAG_RE.finditer(html_text):
+        attrs = {
+            m.group(1).lower(): m.group(2) or m.group(3) or m.group(4) or ""
+            for m in ATTR_RE.finditer(tag.group(0))
+        }
+        name = attrs.get("name")
+        if name in wanted and name not in tokens:
+            tokens[name] = unescape(attrs.get("value", ""))
+            if len(tokens) == len(wanted):
+                return tokens
+    return None
+
+
+class TokenScope:
+    """
+    Общее состояние токенов одной сессии (origin).
+
+    Атрибуты:
+        origin:      origin страниц форм
+        serial:      токены сессионные: все пулы origin в последовательном режиме
+        serial_lock: блокировка пары «получение токена — отправка», общая
+                     для форм origin (async_lock — в асинхронном пути)
+    """
+
+    def __init__(self, origin: str):
+        self.origin = origin
+        self.serial = False
+        self.serial_lock = Lock()
+        self.async_lock = asyncio.Lock()
+
+
+class TokenPool:
+    """
+    Пул одноразовых токенов одной формы.
+
+    Пул не выполняет запросов сам: сканер запрашивает страницу формы,
+    передаёт токены в add и берёт их через take. Потокобезопасен.
+
+    Атрибуты:
+        page_url:    страница, с которой извлечена форма
+        fields:      имена полей-токенов
+        size:        сколько токенов держать заранее (0 — последовательный режим)
+        scope:       общее состояние токенов сессии (по умолчанию — своё
+                     для origin страницы)
+        serial:      последовательный режим (токен перед каждой отправкой)
+        serial_lock: блокировка пары «получение токена — отправка» для
+                     последовательного режима, общая для пулов scope
+                     (async_lock — в асинхронном пути)
+    """
+
+    def __init__(
+        self,
+        page_url: str,
+        fields: List[str],
+        size: int = CSRF_POOL_SIZE,
+        scope: Optional[TokenScope] = None,
+    ):
+        self.page_url = page_url
+        self.fields = fields
+        self.size = max(size, 0)
+        self.scope = scope or TokenScope(origin_of(page_url))
+        self.tasks: Set[asyncio.Task] = set()
+        self._tokens: Deque[Dict[str, str]] = deque()
+        self._pending = 0
+        self._lock = Lock()
+        self.stats = {"fetched": 0, "used": 0, "fetch_failed": 0, "rejected": 0}
+
+    @property
+    def serial(self) -> bool:
+        return self.size == 0 or self.scope.serial
+
+    @property
+    def serial_lock(self) -> Lock:
+        return self.scope.serial_lock
+
+    @property
+    def async_lock(self) -> asyncio.Lock:
+        return self.scope.async_lock
+
+    def parse(self, html_text: Optional[str]) -> Optional[Dict[str, str]]:
+        """Извлекает токены из страницы формы."""
+        tokens = parse_tokens(html_text or "", self.fields)
+        with self._lock:
+            self.stats["fetched" if tokens else "fetch_failed"] += 1
+        return tokens
+
+    def take(self) -> Optional[Dict[str, str]]:
+        """Возвращает заранее полученный токен или None, если пул пуст."""
+        with self._lock:
+            if self.serial:
+                # токены сессионные: полученные заранее уже недействительны
+                self._tokens.clear()
+            if not self._tokens:
+                return None
+            self.stats["used"] += 1
+            return self._tokens.popleft()
+
+    def reserve(self) -> int:
+        """
+        Резервирует недостающие до size предварительные запросы.
+
+        Возвращает:
+            Число запросов, которые нужно запустить; каждый должен
+            завершиться вызовом add.
+        """
+        with self._lock:
+            if self.serial:
+                return 0
+            missing = max(self.size - len(self._tokens) - self._pending, 0)
+            self._pending += missing
+            return missing
+
+    def add(self, tokens: Optional[Dict[str, str]]) -> None:
+        """Завершает предварительный запрос, добавляя полученный токен в пул."""
+        with self._lock:
+            self._pending = max(self._pending - 1, 0)
+            if tokens and not self.serial:
+                self._tokens.append(tokens)
+
+    def rejected(self, snapshot: Optional[ResponseSnapshot]) -> bool:
+        """
+        Проверяет, отклонил ли сервер токен; при отказе переводит все пулы
+        origin (scope) в последовательный режим.
+
+        Возвращает:
+            True, если ответ содержит признак отклонения токена.
+        """
+        if snapshot is None:
+            return False
+        body = (snapshot.body or "").lower()
+        if not any(marker in body for marker in CSRF_REJECTION_MARKERS):
+            return False
+        with self._lock:
+            self.stats["rejected"] += 1
+            switched = not self.serial
+            self.scope.serial = True
+            self._tokens.clear()
+        if switched:
+            logger.info(
+                "CSRF token rejected, switching to serial token fetching",
+                extra={"page_url": self.page_url, "fields": self.fields},
+            )
+        return True
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "page_url": self.page_url,
+                "fields": self.fields,
+                "serial": self.serial,
+                **self.stats,
+            }
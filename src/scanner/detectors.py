@@ -2,123 +2,380 @@
 Модуль предоставляет детекторы различных видов уязвимостей.
 Каждый детектор сравнивает базовый ответ с инжектированным.
 
+Базовый ответ передаётся детекторам как BaselineProfile — один раз
+вычисленные факты о нём (тело в нижнем регистре, сигнатуры SQL-ошибок
+и evidence-паттернов, токены, хэш). Детекторы принимают и обычный
+ResponseSnapshot.
+
+Классы:
+    BaselineProfile - заранее вычисленные факты о базовом ответе формы.
+
 Функции:
     run_detectors() - запускает все детекторы и возвращает список сработавших.
     detect_time_delay() - обнаруживает аномальную задержку ответа.
     detect_sql_error() - ищет признаки SQL-ошибок в теле ответа.
+    detect_evidence_patterns() - ищет evidence-паттерны payload в теле ответа.
+    as_profile() - возвращает BaselineProfile для снимка или профиля.
     detect_patterns() - ищет отражение полезной нагрузки (XSS).
+    find_reflections() - все вхождения вариантов payload в ответе.
+    reflection_contexts() - определяет контексты отражения маркера в ответе.
+    payload_contexts() - определяет контексты, в которых срабатывает XSS payload.
 """
 
 import re
-import html
-import urllib.parse
 import json
-from typing import List, Dict, Set
+from dataclasses import dataclass, field
+from typing import Callable, List, Dict, FrozenSet, Optional, Set, Tuple, Union
 
-from .types import Payload
-from .models import ResponseSnapshot
-from src.config import TIME_DELAY_THRESHOLD_MS, SQL_ERRORS_PATH
+from .types import Payload, MatchType, generate_payload_variants
+from .matching import SignatureMatcher
+from .models import ResponseSnapshot, normalized_body_hash
+from src.config import (
+    EVIDENCE_GENERIC_PATTERNS,
+    TIME_DELAY_THRESHOLD_MS,
+    SQL_ERRORS_PATH,
+)
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
 DEFAULT_CONTEXT_SIZE = 60
+EVIDENCE_CONTEXT_SIZE = 200
+# максимальное число смещений отражения, сохраняемых в находке
+MAX_REFLECTIONS = 50
 try:
     with open(SQL_ERRORS_PATH, "r", encoding="utf-8") as f:
         SQL_ERROR_LIST = [s.lower() for s in json.load(f)]
     logger.debug(f"Loaded {len(SQL_ERROR_LIST)} SQL error signatures")
 except Exception as e:
+    SQL_ERROR_LIST = []
     logger.exception(f"Failed to load SQL errors from {SQL_ERRORS_PATH}")
 
+TOKEN_RE = re.compile(r"\w+")
+GENERIC_EVIDENCE = frozenset(p.lower() for p in EVIDENCE_GENERIC_PATTERNS)
+
+
+SQL_ERROR_MATCHER = SignatureMatcher(SQL_ERROR_LIST)
+
+
+@dataclass
+class BaselineProfile:
+    """
+    Факты о базовом ответе формы, вычисленные один раз для всех
+    её полей и payloads.
+
+    Атрибуты:
+        snapshot:   исходный снимок базового ответа
+        lower_body: тело в нижнем регистре
+        sql_hits:   сигнатуры SQL-ошибок, присутствующие в теле
+        tokens:     множество слов тела (в нижнем регистре)
+        body_hash:  нормализованный хэш тела (см. normalized_body_hash)
+    """
+
+    snapshot: ResponseSnapshot
+    lower_body: str
+    sql_hits: FrozenSet[str]
+    tokens: FrozenSet[str]
+    body_hash: str
+    _contains: Dict[str, bool] = field(default_factory=dict, repr=False)
+    _signature_hits: Dict[SignatureMatcher, FrozenSet[str]] = field(
+        default_factory=dict, repr=False
+    )
+
+    @classmethod
+    def from_snapshot(cls, snapshot: ResponseSnapshot) -> "BaselineProfile":
+        body = snapshot.body or ""
+        lower_body = body.lower()
+        return cls(
+            snapshot=snapshot,
+            lower_body=lower_body,
+            sql_hits=frozenset(SQL_ERROR_MATCHER.hits(body)),
+            tokens=frozenset(TOKEN_RE.findall(lower_body)),
+            body_hash=normalized_body_hash(body),
+        )
+
+    @property
+    def body(self) -> str:
+        return self.snapshot.body or ""
+
+    @property
+    def url(self) -> str:
+        return self.snapshot.url
+
+    @property
+    def status_code(self) -> int:
+        return self.snapshot.status_code
+
+    @property
+    def response_time(self) -> float:
+        return self.snapshot.response_time
+
+    def contains(self, text: str) -> bool:
+        """Проверяет вхождение text в тело; результат кэшируется."""
+        found = self._contains.get(text)
+        if found is None:
+            found = text in self.body
+            self._contains[text] = found
+        return found
+
+    def signature_hits(self, matcher: SignatureMatcher) -> FrozenSet[str]:
+        """Возвращает сигнатуры matcher, найденные в теле; результат кэшируется."""
+        hits = self._signature_hits.get(matcher)
+        if hits is None:
+            hits = frozenset(matcher.hits(self.body))
+            self._signature_hits[matcher] = hits
+        return hits
+
+
+Baseline = Union[ResponseSnapshot, BaselineProfile]
+
+
+def as_profile(base: Baseline) -> BaselineProfile:
+    """Возвращает профиль базового ответа, строя его для обычного снимка."""
+    if isinstance(base, BaselineProfile):
+        return base
+    return BaselineProfile.from_snapshot(base)
+
+
+CONTEXT_TEXT = "text"
+CONTEXT_ATTRIBUTE = "attribute"
+CONTEXT_SCRIPT = "script"
+ALL_CONTEXTS = frozenset({CONTEXT_TEXT, CONTEXT_ATTRIBUTE, CONTEXT_SCRIPT})
+
+_TAG_START_RE = re.compile(r"<[a-z!/]", re.IGNORECASE)
+_SCRIPT_BREAK_RE = re.compile(r"^[\"']\s*[;)+-]|</script", re.IGNORECASE)
+
 
-def generate_payload_variants(payload: str) -> Set[str]:
-    """Возвращает набор вариантов payload для поиска отражения."""
-    variants = {payload}
-    try:
-        variants.add(html.escape(payload))
-        variants.add(urllib.parse.quote_plus(payload))
-    except Exception:
-        pass
-    variants.add(re.sub(r"\s+", "", payload))
-    variants.add(re.sub(r"\W+", "", payload))
-    variants.discard("")
-    return variants
-
-
-def extract_context(
-    text: str, substring: str, context_size: int = DEFAULT_CONTEXT_SIZE
-) -> str:
-    """Возвращает фрагмент текста вокруг найденного substring."""
-    if not text or not substring:
-        return ""
-    idx = text.find(substring)
-    if idx == -1:
-        return ""
-    start = max(0, idx - context_size)
-    end = min(idx + len(substring) + context_size, len(text))
-    return text[start:end]
+def reflection_contexts(body: str, marker: str) -> Set[str]:
+    """
+    Определяет, где в HTML отражается маркер.
+
+    Возвращает:
+        Подмножество {"text", "attribute", "script"}; пустое множество,
+        если маркер не отражается.
+    """
+    contexts: Set[str] = set()
+    if not body or not marker:
+        return contexts
+    lower = body.lower()
+    for variant in generate_payload_variants(marker.lower()):
+        idx = lower.find(variant)
+        while idx != -1:
+            script_open = lower.rfind("<script", 0, idx)
+            if script_open != -1 and lower.rfind("</script", script_open, idx) == -1:
+                contexts.add(CONTEXT_SCRIPT)
+            elif lower.rfind("<", 0, idx) > lower.rfind(">", 0, idx):
+                contexts.add(CONTEXT_ATTRIBUTE)
+            else:
+                contexts.add(CONTEXT_TEXT)
+            idx = lower.find(variant, idx + len(variant))
+    return contexts
+
+
+def payload_contexts(payload: str) -> Set[str]:
+    """
+    Определяет контексты отражения, в которых XSS payload может сработать.
+
+    Payload, вводящий новый тег, подходит для текста; начинающийся с кавычки
+    или содержащий javascript: — для атрибута; разрывающий строку или блок
+    <script> — для скрипта. Если ни одно правило не подошло, payload
+    считается подходящим для любого контекста.
+    """
+    contexts: Set[str] = set()
+    stripped = payload.lstrip()
+    if _TAG_START_RE.search(payload):
+        contexts.add(CONTEXT_TEXT)
+    if stripped[:1] in ("'", '"') or "javascript:" in payload.lower():
+        contexts.add(CONTEXT_ATTRIBUTE)
+    if _SCRIPT_BREAK_RE.search(stripped):
+        contexts.add(CONTEXT_SCRIPT)
+    return contexts or set(ALL_CONTEXTS)
+
+
+def find_reflections(
+    body: str, payload: Payload, limit: int = MAX_REFLECTIONS
+) -> List[Tuple[int, str]]:
+    """
+    Находит все вхождения вариантов payload в body.
+
+    Варианты берутся из кэша Payload.variants. Вхождения перечисляются
+    через str.find: в CPython это заметно быстрее объединённого
+    регулярного выражения по тем же вариантам.
+
+    Возвращает:
+        Список пар (смещение, вариант) в порядке смещений, не длиннее limit.
+    """
+    hits: List[Tuple[int, str]] = []
+    if not body:
+        return hits
+    for variant in payload.variants:
+        idx = body.find(variant)
+        found = 0
+        while idx != -1 and found < limit:
+            hits.append((idx, variant))
+            found += 1
+            idx = body.find(variant, idx + 1)
+    hits.sort(key=lambda hit: (hit[0], -len(hit[1])))
+    return hits[:limit]
 
 
 def detect_patterns(
-    base: ResponseSnapshot, injected: ResponseSnapshot, payload: Payload
+    base: Baseline, injected: ResponseSnapshot, payload: Payload
 ) -> Dict:
-    """Ищет отражение полезной нагрузки в ответе."""
-    base_body = base.body or ""
-    inj_body = injected.body or ""
+    """
+    Ищет отражение полезной нагрузки в ответе.
 
-    variants = generate_payload_variants(payload.payload)
+    Учитываются только варианты, которых нет в базовом ответе; в результат
+    попадают все смещения отражений (не больше MAX_REFLECTIONS).
+    """
+    base = as_profile(base)
+    inj_body = injected.body or ""
 
-    for variant in variants:
-        if variant and variant in inj_body and variant not in base_body:
-            return {
-                "matched": True,
-                "evidence": extract_context(inj_body, variant),
-            }
+    hits = [
+        (offset, variant)
+        for offset, variant in find_reflections(inj_body, payload)
+        if not base.contains(variant)
+    ]
+    if not hits:
+        return {"matched": False, "evidence": ""}
 
-    return {"matched": False, "evidence": ""}
+    offset, variant = hits[0]
+    start = max(0, offset - DEFAULT_CONTEXT_SIZE)
+    end = min(offset + len(variant) + DEFAULT_CONTEXT_SIZE, len(inj_body))
+    return {
+        "matched": True,
+        "evidence": inj_body[start:end],
+        "offsets": [o for o, _ in hits],
+        "variants": sorted({v for _, v in hits}),
+    }
 
 
 def detect_sql_error(
-    base: ResponseSnapshot, injected: ResponseSnapshot, payload: Payload
+    base: Baseline, injected: ResponseSnapshot, payload: Payload
 ) -> Dict:
     """Ищет признаки SQL-ошибок в injected-ответе, которых нет в base."""
-    base_body = base.body or ""
     inj_body = injected.body or ""
+    base_hits = as_profile(base).sql_hits
+    new_hits = {
+        sig: span
+        for sig, span in SQL_ERROR_MATCHER.hits(inj_body).items()
+        if sig not in base_hits
+    }
+    if not new_hits:
+        return {"matched": False, "evidence": ""}
 
-    for signature in SQL_ERROR_LIST:
-        match_inj = re.search(signature, inj_body, flags=re.IGNORECASE)
-        if match_inj and not re.search(signature, base_body, flags=re.IGNORECASE):
-            start = max(match_inj.start() - 200, 0)
-            end = min(match_inj.end() + 200, len(inj_body))
-            return {
-                "matched": True,
-                "evidence": inj_body[start:end],
-            }
+    start, end = min(new_hits.values())
+    return {
+        "matched": True,
+        "evidence": _evidence_window(inj_body, start, end),
+        "signatures": sorted(new_hits),
+    }
 
-    return {"matched": False, "evidence": ""}
+
+def detect_evidence_patterns(
+    base: Baseline, injected: ResponseSnapshot, payload: Payload
+) -> Dict:
+    """
+    Ищет evidence-паттерны payload, появившиеся только после инъекции.
+
+    Паттерны базового ответа ищутся общим для всего PayloadSet сопоставителем
+    один раз на профиль; в ответе на payload проверяются только паттерны
+    самого payload (без содержащихся в тексте payload, см.
+    Payload.evidence_signatures), которых нет в базовом ответе. Общие слова
+    (EVIDENCE_GENERIC_PATTERNS) попадают в находку только вместе с новым
+    специфичным паттерном.
+    """
+    patterns = payload.evidence_signatures
+    if not patterns:
+        return {"matched": False, "evidence": ""}
+
+    base_hits = as_profile(base).signature_hits(payload.evidence_matcher)
+    inj_body = injected.body or ""
+    inj_lower = inj_body.lower()
+    new_hits = {}
+    for pattern in patterns:
+        if pattern in base_hits:
+            continue
+        idx = inj_lower.find(pattern)
+        if idx != -1:
+            new_hits[pattern] = (idx, idx + len(pattern))
+    if all(pattern in GENERIC_EVIDENCE for pattern in new_hits):
+        return {"matched": False, "evidence": ""}
+
+    start, end = min(new_hits.values())
+    return {
+        "matched": True,
+        "evidence": _evidence_window(inj_body, start, end),
+        "patterns": sorted(new_hits),
+    }
+
+
+def _evidence_window(body: str, start: int, end: int) -> str:
+    """
+    Возвращает фрагмент body вокруг найденного совпадения.
+
+    Позиции совпадений относятся к телу в нижнем регистре; их длины
+    расходятся только для редких символов Unicode.
+    """
+    source = body
+    if len(body.lower()) != len(body):
+        source = body.lower()
+    start = max(start - EVIDENCE_CONTEXT_SIZE, 0)
+    end = min(end + EVIDENCE_CONTEXT_SIZE, len(source))
+    return source[start:end]
 
 
 def detect_time_delay(
-    base: ResponseSnapshot, injected: ResponseSnapshot, payload: Payload
+    base: Baseline, injected: ResponseSnapshot, payload: Payload
 ) -> Dict:
-    """Сравнивает время ответа базового и инжектированного запросов."""
-    delay = injected.response_time - base.response_time
-    if delay > TIME_DELAY_THRESHOLD_MS:
-        return {"matched": True, "evidence": f"Time delay: {delay:.0f} ms"}
+    """
+    Сравнивает время ответа базового и инжектированного запросов.
+
+    Применяется только к TIME_BASED payloads; время ответа в снимках —
+    в секундах. Сканер по умолчанию заменяет эту проверку статистическим
+    подтверждением (см. timing.py).
+    """
+    if payload.match_type != MatchType.TIME_BASED:
+        return {"matched": False, "evidence": ""}
+    delay_ms = (injected.response_time - base.response_time) * 1000
+    if delay_ms > TIME_DELAY_THRESHOLD_MS:
+        return {"matched": True, "evidence": f"Time delay: {delay_ms:.0f} ms"}
     return {"matched": False, "evidence": ""}
 
 
-DETECTORS = (detect_sql_error, detect_patterns, detect_time_delay)
+DETECTORS = (
+    detect_sql_error,
+    detect_patterns,
+    detect_time_delay,
+    detect_evidence_patterns,
+)
 
 
 def run_detectors(
-    base: ResponseSnapshot, injected: ResponseSnapshot, payload: Payload
+    base: Baseline,
+    injected: ResponseSnapshot,
+    payload: Payload,
+    timed: bool = True,
+    streamed: Optional[Dict[Callable, Dict]] = None,
 ) -> List[Dict]:
-    """Запускает все детекторы и возвращает список сработавших."""
+    """
+    Запускает все детекторы и возвращает список сработавших.
+
+    При timed=False detect_time_delay не запускается — задержку проверяет
+    вызывающий код. Результаты из streamed (детекторы, уже выполненные
+    при потоковом чтении, см. streaming.StreamDetection) не вычисляются
+    повторно.
+    """
+    base = as_profile(base)
     findings = []
     for detector in DETECTORS:
+        if not timed and detector is detect_time_delay:
+            continue
         try:
-            finding = detector(base, injected, payload)
+            if streamed is not None and detector in streamed:
+                finding = streamed[detector]
+            else:
+                finding = detector(base, injected, payload)
             if finding and finding.get("matched"):
                 findings.append(finding)
         except Exception as e:
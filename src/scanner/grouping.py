@@ -0,0 +1,64 @@
+"""
+Модуль планирует групповое тестирование полей формы.
+
+Обычно каждый запрос меняет одно поле, и форма с F полями стоит F × P
+запросов. В режиме группового тестирования payload подставляется сразу
+в группу полей; если ни один детектор не сработал, все поля группы
+считаются проверенными этим payload. Сработавшая группа делится пополам,
+пока не останутся отдельные поля, — находки по-прежнему относятся
+к конкретному полю. Когда уязвимых полей мало, число запросов
+сокращается почти в размер группы раз.
+
+Группы составляются после пробного этапа: payload попадает в группу
+только вместе с полями, для которых он отобран. TIME_BASED payloads в
+группы не объединяются — задержки нескольких полей складывались бы
+в одном ответе.
+
+Функции:
+    group_units – разбивает отобранные payloads полей на группы.
+    split_group – делит сработавшую группу пополам.
+"""
+
+from typing import Callable, List, Sequence, Tuple
+
+from .types import Payload
+from src.config import GROUP_TEST_SIZE
+
+GroupUnit = Tuple[Payload, List[dict]]
+
+
+def group_units(
+    selected: Sequence[Tuple[dict, Sequence[Payload]]],
+    size: int = GROUP_TEST_SIZE,
+    separate: Callable[[Payload], bool] = lambda payload: False,
+) -> List[GroupUnit]:
+    """
+    Составляет групповые единицы работы формы.
+
+    Параметры:
+        selected: пары (поле, payloads, отобранные для него пробным этапом)
+        size:     максимальный размер группы (1 — поля по одному)
+        separate: payloads, которые отправляются в поля по одному
+
+    Возвращает:
+        Список пар (payload, поля группы) в порядке первого появления
+        payload; поля внутри группы идут в порядке формы.
+    """
+    fields_by_payload = {}
+    for field, payloads in selected:
+        for payload in payloads:
+            fields_by_payload.setdefault(id(payload), (payload, []))[1].append(field)
+
+    size = max(size, 1)
+    units: List[GroupUnit] = []
+    for payload, fields in fields_by_payload.values():
+        step = 1 if separate(payload) else size
+        for start in range(0, len(fields), step):
+            units.append((payload, fields[start : start + step]))
+    return units
+
+
+def split_group(fields: List[dict]) -> Tuple[List[dict], List[dict]]:
+    """Делит группу полей пополам для поиска сработавшего поля."""
+    middle = (len(fields) + 1) // 2
+    return fields[:middle], fields[middle:]
@@ -0,0 +1,166 @@
+"""
+Модуль планирует инкрементальный повторный скан цели.
+
+Каждая форма получает отпечаток — хэш нормализованного адреса отправки,
+метода и схемы полей (имя и тип, без значений: значения anti-CSRF токенов
+меняются при каждой загрузке страницы). Отпечатки и находки форм
+сохраняются вместе со сканом (см. storage/db.py). При инкрементальном скане
+payloads отправляются только в новые и изменившиеся формы, а находки
+неизменившихся форм переносятся из предыдущего скана с пометкой
+details["reused_from_scan"].
+
+Предыдущий скан используется, только если он выполнялся с тем же набором
+payloads (см. payloads_digest). Формы, проверенные в нём не полностью
+(статус FORM_FAILED: нет базового ответа, ошибка или отказ единицы работы),
+сканируются заново.
+
+Функции:
+    normalize_action  – нормализует адрес отправки формы.
+    form_fingerprint  – отпечаток формы.
+    fingerprint_forms – записывает отпечатки в meta форм.
+    fingerprint_of    – записанный отпечаток формы.
+    payloads_digest   – отпечаток набора payloads.
+    split_forms       – делит формы на изменившиеся и неизменившиеся.
+    form_results      – находки скана, сгруппированные по формам.
+"""
+
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .types import Payload
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# статус формы в сохранённом скане
+FORM_SCANNED = "scanned"
+FORM_FAILED = "failed"
+
+
+def normalize_action(url: Optional[str]) -> str:
+    """
+    Нормализует адрес отправки: схема и хост в нижнем регистре, без порта
+    по умолчанию и фрагмента, параметры запроса отсортированы.
+    """
+    parts = urlsplit(url or "")
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def form_fingerprint(form: dict) -> str:
+    """Возвращает отпечаток формы: адрес, метод и схема полей."""
+    schema = sorted(
+        (
+            str(f.get("name") or ""),
+            str(f.get("type") or f.get("field_type") or "").lower(),
+        )
+        for f in form.get("inputs", [])
+    )
+    method = (form.get("method") or "GET").upper()
+    text = "\n".join(
+        [normalize_action(form.get("action")), method]
+        + [f"{name}:{field_type}" for name, field_type in schema]
+    )
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def fingerprint_forms(forms: Iterable[dict]) -> None:
+    """Записывает отпечатки в form["meta"]["fingerprint"]."""
+    for form in forms:
+        form.setdefault("meta", {})["fingerprint"] = form_fingerprint(form)
+
+
+def fingerprint_of(form: dict) -> Optional[str]:
+    """Возвращает записанный отпечаток формы или None."""
+    return (form.get("meta") or {}).get("fingerprint")
+
+
+def payloads_digest(payloads: Iterable[Payload]) -> str:
+    """
+    Возвращает отпечаток набора payloads по их содержимому (текст, тип,
+    способ срабатывания, evidence-паттерны): правка payload с прежним
+    идентификатором меняет отпечаток.
+    """
+    items = sorted(
+        json.dumps(p.to_dict(), sort_keys=True, ensure_ascii=False) for p in payloads
+    )
+    return hashlib.sha1("\n".join(items).encode("utf-8")).hexdigest()
+
+
+def split_forms(
+    forms: List[dict], previous: Dict[str, List[dict]], scan_id: int
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Делит формы на требующие скана и неизменившиеся.
+
+    Находки одного отпечатка переносятся один раз, даже если на странице
+    несколько форм с этим отпечатком, — так набор находок повторяет
+    предыдущий скан.
+
+    Параметры:
+        forms:    формы с отпечатками (см. fingerprint_forms)
+        previous: находки полностью проверенных форм предыдущего скана по
+                  отпечаткам (не полностью проверенных форм в нём нет,
+                  см. get_latest_scan_forms — они сканируются заново)
+        scan_id:  идентификатор предыдущего скана
+
+    Возвращает:
+        Кортеж (новые и изменившиеся формы; перенесённые находки
+        неизменившихся форм с пометкой reused_from_scan — у находок,
+        уже перенесённых ранее, сохраняется исходный скан).
+    """
+    changed: List[dict] = []
+    reused: List[dict] = []
+    carried = set()
+    for form in forms:
+        fingerprint = fingerprint_of(form)
+        findings = previous.get(fingerprint)
+        if findings is None:
+            changed.append(form)
+            continue
+        if fingerprint in carried:
+            continue
+        carried.add(fingerprint)
+        for finding in findings:
+            details = {"reused_from_scan": scan_id, **finding.get("details", {})}
+            reused.append({**finding, "details": details})
+    return changed, reused
+
+
+def form_results(
+    forms: List[dict], findings: List[dict], failed: Iterable[str] = ()
+) -> List[dict]:
+    """
+    Группирует находки скана по формам для сохранения.
+
+    Параметры:
+        forms:    формы скана с отпечатками
+        findings: находки скана (включая перенесённые)
+        failed:   отпечатки форм, проверенных не полностью
+
+    Возвращает:
+        Список словарей {fingerprint, form_id, action, status, findings} —
+        по одному на каждый уникальный отпечаток.
+    """
+    failed = set(failed)
+    by_fingerprint: Dict[str, dict] = {}
+    for form in forms:
+        fingerprint = fingerprint_of(form)
+        if fingerprint and fingerprint not in by_fingerprint:
+            by_fingerprint[fingerprint] = {
+                "fingerprint": fingerprint,
+                "form_id": form.get("form_id"),
+                "action": form.get("action"),
+                "status": FORM_FAILED if fingerprint in failed else FORM_SCANNED,
+                "findings": [],
+            }
+    for finding in findings:
+        entry = by_fingerprint.get(finding.get("form_fingerprint"))
+        if entry is not None:
+            entry["findings"].append(finding)
+    return list(by_fingerprint.values())
@@ -0,0 +1,64 @@
+"""
+Модуль предоставляет поиск набора строковых сигнатур в теле ответа.
+
+Классы:
+    SignatureMatcher – скомпилированный поиск всех сигнатур за один проход.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+
+class SignatureMatcher:
+    """
+    Поиск всех сигнатур в теле ответа за один проход.
+
+    Сигнатуры — литералы в нижнем регистре; ".*" внутри сигнатуры означает
+    «любые символы в пределах строки». Поиск идёт по телу в нижнем регистре
+    (это заметно быстрее re.IGNORECASE). Объединённое выражение из опережающих
+    проверок находит позиции, с которых начинается хотя бы одна сигнатура,
+    после чего на каждой такой позиции проверяются отдельные сигнатуры — так
+    находятся и сигнатуры, перекрывающиеся с другими (например, "mysql" и
+    "mysql_fetch_array").
+    """
+
+    def __init__(self, signatures: List[str]):
+        self.signatures = list(dict.fromkeys(s.lower() for s in signatures if s))
+        self.patterns = [re.compile(self.to_regex(sig)) for sig in self.signatures]
+        self.combined = None
+        if self.patterns:
+            first_chars = "".join(sorted({re.escape(s[0]) for s in self.signatures}))
+            alternation = "|".join(p.pattern for p in self.patterns)
+            self.combined = re.compile(f"(?=[{first_chars}])(?={alternation})")
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    @staticmethod
+    def to_regex(signature: str) -> str:
+        """Экранирует сигнатуру, сохраняя ".*" как шаблон в пределах строки."""
+        return ".*?".join(re.escape(part) for part in signature.split(".*"))
+
+    def hits(self, body: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Возвращает все сигнатуры, найденные в body.
+
+        Возвращает:
+            Словарь {сигнатура: (start, end)} первого вхождения каждой
+            сигнатуры; позиции относятся к body.lower().
+        """
+        found: Dict[str, Tuple[int, int]] = {}
+        if not body or self.combined is None:
+            return found
+        lower = body.lower()
+        for candidate in self.combined.finditer(lower):
+            pos = candidate.start()
+            for signature, pattern in zip(self.signatures, self.patterns):
+                if signature in found:
+                    continue
+                match = pattern.match(lower, pos)
+                if match:
+                    found[signature] = match.span()
+            if len(found) == len(self.signatures):
+                break
+        return found
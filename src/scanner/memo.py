@@ -0,0 +1,138 @@
+"""
+Модуль устраняет повторные запросы в пределах одного скана.
+
+Страницы часто повторяют одну и ту же форму (поиск в шапке сайта и т.п.):
+без объединения каждая копия получает собственный базовый запрос и полный
+перебор payloads. Формы с одинаковыми методом, адресом и полями
+объединяются до скана, а находки представителя переносятся на копии.
+
+Одинаковые отправки внутри скана (один и тот же payload у разных записей
+PayloadSet, повторный базовый запрос) обслуживаются RequestMemo — ответ
+хранится по методу, адресу и канонизированным данным.
+
+Классы:
+    RequestMemo – кэш ответов скана по содержимому запроса.
+
+Функции:
+    request_key    – ключ запроса (метод, адрес, канонизированные данные).
+    form_signature – признак одинаковых форм.
+    collapse_forms – объединяет одинаковые формы.
+    copy_findings  – переносит находки представителя на копию формы.
+"""
+
+from collections import OrderedDict
+from dataclasses import replace
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from .models import Finding, ResponseSnapshot
+from .incremental import fingerprint_of
+from src.config import REQUEST_MEMO_MAX_ENTRIES
+
+RequestKey = Tuple[str, str, Tuple[Tuple[str, str], ...]]
+
+
+def request_key(form: dict, data: dict) -> RequestKey:
+    """Возвращает ключ отправки формы с данными data."""
+    method = (form.get("method") or "GET").upper()
+    items = tuple(sorted((str(k), str(v)) for k, v in data.items()))
+    return method, form.get("action") or "", items
+
+
+def form_signature(form: dict) -> Tuple:
+    """
+    Возвращает признак формы: метод, адрес и поля (имя, тип, значение).
+
+    Формы с одинаковым признаком дают одинаковые запросы при любом payload.
+    """
+    fields = tuple(
+        sorted(
+            (
+                str(f.get("name") or ""),
+                str(f.get("type") or f.get("field_type") or ""),
+                str(f.get("value") or ""),
+            )
+            for f in form.get("inputs", [])
+        )
+    )
+    return (form.get("method") or "GET").upper(), form.get("action") or "", fields
+
+
+def collapse_forms(forms: List[dict]) -> Tuple[List[dict], Dict[int, List[dict]]]:
+    """
+    Объединяет одинаковые формы (см. form_signature).
+
+    Возвращает:
+        Кортеж (формы для скана в исходном порядке; словарь
+        {id(представителя): копии формы}).
+    """
+    representatives: Dict[Tuple, dict] = {}
+    unique: List[dict] = []
+    copies: Dict[int, List[dict]] = {}
+    for form in forms:
+        signature = form_signature(form)
+        first = representatives.get(signature)
+        if first is None:
+            representatives[signature] = form
+            unique.append(form)
+        else:
+            copies.setdefault(id(first), []).append(form)
+    return unique, copies
+
+
+def copy_findings(
+    findings: List[Finding], representative: dict, copy: dict
+) -> List[Finding]:
+    """Переносит находки представителя на копию формы."""
+    return [
+        replace(
+            finding,
+            form_index=copy.get("form_id"),
+            form_fingerprint=fingerprint_of(copy),
+            details={
+                **finding.details,
+                "reused_from_form": representative.get("form_id"),
+            },
+        )
+        for finding in findings
+    ]
+
+
+class RequestMemo:
+    """
+    Кэш ответов скана по содержимому запроса.
+
+    Потокобезопасен; хранит не более max_entries ответов, вытесняя давно
+    не использованные.
+    """
+
+    def __init__(self, max_entries: int = REQUEST_MEMO_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[RequestKey, ResponseSnapshot]" = OrderedDict()
+        self._lock = Lock()
+        self.stats = {"hits": 0, "misses": 0, "stored": 0}
+
+    def get(self, key: RequestKey) -> Optional[ResponseSnapshot]:
+        """Возвращает сохранённый ответ или None."""
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return snapshot
+
+    def put(self, key: RequestKey, snapshot: ResponseSnapshot) -> None:
+        """Сохраняет ответ на запрос."""
+        with self._lock:
+            self._entries[key] = snapshot
+            self._entries.move_to_end(key)
+            self.stats["stored"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def to_dict(self) -> dict:
+        """Возвращает статистику кэша для сводки скана."""
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries)}
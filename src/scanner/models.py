@@ -4,24 +4,45 @@
 Классы:
     Finding           – результат срабатывания детектора.
     ResponseSnapshot  – «снимок» ответа сервера (статус, тело, время).
+    BodyReader        – чтение тела по частям с ограничением размера.
 
 Функции:
     build_base_line   – создаёт словарь с базовыми значениями полей формы.
     build_test_data   – модифицирует базовые данные, подставляя payload в указанное поле.
+    build_field_data  – то же для произвольного строкового значения.
+    build_group_data  – подставляет одно значение сразу в несколько полей.
+    normalized_body_hash – хэш тела ответа без «летучих» фрагментов.
     send_form_request – отправляет заполненную форму и возвращает ResponseSnapshot.
+    send_form_request_async – асинхронный аналог send_form_request на aiohttp.
+    create_async_session    – создаёт aiohttp-сессию с cookies из requests-сессии.
 """
 
+import re
+import asyncio
+import hashlib
+import aiohttp
 import requests
-from typing import List, Optional
-from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, asdict, field
 from time import monotonic
 from .types import Payload
-from src.config import REQUEST_TIMEOUT, DEFAULT_HEADER
+from src.net.decoding import BODY_DECODER, BodyDecoder
+from src.config import (
+    REQUEST_TIMEOUT,
+    DEFAULT_HEADER,
+    RESPONSE_MAX_BYTES,
+    STREAM_CHUNK_SIZE,
+)
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
 BODY_PREVIEW = 512
+# заголовки, которыми aiohttp управляет самостоятельно
+ASYNC_SKIPPED_HEADERS = {"accept-encoding", "connection"}
+# длинные hex-строки (токены, идентификаторы сессий) и длинные числа (метки времени)
+VOLATILE_RE = re.compile(r"\b[0-9a-f]{16,}\b|\d{6,}", re.IGNORECASE)
+WHITESPACE_RE = re.compile(r"\s+")
 
 
 @dataclass
@@ -35,8 +56,13 @@ class Finding:
         evidence:   фрагмент ответа, подтверждающий уязвимость
         payload:    объект использованной полезной нагрузки
         response_time_ms: время ответа сервера в миллисекундах
-        body_len:   полная длина тела ответа
+        body_len:   длина прочитанного тела ответа в символах (если тело
+                    обрезано по RESPONSE_MAX_BYTES — только прочитанной
+                    части; тогда details["body_truncated"] = True)
         url:        итоговый URL
+        details:    дополнительные данные детектора (смещения отражений,
+                    сигнатуры SQL-ошибок и т.п.)
+        form_fingerprint: отпечаток формы (см. incremental.form_fingerprint)
     """
 
     form_index: Optional[str]
@@ -46,6 +72,8 @@ class Finding:
     response_time_ms: float
     body_len: int
     url: str
+    details: Dict[str, Any] = field(default_factory=dict)
+    form_fingerprint: Optional[str] = None
 
     def to_dict(self):
         return {
@@ -56,6 +84,8 @@ class Finding:
             "response_time_ms": self.response_time_ms,
             "body_len": self.body_len,
             "url": self.url,
+            "details": self.details,
+            "form_fingerprint": self.form_fingerprint,
         }
 
 
@@ -68,8 +98,12 @@ class ResponseSnapshot:
         url:           итоговый URL
         status_code:   HTTP-код ответа
         body:          тело
-        body_len:      полная длина тела
+        body_len:      длина прочитанного тела в символах (при truncated —
+                       длина прочитанной части, а не всего ответа)
         response_time: время получения ответа в секундах
+        headers:       заголовки ответа (имена в нижнем регистре)
+        truncated:     тело прочитано не полностью (ограничение размера
+                       RESPONSE_MAX_BYTES при потоковом чтении)
     """
 
     url: str
@@ -77,6 +111,8 @@ class ResponseSnapshot:
     body: str
     body_len: int
     response_time: float
+    headers: Dict[str, str] = field(default_factory=dict)
+    truncated: bool = False
 
     def to_dict(self):
         return asdict(self)
@@ -98,6 +134,38 @@ def build_base_line(inputs: List[dict]) -> dict:
     return data
 
 
+def normalized_body_hash(body: Optional[str]) -> str:
+    """
+    Возвращает хэш тела ответа, устойчивый к несущественным различиям.
+
+    Перед хэшированием тело приводится к нижнему регистру, пробельные
+    последовательности схлопываются, а токены и метки времени заменяются
+    заглушкой — так два ответа с одинаковым содержимым дают один хэш.
+    """
+    text = VOLATILE_RE.sub("#", (body or "").lower())
+    text = WHITESPACE_RE.sub(" ", text).strip()
+    return hashlib.sha1(text.encode("utf-8", "replace")).hexdigest()
+
+
+def build_field_data(base_data: dict, input_field: dict, value: str) -> dict:
+    """Создаёт копию базовых данных, подставляя value в указанное поле."""
+    data = dict(base_data)
+    name = input_field.get("name")
+    if name:
+        data[name] = value
+    return data
+
+
+def build_group_data(base_data: dict, fields: List[dict], value: str) -> dict:
+    """Создаёт копию базовых данных, подставляя value во все поля группы."""
+    data = dict(base_data)
+    for input_field in fields:
+        name = input_field.get("name")
+        if name:
+            data[name] = value
+    return data
+
+
 def build_test_data(base_data: dict, input_field: dict, payload: Payload) -> dict:
     """
     Создаёт копию базовых данных и подставляет полезную нагрузку в указанное поле.
@@ -107,11 +175,70 @@ def build_test_data(base_data: dict, input_field: dict, payload: Payload) -> dic
         input_field:  словарь поля
         payload:      объект Payload
     """
-    data = dict(base_data)
-    name = input_field.get("name")
-    if name:
-        data[name] = payload.payload
-    return data
+    return build_field_data(base_data, input_field, payload.payload)
+
+
+class BodyReader:
+    """
+    Читает тело ответа по частям, не больше max_bytes байт.
+
+    Каждая декодированная часть передаётся sink — объекту с методами
+    start() и feed(text) (см. streaming.StreamDetection).
+    """
+
+    def __init__(
+        self,
+        url: Optional[str],
+        content_type: Optional[str],
+        decoder: BodyDecoder,
+        sink: Optional[Any] = None,
+        max_bytes: int = RESPONSE_MAX_BYTES,
+    ):
+        self.url = url
+        self.content_type = content_type
+        self.decoder = decoder
+        self.sink = sink
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.truncated = False
+        self._incremental = None
+        self._parts: List[str] = []
+        if sink is not None:
+            sink.start()
+
+    def _emit(self, text: str) -> None:
+        if not text:
+            return
+        self._parts.append(text)
+        if self.sink is not None:
+            self.sink.feed(text)
+
+    def push(self, chunk: bytes) -> bool:
+        """
+        Принимает очередную часть тела.
+
+        Возвращает:
+            True, если чтение нужно прекратить (достигнут max_bytes).
+        """
+        if self._incremental is None:
+            self._incremental = self.decoder.incremental(
+                self.url, chunk, self.content_type
+            )
+        room = self.max_bytes - self.size
+        if len(chunk) > room:
+            chunk = chunk[:room]
+            self.truncated = True
+        self.size += len(chunk)
+        self._emit(self.decoder.feed(self._incremental, chunk))
+        if self.size >= self.max_bytes:
+            self.truncated = True
+        return self.truncated
+
+    def finish(self) -> str:
+        """Завершает декодирование и возвращает прочитанное тело."""
+        if self._incremental is not None:
+            self._emit(self.decoder.feed(self._incremental, b"", final=True))
+        return "".join(self._parts)
 
 
 def send_form_request(
@@ -119,15 +246,25 @@ def send_form_request(
     data: dict,
     timeout: int = REQUEST_TIMEOUT,
     session: Optional[requests.Session] = None,
+    decoder: Optional[BodyDecoder] = None,
+    stream: bool = False,
+    sink: Optional[Any] = None,
 ) -> Optional[ResponseSnapshot]:
     """
     Отправляет заполненную форму и возвращает снимок ответа.
 
+    В потоковом режиме тело читается частями (см. BodyReader) и не больше
+    RESPONSE_MAX_BYTES байт, а время ответа замеряется до получения
+    заголовков: чтение большого тела не должно влиять на замер.
+
     Параметры:
         form:    словарь, представляющий форму
         data:    словарь с данными для отправки
         timeout: таймаут запроса в секундах
         session: опциональная сессия requests
+        decoder: декодер тела с кэшем кодировок (по умолчанию BODY_DECODER)
+        stream:  читать тело по частям
+        sink:    получатель частей тела в потоковом режиме (см. BodyReader)
 
     Возвращает:
         Объект ResponseSnapshot или None, если запрос не удался.
@@ -136,22 +273,37 @@ def send_form_request(
 
     method = (form.get("method") or "GET").upper()
     headers = DEFAULT_HEADER
+    decoder = decoder or BODY_DECODER
+
+    if method == "POST":
+        kwargs = {"data": data}
+    else:
+        kwargs = {"params": data}
+    if stream:
+        kwargs["stream"] = True
 
     def _make_request(sess: requests.Session):
         """Внутренняя функция для выполнения запроса с замером времени."""
         try:
             start = monotonic()
-            if method == "POST":
-                resp = sess.request(
-                    method, action, data=data, timeout=timeout, headers=headers
-                )
-            else:
-                resp = sess.request(
-                    method, action, params=data, timeout=timeout, headers=headers
-                )
+            resp = sess.request(
+                method, action, timeout=timeout, headers=headers, **kwargs
+            )
             elapsed = monotonic() - start
 
-            body = resp.text or ""
+            truncated = False
+            if stream:
+                with resp:
+                    reader = BodyReader(
+                        resp.url, resp.headers.get("content-type"), decoder, sink
+                    )
+                    for chunk in resp.iter_content(STREAM_CHUNK_SIZE):
+                        if reader.push(chunk):
+                            break
+                    body = reader.finish()
+                truncated = reader.truncated
+            else:
+                body = decoder.decode_response(resp)
 
             logger.debug(
                 "Form request sent",
@@ -170,6 +322,8 @@ def send_form_request(
                 body=body,
                 body_len=len(body),
                 response_time=elapsed,
+                headers={k.lower(): v for k, v in resp.headers.items()},
+                truncated=truncated,
             )
         except requests.RequestException as e:
             logger.exception(
@@ -183,3 +337,164 @@ def send_form_request(
             return _make_request(new_session)
     else:
         return _make_request(session)
+
+
+def _queue_trace_config() -> aiohttp.TraceConfig:
+    """
+    Создаёт трассировку, учитывающую время ожидания свободного соединения
+    в пуле aiohttp (см. send_form_request_async).
+    """
+
+    async def on_queued_start(session, trace_ctx, params):
+        trace_ctx.queued_at = monotonic()
+
+    async def on_queued_end(session, trace_ctx, params):
+        timing = trace_ctx.trace_request_ctx
+        if isinstance(timing, dict):
+            waited = monotonic() - getattr(trace_ctx, "queued_at", monotonic())
+            timing["queued"] = timing.get("queued", 0.0) + waited
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_queued_start.append(on_queued_start)
+    trace_config.on_connection_queued_end.append(on_queued_end)
+    return trace_config
+
+
+def create_async_session(
+    session: Optional[requests.Session] = None,
+    limit: int = 0,
+) -> aiohttp.ClientSession:
+    """
+    Создаёт aiohttp-сессию, переносящую заголовки и cookies из requests-сессии.
+
+    Сессия трассирует ожидание соединения в пуле, чтобы оно не попадало
+    в время ответа.
+
+    Параметры:
+        session: исходная сессия requests (например, после автологина)
+        limit:   ограничение числа соединений (0 — без ограничения)
+
+    Возвращает:
+        Новый aiohttp.ClientSession; закрывать его должен вызывающий код.
+    """
+    headers = dict(DEFAULT_HEADER)
+    cookies = {}
+    if session is not None:
+        headers.update(
+            (k, v)
+            for k, v in session.headers.items()
+            if k.lower() not in ASYNC_SKIPPED_HEADERS
+        )
+        cookies = {c.name: c.value for c in session.cookies}
+
+    return aiohttp.ClientSession(
+        headers=headers,
+        cookies=cookies,
+        connector=aiohttp.TCPConnector(limit=limit),
+        trace_configs=[_queue_trace_config()],
+    )
+
+
+async def send_form_request_async(
+    form: dict,
+    data: dict,
+    session: aiohttp.ClientSession,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    timeout: int = REQUEST_TIMEOUT,
+    decoder: Optional[BodyDecoder] = None,
+    stream: bool = False,
+    sink: Optional[Any] = None,
+) -> Optional[ResponseSnapshot]:
+    """
+    Асинхронно отправляет заполненную форму и возвращает снимок ответа.
+
+    Время ожидания свободного соединения в пуле сессии (если сессия создана
+    create_async_session) вычитается из времени ответа: оно отражает
+    локальную очередь, а не задержку сервера. Тело декодируется после
+    замера времени; в потоковом режиме время замеряется до получения
+    заголовков, а тело читается как в send_form_request.
+
+    Параметры:
+        form:      словарь, представляющий форму
+        data:      словарь с данными для отправки
+        session:   сессия aiohttp
+        semaphore: опциональный семафор, ограничивающий число запросов в полёте
+        timeout:   таймаут запроса в секундах
+        decoder:   декодер тела с кэшем кодировок (по умолчанию BODY_DECODER)
+        stream:    читать тело по частям
+        sink:      получатель частей тела в потоковом режиме (см. BodyReader)
+
+    Возвращает:
+        Объект ResponseSnapshot или None, если запрос не удался.
+    """
+    action = form.get("action")
+    method = (form.get("method") or "GET").upper()
+    decoder = decoder or BODY_DECODER
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    if method == "POST":
+        kwargs = {"data": data}
+    else:
+        kwargs = {"params": data}
+
+    async def _make_request() -> Optional[ResponseSnapshot]:
+        try:
+            timing = {"queued": 0.0}
+            start = monotonic()
+            async with session.request(
+                method,
+                action,
+                timeout=client_timeout,
+                trace_request_ctx=timing,
+                **kwargs,
+            ) as resp:
+                if stream:
+                    elapsed = monotonic() - start - timing["queued"]
+                    reader = BodyReader(
+                        str(resp.url), resp.headers.get("Content-Type"), decoder, sink
+                    )
+                    async for chunk in resp.content.iter_chunked(STREAM_CHUNK_SIZE):
+                        if reader.push(chunk):
+                            break
+                    body = reader.finish()
+                    truncated = reader.truncated
+                else:
+                    content = await resp.read()
+            if not stream:
+                elapsed = monotonic() - start - timing["queued"]
+                truncated = False
+                body = decoder.decode(
+                    str(resp.url), content, resp.headers.get("Content-Type")
+                )
+
+            logger.debug(
+                "Async form request sent",
+                extra={
+                    "url": action,
+                    "method": method,
+                    "status": resp.status,
+                    "body_len": len(body),
+                    "time_sec": elapsed,
+                },
+            )
+
+            return ResponseSnapshot(
+                url=str(resp.url),
+                status_code=resp.status,
+                body=body,
+                body_len=len(body),
+                response_time=elapsed,
+                headers={k.lower(): v for k, v in resp.headers.items()},
+                truncated=truncated,
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(
+                "Async request failed",
+                extra={"url": action, "method": method, "error": str(e)},
+            )
+            return None
+
+    if semaphore is None:
+        return await _make_request()
+    async with semaphore:
+        return await _make_request()
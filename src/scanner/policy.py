@@ -0,0 +1,110 @@
+"""
+Модуль реализует политику досрочной остановки сканирования поля.
+
+Как только поле подтверждённо уязвимо к некоторому типу (SQLI/XSS),
+оставшиеся payloads этого типа почти ничего не добавляют к результату,
+но расходуют бюджет запросов. Политика решает, когда их можно пропустить.
+
+Классы:
+    ConfirmationPolicy – параметры досрочной остановки.
+    FieldState         – состояние сканирования одного поля формы.
+"""
+
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Dict, FrozenSet, List, Optional, Set
+
+from .types import Payload, Severity, VulnType
+from src.config import (
+    EARLY_EXIT_MAX_CONFIRMED,
+    EARLY_EXIT_MIN_SEVERITY,
+    EARLY_EXIT_ON_CRITICAL,
+)
+
+
+@dataclass(frozen=True)
+class ConfirmationPolicy:
+    """
+    Параметры досрочной остановки.
+
+    Атрибуты:
+        max_confirmed:    число подтверждённых находок по паре (поле, VulnType),
+                          после которого тип останавливается (0 — не останавливать)
+        min_severity:     минимальный уровень payload, находка которого
+                          считается подтверждением
+        stop_on_critical: останавливать тип после первой находки уровня CRITICAL
+        vuln_types:       типы уязвимостей, к которым применяется политика
+    """
+
+    max_confirmed: int = EARLY_EXIT_MAX_CONFIRMED
+    min_severity: Severity = Severity(EARLY_EXIT_MIN_SEVERITY)
+    stop_on_critical: bool = EARLY_EXIT_ON_CRITICAL
+    vuln_types: FrozenSet[VulnType] = frozenset({VulnType.SQLI, VulnType.XSS})
+
+    def is_confirmation(self, payload: Payload) -> bool:
+        """Проверяет, подтверждает ли находка этого payload уязвимость поля."""
+        return (
+            payload.vuln_type in self.vuln_types
+            and payload.severity.rank >= self.min_severity.rank
+        )
+
+
+@dataclass
+class FieldState:
+    """
+    Состояние сканирования одного поля формы, общее для всех его единиц работы.
+
+    Атрибуты:
+        form_id:   идентификатор формы
+        field_name: имя поля
+        confirmed: число подтверждённых payloads по типам уязвимостей
+        stopped:   типы, payloads которых больше не отправляются
+        skipped:   число пропущенных запросов
+        probe:     решение пробного этапа (ProbeResult.to_dict() и список
+                   skipped_payloads — идентификаторы отброшенных им payloads),
+                   если он был
+    """
+
+    form_id: Optional[str]
+    field_name: Optional[str]
+    confirmed: Dict[VulnType, int] = field(default_factory=dict)
+    stopped: Set[VulnType] = field(default_factory=set)
+    skipped: int = 0
+    probe: Optional[dict] = None
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def should_skip(self, payload: Payload) -> bool:
+        """
+        Проверяет, нужно ли пропустить payload; пропуск учитывается в skipped.
+        """
+        with self._lock:
+            if payload.vuln_type in self.stopped:
+                self.skipped += 1
+                return True
+            return False
+
+    def record(
+        self, payload: Payload, findings: List, policy: ConfirmationPolicy
+    ) -> None:
+        """Учитывает находки payload и при необходимости останавливает его тип."""
+        if not findings or not policy.is_confirmation(payload):
+            return
+        vuln_type = payload.vuln_type
+        with self._lock:
+            count = self.confirmed.get(vuln_type, 0) + 1
+            self.confirmed[vuln_type] = count
+            if (policy.max_confirmed and count >= policy.max_confirmed) or (
+                policy.stop_on_critical and payload.severity == Severity.CRITICAL
+            ):
+                self.stopped.add(vuln_type)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "form_id": self.form_id,
+                "field_name": self.field_name,
+                "confirmed": {t.name: n for t, n in self.confirmed.items()},
+                "stopped": sorted(t.name for t in self.stopped),
+                "skipped_requests": self.skipped,
+                "probe": self.probe,
+            }
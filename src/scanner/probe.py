@@ -0,0 +1,130 @@
+"""
+Модуль реализует пробный этап перед перебором полезных нагрузок.
+
+В поле отправляются одно-два безобидных, но уникальных значения. Если ответ
+совпадает с базовым (по нормализованному хэшу) и не отражает значение,
+поле считается нечувствительным: бэкенд его игнорирует, и полный перебор
+payloads по нему бесполезен.
+
+Первое пробное значение служит и канарейкой XSS: по контекстам его отражения
+(текст, атрибут, скрипт) отбираются XSS payloads, способные там сработать.
+Если маркер не отражается, XSS payloads в поле не отправляются.
+
+Классы:
+    ProbeResult – решение по полю и его причина.
+
+Функции:
+    make_probe_values() – генерирует пробные значения.
+    classify_probe()    – принимает решение по ответам на пробы.
+    classify_canary()   – определяет контексты отражения канарейки.
+    select_payloads()   – отбирает payloads согласно решению.
+"""
+
+from dataclasses import dataclass, asdict
+from secrets import randbelow, token_hex
+from typing import List, Optional, Sequence, Tuple
+
+from .types import Payload, MatchType, VulnType
+from .models import ResponseSnapshot, normalized_body_hash
+from .detectors import payload_contexts, reflection_contexts
+from src.config import PROBE_INSENSITIVE_ACTION, PROBE_REDUCED_MATCH_TYPES
+
+DECISION_FULL = "full"
+DECISION_REDUCED = "reduced"
+DECISION_SKIP = "skip"
+
+REDUCED_MATCH_TYPES = frozenset(MatchType(m) for m in PROBE_REDUCED_MATCH_TYPES)
+
+
+@dataclass
+class ProbeResult:
+    """
+    Решение пробного этапа по полю.
+
+    Атрибуты:
+        decision: full — все payloads, reduced — сокращённый набор, skip — пропуск
+        reason:   reflected / changed / insensitive / probe_failed / not_probed
+        probes:   число отправленных пробных запросов
+        reflection: контексты отражения канарейки (None — канарейка не
+                    проверялась или её ответ не получен)
+    """
+
+    decision: str
+    reason: str
+    probes: int
+    reflection: Optional[List[str]] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def make_probe_values() -> List[str]:
+    """Возвращает буквенно-цифровое и числовое пробные значения."""
+    return [f"zq{token_hex(4)}x", str(10000 + randbelow(90000))]
+
+
+def classify_probe(
+    base: ResponseSnapshot,
+    base_hash: str,
+    probes: Sequence[Tuple[str, Optional[ResponseSnapshot]]],
+    insensitive_action: str = PROBE_INSENSITIVE_ACTION,
+) -> ProbeResult:
+    """
+    Принимает решение по полю на основе ответов на пробные значения.
+
+    Параметры:
+        base:      базовый ответ формы
+        base_hash: нормализованный хэш базового ответа
+        probes:    пары (пробное значение, ответ)
+        insensitive_action: "reduce" или "skip" для нечувствительных полей
+    """
+    count = len(probes)
+    base_body = base.body or ""
+
+    for value, snapshot in probes:
+        if snapshot is None:
+            return ProbeResult(DECISION_FULL, "probe_failed", count)
+        body = snapshot.body or ""
+        if value in body and value not in base_body:
+            return ProbeResult(DECISION_FULL, "reflected", count)
+
+    for _, snapshot in probes:
+        if (
+            snapshot.status_code != base.status_code
+            or normalized_body_hash(snapshot.body) != base_hash
+        ):
+            return ProbeResult(DECISION_FULL, "changed", count)
+
+    if insensitive_action == "skip":
+        return ProbeResult(DECISION_SKIP, "insensitive", count)
+    return ProbeResult(DECISION_REDUCED, "insensitive", count)
+
+
+def classify_canary(
+    marker: str, snapshot: Optional[ResponseSnapshot]
+) -> Optional[List[str]]:
+    """Возвращает отсортированные контексты отражения маркера или None без ответа."""
+    if snapshot is None:
+        return None
+    return sorted(reflection_contexts(snapshot.body or "", marker))
+
+
+def fits_reflection(payload: Payload, reflection: Optional[List[str]]) -> bool:
+    """Проверяет, подходит ли payload к контекстам отражения канарейки."""
+    if reflection is None or payload.vuln_type != VulnType.XSS:
+        return True
+    return not payload_contexts(payload.payload).isdisjoint(reflection)
+
+
+def select_payloads(
+    payloads: Sequence[Payload], result: Optional[ProbeResult]
+) -> List[Payload]:
+    """Возвращает payloads, которые следует отправить в поле согласно решению."""
+    if result is None:
+        return list(payloads)
+    if result.decision == DECISION_SKIP:
+        return []
+    selected = [p for p in payloads if fits_reflection(p, result.reflection)]
+    if result.decision == DECISION_FULL:
+        return selected
+    return [p for p in selected if p.match_type in REDUCED_MATCH_TYPES]
@@ -0,0 +1,243 @@
+"""
+Модуль реализует адаптивное ограничение частоты запросов к целевому хосту.
+
+Контроллер работает по схеме AIMD (additive increase, multiplicative decrease):
+пока ответы «здоровые», частота плавно растёт; при кодах 429/503, сетевых
+ошибках или всплесках задержки — кратно снижается. Частота снижается не
+больше одного раза на слот отправки: ответы на запросы, отправленные до
+снижения (номер слота из acquire), её повторно не делят. Задержка всплеска
+тоже входит в среднюю, поэтому устойчивый рост задержки сервера становится
+новой нормой, а не бесконечной серией снижений. Заголовок Retry-After
+приостанавливает отправку на указанное сервером время.
+
+Контроллер включён по умолчанию (RATE_ADAPTIVE): частота на origin
+начинается с RATE_INITIAL_RPS, поэтому даже скан без RATE_LIMIT не
+отправляет запросы без ограничения с первого запроса.
+
+Классы:
+    RateController – контроллер частоты запросов для одного origin.
+
+Функции:
+    parse_retry_after() – разбирает значение заголовка Retry-After.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import monotonic, sleep
+from typing import Dict, List, Optional, Tuple
+
+from src.config import (
+    RATE_INITIAL_RPS,
+    RATE_MIN_RPS,
+    RATE_MAX_RPS,
+    RATE_INCREASE_STEP,
+    RATE_DECREASE_FACTOR,
+    RATE_LATENCY_SPIKE_FACTOR,
+    RATE_MAX_RETRY_AFTER,
+)
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+BACKOFF_STATUS_CODES = {429, 503}
+MAX_EVENTS = 50
+LATENCY_EWMA_ALPHA = 0.2
+# всплески задержки меньше этого значения (сек) не считаются перегрузкой
+MIN_LATENCY_SPIKE = 0.25
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Разбирает значение заголовка Retry-After.
+
+    Параметры:
+        value: число секунд или HTTP-дата.
+
+    Возвращает:
+        Задержку в секундах (не больше RATE_MAX_RETRY_AFTER) или None.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), RATE_MAX_RETRY_AFTER)
+
+
+class RateController:
+    """
+    AIMD-контроллер частоты запросов к одному origin.
+
+    Потокобезопасен: acquire() можно вызывать из нескольких потоков,
+    acquire_async() — из корутин. Каждый вызов резервирует следующий
+    свободный слот отправки, поэтому суммарная частота не превышает rate.
+
+    Атрибуты:
+        origin: origin, к которому относится контроллер
+        rate:   текущая разрешённая частота (запросов в секунду)
+        events: последние события снижения частоты
+    """
+
+    def __init__(
+        self,
+        origin: str,
+        initial_rps: float = RATE_INITIAL_RPS,
+        min_rps: float = RATE_MIN_RPS,
+        max_rps: float = RATE_MAX_RPS,
+    ):
+        self.origin = origin
+        self.min_rps = min_rps
+        self.max_rps = max(max_rps, min_rps)
+        self.rate = min(max(initial_rps, min_rps), self.max_rps)
+        self.events: List[Dict] = []
+        self.requests = 0
+        self.backoffs = 0
+        self._lock = Lock()
+        self._next_slot = 0.0
+        self._blocked_until = 0.0
+        self._latency: Optional[float] = None
+        # слоты с номером не больше этого отправлены до последнего снижения
+        self._backoff_slot = 0
+
+    def reserve(self) -> float:
+        """Резервирует слот отправки и возвращает время ожидания в секундах."""
+        return self._reserve()[0]
+
+    def _reserve(self) -> Tuple[float, int]:
+        """Резервирует слот отправки; возвращает ожидание и номер слота."""
+        with self._lock:
+            now = monotonic()
+            slot = max(now, self._next_slot, self._blocked_until)
+            self._next_slot = slot + 1.0 / self.rate
+            self.requests += 1
+            return slot - now, self.requests
+
+    def acquire(self) -> int:
+        """
+        Блокирует поток до наступления зарезервированного слота.
+
+        Возвращает:
+            Номер слота (передаётся в record).
+        """
+        delay, slot = self._reserve()
+        if delay > 0:
+            sleep(delay)
+        return slot
+
+    async def acquire_async(self) -> int:
+        """Асинхронный аналог acquire()."""
+        delay, slot = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return slot
+
+    def record(
+        self,
+        status_code: Optional[int],
+        latency: Optional[float],
+        retry_after: Optional[float] = None,
+        expect_delay: bool = False,
+        slot: Optional[int] = None,
+    ) -> None:
+        """
+        Учитывает результат запроса и корректирует частоту.
+
+        Параметры:
+            status_code:  HTTP-код ответа (None — запрос не удался)
+            latency:      время ответа в секундах
+            retry_after:  значение Retry-After в секундах, если было
+            expect_delay: задержка ожидаема (TIME_BASED payload) и
+                          не должна считаться перегрузкой
+            slot:         номер слота из acquire (None — сигнал всегда новый)
+        """
+        with self._lock:
+            if status_code is None:
+                self._backoff("error", status_code, latency, slot)
+                return
+
+            if status_code in BACKOFF_STATUS_CODES:
+                backed_off = self._backoff("status", status_code, latency, slot)
+                if retry_after is not None:
+                    self._blocked_until = max(
+                        self._blocked_until, monotonic() + retry_after
+                    )
+                    if backed_off:
+                        self.events[-1]["retry_after"] = retry_after
+                return
+
+            if latency is None or expect_delay:
+                return
+
+            baseline = self._latency
+            if baseline is None:
+                self._latency = latency
+            else:
+                self._latency += LATENCY_EWMA_ALPHA * (latency - baseline)
+            if (
+                baseline is not None
+                and latency > baseline * RATE_LATENCY_SPIKE_FACTOR
+                and latency - baseline > MIN_LATENCY_SPIKE
+            ):
+                self._backoff("latency", status_code, latency, slot)
+                return
+            self.rate = min(self.max_rps, self.rate + RATE_INCREASE_STEP)
+
+    def _backoff(
+        self,
+        reason: str,
+        status_code: Optional[int],
+        latency: Optional[float],
+        slot: Optional[int],
+    ) -> bool:
+        """
+        Кратно снижает частоту и записывает событие (вызывается под блокировкой).
+
+        Сигнал по слоту, зарезервированному до предыдущего снижения,
+        пропускается: этот запрос ушёл ещё с прежней частотой.
+
+        Возвращает:
+            True, если частота снижена.
+        """
+        if slot is not None and slot <= self._backoff_slot:
+            return False
+        self._backoff_slot = self.requests
+        previous = self.rate
+        self.rate = max(self.min_rps, self.rate * RATE_DECREASE_FACTOR)
+        self.backoffs += 1
+        self.events.append(
+            {
+                "reason": reason,
+                "status_code": status_code,
+                "latency": latency,
+                "rate_before": round(previous, 3),
+                "rate_after": round(self.rate, 3),
+                "request_no": self.requests,
+            }
+        )
+        del self.events[:-MAX_EVENTS]
+        logger.info(
+            "Rate controller backed off",
+            extra={"origin": self.origin, **self.events[-1]},
+        )
+        return True
+
+    def to_dict(self) -> dict:
+        """Возвращает текущее состояние контроллера для отчёта о скане."""
+        with self._lock:
+            return {
+                "origin": self.origin,
+                "rate_rps": round(self.rate, 3),
+                "requests": self.requests,
+                "backoffs": self.backoffs,
+                "events": list(self.events),
+            }
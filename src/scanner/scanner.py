@@ -1,42 +1,587 @@
 """
 Модуль реализует логику сканирования веб-форм на уязвимости.
 
+Единица работы сканера — тройка (форма, поле, payload). Единицы могут
+выполняться последовательно или в ограниченном пуле потоков; порядок
+результатов при этом не меняется. Общее состояние скана (сессия, пул,
+контроллеры частоты, статистика) передаётся через ScanContext.
+
+Решения единиц работы (повторы, memo, детекторы, досрочная остановка,
+деление групп) описаны один раз генераторами шагов в steps.py; этот модуль
+только выполняет их операции — в потоках (run_steps) или корутинами
+(run_steps_async).
+
 Функции:
-    scan_field  - сканирование одного поля формы с перебором payloads
-    scan_form   - сканирование всех полей одной формы
-    scan_forms  - сканирование списка форм с использованием общей сессии
+    run_steps    - выполнение генератора шагов в текущем потоке
+    fetch_token  - получение свежего anti-CSRF токена со страницы формы
+    plan_field   - пробный этап и канарейка XSS, отбор payloads для поля
+    scan_payload - отправка одного payload в одно поле формы
+    scan_group   - отправка payload в группу полей с делением сработавшей группы
+    scan_field   - сканирование одного поля формы с перебором payloads
+    scan_form    - сканирование всех полей одной формы
+    scan_forms   - сканирование списка форм с использованием общей сессии
+
+Асинхронный путь (aiohttp, число запросов в полёте ограничено семафором):
+    run_steps_async, fetch_token_async, scan_field_async, scan_form_async,
+    scan_forms_async
 """
 
+import asyncio
+import aiohttp
 import requests
-from time import sleep
-from typing import List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import monotonic, sleep
+from typing import Dict, List, Optional, Tuple
 
 import src.scanner.detectors as detector
 from .types import Payload
+from .context import ScanContext
+from .rate import RateController, parse_retry_after
+from .csrf import TokenPool, is_token_field
+from .streaming import StreamDetection
+from .grouping import GroupUnit, group_units
+from .memo import collapse_forms, copy_findings
+from .steps import (
+    Rebuild,
+    Recover,
+    Request,
+    Slot,
+    Steps,
+    T,
+    baseline_steps,
+    fetch_baseline_steps,
+    group_steps,
+    payload_steps,
+    plan_steps,
+)
 from .models import (
     Finding,
     ResponseSnapshot,
-    build_base_line,
-    build_test_data,
+    create_async_session,
     send_form_request,
+    send_form_request_async,
+)
+from src.config import (
+    RATE_LIMIT,
+    SCAN_MAX_WORKERS,
+    SCAN_MAX_IN_FLIGHT,
+    SCAN_TIMED_LANE,
+    CSRF_PREFETCH_WORKERS,
+    REQUEST_TIMEOUT,
 )
-from src.config import RATE_LIMIT
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
-
 ALLOWED_INPUT_TYPES = {"text", "search", "textarea", "url", "email", "tel"}
 
 
+def is_scannable_field(form: dict, field: dict) -> bool:
+    """Проверяет, подходит ли поле для подстановки полезных нагрузок."""
+    field_name = field.get("name")
+    field_type = (field.get("type") or "text").lower()
+
+    if not field_name or field_type not in ALLOWED_INPUT_TYPES or is_token_field(field):
+        logger.debug(
+            "Skipping field",
+            extra={
+                "form_id": form.get("form_id"),
+                "field_name": field_name,
+                "field_type": field_type,
+            },
+        )
+        return False
+    return True
+
+
+def _record_response(
+    context: ScanContext,
+    form: dict,
+    snapshot: Optional[ResponseSnapshot],
+    payload: Optional[Payload],
+    slot: Optional[int] = None,
+) -> None:
+    """
+    Передаёт результат запроса контроллеру частоты origin формы и пополняет
+    окно задержек формы (кроме ответов на TIME_BASED payloads).
+    """
+    context.stats.incr("requests_sent")
+    if snapshot is not None and snapshot.truncated:
+        context.stats.incr("responses_truncated")
+    is_timed = context.is_timed(payload)
+    if snapshot is not None and not is_timed:
+        context.latency_window(form).add(snapshot.response_time)
+    controller = context.rate_controller(form.get("action"))
+    if snapshot is None:
+        _record_rate(controller, None, None, slot=slot)
+        return
+    _record_rate(
+        controller,
+        snapshot.status_code,
+        snapshot.response_time,
+        snapshot.headers.get("retry-after"),
+        expect_delay=is_timed,
+        slot=slot,
+    )
+
+
+def _record_rate(
+    controller: Optional[RateController],
+    status_code: Optional[int],
+    latency: Optional[float],
+    retry_after: Optional[str] = None,
+    expect_delay: bool = False,
+    slot: Optional[int] = None,
+) -> None:
+    """Передаёт результат запроса контроллеру частоты (если он есть)."""
+    if controller is None:
+        return
+    controller.record(
+        status_code,
+        latency,
+        retry_after=parse_retry_after(retry_after),
+        expect_delay=expect_delay,
+        slot=slot,
+    )
+
+
+def _send_once(
+    context: ScanContext,
+    form: dict,
+    data: dict,
+    payload: Optional[Payload],
+    sink: Optional[StreamDetection] = None,
+) -> Optional[ResponseSnapshot]:
+    if context.auth_guard is not None:
+        context.auth_guard.wait()
+    controller = context.rate_controller(form.get("action"))
+    slot = controller.acquire() if controller is not None else None
+
+    snapshot = send_form_request(
+        form,
+        data,
+        session=context.session,
+        decoder=context.decoder,
+        stream=context.stream_responses,
+        sink=sink,
+    )
+    _record_response(context, form, snapshot, payload, slot)
+
+    if controller is None and snapshot and context.rate_limit > 0:
+        sleep(context.rate_limit)
+    return snapshot
+
+
+def fetch_token(context: ScanContext, pool: TokenPool) -> Optional[Dict[str, str]]:
+    """
+    Запрашивает страницу формы и извлекает из неё свежий anti-CSRF токен.
+
+    Запрос занимает слот контроллера частоты origin и сообщает ему результат
+    (статус, время ответа, ошибку), как и отправка формы.
+    """
+    controller = context.rate_controller(pool.page_url)
+    slot = controller.acquire() if controller is not None else None
+    context.stats.incr("csrf_fetches")
+    try:
+        start = monotonic()
+        response = (context.session or requests).get(
+            pool.page_url, timeout=REQUEST_TIMEOUT
+        )
+        elapsed = monotonic() - start
+    except requests.RequestException as e:
+        logger.warning(
+            "Failed to fetch CSRF token page",
+            extra={"page_url": pool.page_url, "error": str(e)},
+        )
+        _record_rate(controller, None, None, slot=slot)
+        return pool.parse(None)
+    _record_rate(
+        controller,
+        response.status_code,
+        elapsed,
+        response.headers.get("Retry-After"),
+        slot=slot,
+    )
+    return pool.parse(context.decoder.decode_response(response))
+
+
+def _prefetch_tokens(context: ScanContext, pool: TokenPool) -> None:
+    """Запускает в context.token_executor недостающие запросы токенов."""
+    if context.token_executor is None:
+        return
+    for _ in range(pool.reserve()):
+        try:
+            context.token_executor.submit(lambda: pool.add(fetch_token(context, pool)))
+        except RuntimeError:
+            # пул уже остановлен: скан завершается
+            pool.add(None)
+
+
+async def _send_once_async(
+    context: ScanContext,
+    form: dict,
+    data: dict,
+    payload: Optional[Payload],
+    sink: Optional[StreamDetection] = None,
+) -> Optional[ResponseSnapshot]:
+    if context.auth_guard is not None:
+        await context.auth_guard.wait_async()
+    controller = context.rate_controller(form.get("action"))
+    slot = await controller.acquire_async() if controller is not None else None
+
+    snapshot = await send_form_request_async(
+        form,
+        data,
+        context.async_session,
+        decoder=context.decoder,
+        stream=context.stream_responses,
+        sink=sink,
+    )
+    _record_response(context, form, snapshot, payload, slot)
+
+    if controller is None and snapshot and context.rate_limit > 0:
+        await asyncio.sleep(context.rate_limit)
+    return snapshot
+
+
+async def fetch_token_async(
+    context: ScanContext, pool: TokenPool
+) -> Optional[Dict[str, str]]:
+    """Асинхронный аналог fetch_token."""
+    controller = context.rate_controller(pool.page_url)
+    slot = await controller.acquire_async() if controller is not None else None
+    context.stats.incr("csrf_fetches")
+    try:
+        start = monotonic()
+        async with context.async_session.get(
+            pool.page_url, timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        ) as response:
+            content = await response.read()
+            _record_rate(
+                controller,
+                response.status,
+                monotonic() - start,
+                response.headers.get("Retry-After"),
+                slot=slot,
+            )
+            text = context.decoder.decode(
+                str(response.url), content, response.headers.get("Content-Type")
+            )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning(
+            "Failed to fetch CSRF token page",
+            extra={"page_url": pool.page_url, "error": str(e)},
+        )
+        _record_rate(controller, None, None, slot=slot)
+        return pool.parse(None)
+    return pool.parse(text)
+
+
+def _prefetch_tokens_async(context: ScanContext, pool: TokenPool) -> None:
+    """Запускает задачи недостающих запросов токенов."""
+
+    async def fill() -> None:
+        tokens = None
+        try:
+            tokens = await fetch_token_async(context, pool)
+        finally:
+            pool.add(tokens)
+
+    for _ in range(pool.reserve()):
+        task = asyncio.create_task(fill())
+        pool.tasks.add(task)
+        task.add_done_callback(pool.tasks.discard)
+
+
+async def _cancel_token_tasks(context: ScanContext) -> None:
+    """Отменяет незавершённые запросы токенов перед закрытием aiohttp-сессии."""
+    tasks = [
+        task
+        for _, pool in list(context.token_pools.values())
+        if pool is not None
+        for task in pool.tasks
+    ]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _refresh_async_cookies(context: ScanContext) -> None:
+    """Переносит cookies нового входа из requests-сессии в aiohttp-сессию."""
+    if context.session is None or context.async_session is None:
+        return
+    context.async_session.cookie_jar.update_cookies(
+        {c.name: c.value for c in context.session.cookies}
+    )
+
+
+def _send_with_token(
+    context: ScanContext, request: Request
+) -> Optional[ResponseSnapshot]:
+    """Отправляет форму со свежим anti-CSRF токеном из пула запроса."""
+    pool = request.pool
+    if pool.serial:
+        with pool.serial_lock:
+            token = fetch_token(context, pool) or {}
+            return _send_once(
+                context,
+                request.form,
+                {**request.data, **token},
+                request.payload,
+                request.sink,
+            )
+    token = pool.take() or fetch_token(context, pool) or {}
+    _prefetch_tokens(context, pool)
+    return _send_once(
+        context, request.form, {**request.data, **token}, request.payload, request.sink
+    )
+
+
+def _perform(context: ScanContext, op):
+    """Выполняет операцию шагов (см. steps.py) в текущем потоке."""
+    if isinstance(op, Request):
+        if op.pool is not None:
+            return _send_with_token(context, op)
+        return _send_once(context, op.form, op.data, op.payload, op.sink)
+    if isinstance(op, Slot):
+        return run_steps(context, op.steps)
+    if isinstance(op, Recover):
+        return context.auth_guard.recover(op.seen)
+    if isinstance(op, Rebuild):
+        return context.rebuild_baseline(
+            op.form,
+            op.generation,
+            lambda: run_steps(
+                context, fetch_baseline_steps(context, op.form, op.base_data)
+            ),
+        )
+    raise TypeError(f"Unknown scan step: {op!r}")
+
+
+def run_steps(context: ScanContext, steps: Steps[T]) -> T:
+    """
+    Выполняет генератор шагов в текущем потоке: каждая операция
+    выполняется блокирующим вызовом, результат или исключение
+    возвращается в генератор.
+
+    Возвращает:
+        Значение, которое вернул генератор.
+    """
+    reply, error = None, None
+    while True:
+        try:
+            op = steps.throw(error) if error is not None else steps.send(reply)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            reply, error = _perform(context, op), None
+        except Exception as e:
+            reply, error = None, e
+
+
+async def _send_with_token_async(
+    context: ScanContext, request: Request
+) -> Optional[ResponseSnapshot]:
+    """Асинхронный аналог _send_with_token."""
+    pool = request.pool
+    if pool.serial:
+        async with pool.async_lock:
+            token = await fetch_token_async(context, pool) or {}
+            return await _send_once_async(
+                context,
+                request.form,
+                {**request.data, **token},
+                request.payload,
+                request.sink,
+            )
+    token = pool.take() or await fetch_token_async(context, pool) or {}
+    _prefetch_tokens_async(context, pool)
+    return await _send_once_async(
+        context, request.form, {**request.data, **token}, request.payload, request.sink
+    )
+
+
+async def _perform_async(context: ScanContext, op):
+    """
+    Выполняет операцию шагов (см. steps.py) корутиной. Slot удерживает
+    место семафора полосы payload, пока выполняются его шаги; повторный
+    вход и перестроение базового ответа выполняются в пределах этого места.
+    """
+    if isinstance(op, Request):
+        if op.pool is not None:
+            return await _send_with_token_async(context, op)
+        return await _send_once_async(context, op.form, op.data, op.payload, op.sink)
+    if isinstance(op, Slot):
+        async with context.semaphore_for(op.payload):
+            return await run_steps_async(context, op.steps)
+    if isinstance(op, Recover):
+        recovered = await context.auth_guard.recover_async(op.seen)
+        if recovered:
+            _refresh_async_cookies(context)
+        return recovered
+    if isinstance(op, Rebuild):
+        return await context.rebuild_baseline_async(
+            op.form,
+            op.generation,
+            lambda: run_steps_async(
+                context, fetch_baseline_steps(context, op.form, op.base_data)
+            ),
+        )
+    raise TypeError(f"Unknown scan step: {op!r}")
+
+
+async def run_steps_async(context: ScanContext, steps: Steps[T]) -> T:
+    """Асинхронный аналог run_steps: операции выполняются корутинами."""
+    reply, error = None, None
+    while True:
+        try:
+            op = steps.throw(error) if error is not None else steps.send(reply)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            reply, error = await _perform_async(context, op), None
+        except Exception as e:
+            reply, error = None, e
+
+
+def scan_payload(
+    form: dict,
+    field: dict,
+    base_line_snapshot: detector.Baseline,
+    payload: Payload,
+    base_data: dict,
+    context: ScanContext,
+) -> List[Finding]:
+    """Отправляет один payload в одно поле формы (см. steps.payload_steps)."""
+    return run_steps(
+        context,
+        payload_steps(form, field, base_line_snapshot, payload, base_data, context),
+    )
+
+
+def scan_group(
+    form: dict,
+    fields: List[dict],
+    base_line_snapshot: detector.Baseline,
+    payload: Payload,
+    base_data: dict,
+    context: ScanContext,
+) -> List[Finding]:
+    """Отправляет один payload в группу полей формы (см. steps.group_steps)."""
+    return run_steps(
+        context,
+        group_steps(form, fields, base_line_snapshot, payload, base_data, context),
+    )
+
+
+def plan_field(
+    form: dict,
+    field: dict,
+    base_line_snapshot: detector.Baseline,
+    payloads: List[Payload],
+    base_data: dict,
+    context: ScanContext,
+) -> List[Payload]:
+    """Выполняет пробный этап поля (см. steps.plan_steps)."""
+    return run_steps(
+        context,
+        plan_steps(form, field, base_line_snapshot, payloads, base_data, context),
+    )
+
+
+def _submit_planned_field(
+    form: dict,
+    field: dict,
+    base_line_snapshot: detector.Baseline,
+    payloads: List[Payload],
+    base_data: dict,
+    context: ScanContext,
+) -> List[Future]:
+    """Выполняется в пуле: пробный этап поля и постановка его единиц работы."""
+    selected = plan_field(form, field, base_line_snapshot, payloads, base_data, context)
+    return [
+        context.executor_for(payload).submit(
+            scan_payload,
+            form,
+            field,
+            base_line_snapshot,
+            payload,
+            base_data,
+            context,
+        )
+        for payload in selected
+    ]
+
+
+def submit_field(
+    form: dict,
+    field: dict,
+    base_line_snapshot: detector.Baseline,
+    payloads: List[Payload],
+    base_data: dict,
+    context: ScanContext,
+) -> Optional[Future]:
+    """
+    Ставит в очередь пула контекста обработку одного поля.
+
+    Возвращает:
+        Future, результатом которого является список Future единиц работы
+        (в порядке payloads), или None, если поле не сканируется.
+    """
+    if not is_scannable_field(form, field):
+        return None
+
+    return context.executor.submit(
+        _submit_planned_field,
+        form,
+        field,
+        base_line_snapshot,
+        payloads,
+        base_data,
+        context,
+    )
+
+
+def collect_findings(
+    form: dict, field_futures: List[Future], context: ScanContext
+) -> List[Finding]:
+    """
+    Дожидается Future полей и их единиц работы в порядке постановки
+    и объединяет результаты. Форма с упавшей задачей отмечается как
+    проверенная не полностью.
+    """
+    findings: List[Finding] = []
+    for field_future in field_futures:
+        try:
+            unit_futures = field_future.result()
+        except Exception as e:
+            logger.exception(
+                "Error while planning field",
+                extra={"form_id": form.get("form_id"), "error": str(e)},
+            )
+            context.mark_failed(form)
+            continue
+        for future in unit_futures:
+            try:
+                findings.extend(future.result())
+            except Exception as e:
+                logger.exception(
+                    "Error in scan work unit",
+                    extra={"form_id": form.get("form_id"), "error": str(e)},
+                )
+                context.mark_failed(form)
+    return findings
+
+
 def scan_field(
     form: dict,
     field: dict,
-    base_line_snapshot: ResponseSnapshot,
+    base_line_snapshot: detector.Baseline,
     payloads: List[Payload],
     base_data: dict,
     rate_limit: float = RATE_LIMIT,
     session: Optional[requests.Session] = None,
+    context: Optional[ScanContext] = None,
 ) -> List[Finding]:
     """
     Сканирует одно поле формы, перебирая список полезных нагрузок.
@@ -49,93 +594,119 @@ def scan_field(
         base_data: словарь базовых данных для отправки
         rate_limit: задержка между запросами в секундах
         session: опциональная сессия requests для переиспользования соединений
+        context: контекст скана; если задан, rate_limit и session берутся из него,
+                 а при наличии пула payloads отправляются параллельно;
+                 TIME_BASED payloads при наличии context.timed_executor
+                 выполняются в своей полосе одновременно с остальными
 
     Возвращает:
         Список обнаруженных уязвимостей (объекты Finding).
     """
-    findings: List[Finding] = []
+    if context is None:
+        context = ScanContext(session=session, rate_limit=rate_limit)
+    base_line_snapshot = detector.as_profile(base_line_snapshot)
 
-    field_name = field.get("name")
-    field_type = (field.get("type") or "text").lower()
-
-    if not field_name or field_type not in ALLOWED_INPUT_TYPES:
-        logger.debug(
-            "Skipping field",
-            extra={
-                "form_id": form.get("form_id"),
-                "field_name": field_name,
-                "field_type": field_type,
-            },
+    if context.executor is not None:
+        future = submit_field(
+            form, field, base_line_snapshot, payloads, base_data, context
         )
+        return collect_findings(form, [future] if future else [], context)
+
+    findings: List[Finding] = []
+    if not is_scannable_field(form, field):
         return findings
 
-    for payload in payloads:
-        try:
-            logger.debug(
-                "Sending payload",
-                extra={
-                    "form_id": form.get("form_id"),
-                    "field": field_name,
-                    "payload_id": payload.payload_id,
-                    "payload": payload.payload,
-                },
-            )
+    selected = plan_field(form, field, base_line_snapshot, payloads, base_data, context)
+    timed_units = {
+        idx: context.timed_executor.submit(
+            scan_payload, form, field, base_line_snapshot, payload, base_data, context
+        )
+        for idx, payload in enumerate(selected)
+        if context.timed_executor is not None and context.is_timed(payload)
+    }
+    results: List[List[Finding]] = []
+    for idx, payload in enumerate(selected):
+        if idx in timed_units:
+            results.append([])
+            continue
+        results.append(
+            scan_payload(form, field, base_line_snapshot, payload, base_data, context)
+        )
+    for idx, future in timed_units.items():
+        results[idx] = future.result()
 
-            test_data = build_test_data(base_data, field, payload)
-            test_snapshot = send_form_request(form, test_data, session=session)
-
-            if not test_snapshot:
-                logger.warning(
-                    "No response for payload, skipping",
-                    extra={
-                        "form_id": form.get("form_id"),
-                        "field": field_name,
-                        "payload_id": payload.payload_id,
-                    },
-                )
-                continue
+    for unit_findings in results:
+        findings.extend(unit_findings)
+    return findings
 
-            logger.debug(
-                "Test snapshot received",
-                extra={
-                    "form_id": form.get("form_id"),
-                    "status": test_snapshot.status_code,
-                    "body_len": len(test_snapshot.body),
-                    "response_time": test_snapshot.response_time,
-                },
-            )
 
-            dets = detector.run_detectors(base_line_snapshot, test_snapshot, payload)
-            for d in dets:
-                if d.get("matched"):
-                    findings.append(
-                        Finding(
-                            form_index=form.get("form_id"),
-                            field_name=field_name,
-                            evidence=d.get("evidence") or "",
-                            payload=payload,
-                            response_time_ms=test_snapshot.response_time * 1000,
-                            body_len=len(test_snapshot.body),
-                            url=test_snapshot.url,
-                        )
-                    )
-
-            if rate_limit > 0:
-                sleep(rate_limit)
+def prepare_form(
+    form: dict, context: ScanContext
+) -> Optional[Tuple[dict, detector.BaselineProfile]]:
+    """Получает базовый ответ формы и его профиль (см. steps.baseline_steps)."""
+    return run_steps(context, baseline_steps(form, context))
 
-        except Exception as e:
-            logger.exception(
-                "Error while scanning field with payload",
-                extra={
-                    "form_id": form.get("form_id"),
-                    "field": field_name,
-                    "payload_id": payload.payload_id,
-                    "error": str(e),
-                },
-            )
-            continue
 
-    return findings
+def plan_groups(
+    form: dict,
+    prepared: Tuple[dict, detector.BaselineProfile],
+    payloads: List[Payload],
+    context: ScanContext,
+) -> List[GroupUnit]:
+    """
+    Выполняет пробный этап всех полей формы и составляет групповые
+    единицы работы (режим context.group_testing).
+    """
+    base_data, base_profile = prepared
+    selected = [
+        (field, plan_field(form, field, base_profile, payloads, base_data, context))
+        for field in form.get("inputs", [])
+        if is_scannable_field(form, field)
+    ]
+    return group_units(selected, context.group_size, context.is_timed)
+
+
+def _submit_grouped_form(
+    form: dict,
+    prepared: Tuple[dict, detector.BaselineProfile],
+    payloads: List[Payload],
+    context: ScanContext,
+) -> List[Future]:
+    """Выполняется в пуле: пробный этап формы и постановка групповых единиц."""
+    base_data, base_profile = prepared
+    return [
+        context.executor_for(payload).submit(
+            scan_group, form, fields, base_profile, payload, base_data, context
+        )
+        for payload, fields in plan_groups(form, prepared, payloads, context)
+    ]
+
+
+def submit_form(
+    form: dict,
+    prepared: Tuple[dict, detector.BaselineProfile],
+    payloads: List[Payload],
+    context: ScanContext,
+) -> List[Future]:
+    """
+    Ставит в очередь пула обработку всех полей формы.
+
+    В режиме группового тестирования форма планируется одной задачей,
+    которая ставит в очередь групповые единицы работы.
+    """
+    if context.group_testing:
+        return [
+            context.executor.submit(
+                _submit_grouped_form, form, prepared, payloads, context
+            )
+        ]
+    base_data, base_profile = prepared
+    futures: List[Future] = []
+    for field in form.get("inputs", []):
+        future = submit_field(form, field, base_profile, payloads, base_data, context)
+        if future is not None:
+            futures.append(future)
+    return futures
 
 
 def scan_form(
@@ -143,6 +714,7 @@ def scan_form(
     payloads: List[Payload],
     session: Optional[requests.Session] = None,
     rate_limit: float = RATE_LIMIT,
+    context: Optional[ScanContext] = None,
 ) -> List[Finding]:
     """
     Сканирует все поля одной формы.
@@ -153,48 +725,40 @@ def scan_form(
         payloads: список объектов Payload
         session: опциональная сессия requests
         rate_limit: задержка между запросами
+        context: контекст скана; если задан, session и rate_limit берутся из него
 
     Возвращает:
         Список уязвимостей, найденных во всех полях формы.
     """
-    inputs = form.get("inputs", [])
-    if not inputs:
-        logger.debug(
-            "Form has no inputs, skipping", extra={"form_id": form.get("form_id")}
-        )
-        return []
+    if context is None:
+        context = ScanContext(session=session, rate_limit=rate_limit)
 
-    base_data = build_base_line(inputs)
-    base_snapshot = send_form_request(form, base_data, session=session)
-
-    if not base_snapshot:
-        logger.warning(
-            "Failed to obtain baseline response for form",
-            extra={"form_id": form.get("form_id")},
-        )
+    prepared = prepare_form(form, context)
+    if prepared is None:
         return []
 
-    logger.debug(
-        "Baseline created",
-        extra={
-            "form_id": form.get("form_id"),
-            "status": base_snapshot.status_code,
-            "body_len": len(base_snapshot.body),
-            "response_time": base_snapshot.response_time,
-        },
-    )
+    if context.executor is not None:
+        futures = submit_form(form, prepared, payloads, context)
+        return collect_findings(form, futures, context)
 
+    base_data, base_profile = prepared
     findings: List[Finding] = []
-    for field in inputs:
+    if context.group_testing:
+        for payload, fields in plan_groups(form, prepared, payloads, context):
+            findings.extend(
+                scan_group(form, fields, base_profile, payload, base_data, context)
+            )
+        return findings
+
+    for field in form.get("inputs", []):
         try:
             field_findings = scan_field(
                 form,
                 field,
-                base_snapshot,
+                base_profile,
                 payloads,
                 base_data,
-                rate_limit,
-                session,
+                context=context,
             )
             findings.extend(field_findings)
         except Exception as e:
@@ -206,57 +770,360 @@ def scan_form(
                     "error": str(e),
                 },
             )
+            context.mark_failed(form)
             continue
 
     return findings
 
 
+def _collapse_forms(forms: List[dict], context: ScanContext) -> List[dict]:
+    """
+    Объединяет одинаковые формы (см. collapse_forms); копии запоминаются
+    в context.form_copies.
+    """
+    if not context.collapse_duplicates:
+        return forms
+    unique, copies = collapse_forms(forms)
+    if copies:
+        context.form_copies.update(copies)
+        context.stats.incr("forms_collapsed", len(forms) - len(unique))
+        logger.info(
+            "Collapsed duplicate forms",
+            extra={"forms": len(forms), "unique_forms": len(unique)},
+        )
+    return unique
+
+
+def _with_copies(
+    context: ScanContext, form: dict, form_findings: List[Finding]
+) -> List[Finding]:
+    """Добавляет к находкам формы их копии для объединённых с ней форм."""
+    findings = list(form_findings)
+    for copy in context.form_copies.get(id(form), []):
+        findings.extend(copy_findings(form_findings, form, copy))
+    return findings
+
+
+def _scan_forms_serial(
+    forms: List[dict], payloads: List[Payload], context: ScanContext
+) -> List[Finding]:
+    """Последовательно сканирует формы одну за другой."""
+    all_findings: List[Finding] = []
+    for idx, form in enumerate(forms):
+        form_id = form.get("form_id", f"index_{idx}")
+        try:
+            form_findings = _with_copies(
+                context, form, scan_form(form, payloads, context=context)
+            )
+            all_findings.extend(form_findings)
+            logger.info(
+                "Finished scanning form",
+                extra={
+                    "form_id": form_id,
+                    "findings_in_form": len(form_findings),
+                    "total_findings_so_far": len(all_findings),
+                },
+            )
+        except Exception as e:
+            logger.exception(
+                "Unexpected error while scanning form",
+                extra={"form_id": form_id, "error": str(e)},
+            )
+            context.mark_failed(form)
+            continue
+    return all_findings
+
+
+def _scan_forms_concurrent(
+    forms: List[dict], payloads: List[Payload], context: ScanContext
+) -> List[Finding]:
+    """
+    Сканирует формы в пуле потоков контекста.
+
+    Базовый ответ каждой формы запрашивается до отправки её payloads;
+    результаты собираются в том же порядке, что и при последовательном обходе.
+    """
+    executor = context.executor
+    all_findings: List[Finding] = []
+    baselines = [executor.submit(prepare_form, form, context) for form in forms]
+
+    form_futures: List[List[Future]] = []
+    for idx, (form, baseline) in enumerate(zip(forms, baselines)):
+        try:
+            prepared = baseline.result()
+            if prepared is None:
+                form_futures.append([])
+                continue
+            form_futures.append(submit_form(form, prepared, payloads, context))
+        except Exception as e:
+            logger.exception(
+                "Unexpected error while scanning form",
+                extra={
+                    "form_id": form.get("form_id", f"index_{idx}"),
+                    "error": str(e),
+                },
+            )
+            context.mark_failed(form)
+            form_futures.append([])
+
+    for idx, (form, futures) in enumerate(zip(forms, form_futures)):
+        form_findings = _with_copies(
+            context, form, collect_findings(form, futures, context)
+        )
+        all_findings.extend(form_findings)
+        logger.info(
+            "Finished scanning form",
+            extra={
+                "form_id": form.get("form_id", f"index_{idx}"),
+                "findings_in_form": len(form_findings),
+                "total_findings_so_far": len(all_findings),
+            },
+        )
+    return all_findings
+
+
 def scan_forms(
     forms: List[dict],
     payloads: List[Payload],
     rate_limit,
     session: Optional[requests.Session],
+    max_workers: int = SCAN_MAX_WORKERS,
+    context: Optional[ScanContext] = None,
+    timed_lane: int = SCAN_TIMED_LANE,
 ) -> List[Finding]:
     """
     Сканирует список форм, используя общую сессию requests.
 
+    TIME_BASED payloads выполняются в отдельном пуле из timed_lane потоков,
+    поэтому их задержки перекрываются друг с другом и с быстрыми запросами.
+    Anti-CSRF токены форм запрашиваются заранее в отдельном пуле из
+    CSRF_PREFETCH_WORKERS потоков. Одинаковые формы сканируются один раз,
+    находки переносятся на копии (поле details["reused_from_form"]).
+
     Параметры:
         forms: список словарей, представляющих формы
         payloads: список объектов Payload
         rate_limit: задержка между запросами (по умолчанию из конфига)
+        session: сессия requests (если None, создаётся новая и закрывается
+                 по окончании; переданную сессию закрывает вызывающий код)
+        max_workers: максимальное число одновременных запросов;
+                     1 означает последовательное сканирование
+        context: опциональный контекст скана; передайте его, чтобы после
+                 сканирования получить статистику (context.report())
+        timed_lane: число одновременных TIME_BASED payloads (0 — без полосы)
 
     Возвращает:
         Объединённый список уязвимостей, найденных во всех формах.
     """
     logger.info("Starting scan of %d forms", len(forms))
-    all_findings: List[Finding] = []
+    if context is None:
+        context = ScanContext(rate_limit=rate_limit)
+    forms = _collapse_forms(forms, context)
     if session is None:
+        session = context.session
+    owns_session = session is None
+    if owns_session:
         session = requests.Session()
+    context.session = session
+    if timed_lane > 0:
+        context.timed_executor = ThreadPoolExecutor(
+            max_workers=timed_lane, thread_name_prefix="scan-timed"
+        )
+    if context.csrf_tokens and CSRF_PREFETCH_WORKERS > 0:
+        context.token_executor = ThreadPoolExecutor(
+            max_workers=CSRF_PREFETCH_WORKERS, thread_name_prefix="scan-csrf"
+        )
 
     try:
-        for idx, form in enumerate(forms):
-            form_id = form.get("form_id", f"index_{idx}")
-            try:
-                form_findings = scan_form(form, payloads, session, rate_limit)
-                all_findings.extend(form_findings)
-                logger.info(
-                    "Finished scanning form",
-                    extra={
-                        "form_id": form_id,
-                        "findings_in_form": len(form_findings),
-                        "total_findings_so_far": len(all_findings),
-                    },
-                )
-            except Exception as e:
-                logger.exception(
-                    "Unexpected error while scanning form",
-                    extra={"form_id": form_id, "error": str(e)},
-                )
-                continue
+        if max_workers > 1:
+            with ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="scan"
+            ) as executor:
+                context.executor = executor
+                try:
+                    all_findings = _scan_forms_concurrent(forms, payloads, context)
+                finally:
+                    context.executor = None
+        else:
+            all_findings = _scan_forms_serial(forms, payloads, context)
     finally:
-        session.close()
+        if context.timed_executor is not None:
+            context.timed_executor.shutdown(wait=True)
+            context.timed_executor = None
+        if context.token_executor is not None:
+            context.token_executor.shutdown(wait=True)
+            context.token_executor = None
+        if owns_session:
+            session.close()
     logger.info(
         "Scan completed",
         extra={"forms_processed": len(forms), "total_findings": len(all_findings)},
     )
     return all_findings
+
+
+async def scan_field_async(
+    form: dict,
+    field: dict,
+    base_line_snapshot: detector.Baseline,
+    payloads: List[Payload],
+    base_data: dict,
+    context: ScanContext,
+) -> List[Finding]:
+    """Асинхронно сканирует одно поле: пробный этап, затем отобранные payloads."""
+    if not is_scannable_field(form, field):
+        return []
+
+    selected = await run_steps_async(
+        context,
+        plan_steps(form, field, base_line_snapshot, payloads, base_data, context),
+    )
+    results = await asyncio.gather(
+        *(
+            run_steps_async(
+                context,
+                payload_steps(
+                    form, field, base_line_snapshot, payload, base_data, context
+                ),
+            )
+            for payload in selected
+        )
+    )
+    return [finding for unit_findings in results for finding in unit_findings]
+
+
+async def scan_form_async(
+    form: dict, payloads: List[Payload], context: ScanContext
+) -> List[Finding]:
+    """
+    Асинхронно сканирует все поля одной формы.
+
+    Базовый ответ запрашивается первым, затем поля обрабатываются
+    корутинами параллельно; порядок результатов совпадает с scan_form.
+    """
+    prepared = await run_steps_async(context, baseline_steps(form, context))
+    if prepared is None:
+        return []
+
+    base_data, base_profile = prepared
+    if context.group_testing:
+        return await _scan_form_grouped_async(
+            form, base_profile, payloads, base_data, context
+        )
+    results = await asyncio.gather(
+        *(
+            scan_field_async(form, field, base_profile, payloads, base_data, context)
+            for field in form.get("inputs", [])
+        )
+    )
+    return [finding for field_findings in results for finding in field_findings]
+
+
+async def _scan_form_grouped_async(
+    form: dict,
+    base_profile: detector.BaselineProfile,
+    payloads: List[Payload],
+    base_data: dict,
+    context: ScanContext,
+) -> List[Finding]:
+    """Асинхронный аналог plan_groups и обхода групповых единиц формы."""
+    fields = [f for f in form.get("inputs", []) if is_scannable_field(form, f)]
+    plans = await asyncio.gather(
+        *(
+            run_steps_async(
+                context,
+                plan_steps(form, field, base_profile, payloads, base_data, context),
+            )
+            for field in fields
+        )
+    )
+    units = group_units(list(zip(fields, plans)), context.group_size, context.is_timed)
+    results = await asyncio.gather(
+        *(
+            run_steps_async(
+                context,
+                group_steps(form, group, base_profile, payload, base_data, context),
+            )
+            for payload, group in units
+        )
+    )
+    return [finding for unit_findings in results for finding in unit_findings]
+
+
+async def scan_forms_async(
+    forms: List[dict],
+    payloads: List[Payload],
+    rate_limit: float = RATE_LIMIT,
+    session: Optional[requests.Session] = None,
+    max_in_flight: int = SCAN_MAX_IN_FLIGHT,
+    context: Optional[ScanContext] = None,
+    timed_lane: int = SCAN_TIMED_LANE,
+) -> List[Finding]:
+    """
+    Асинхронно сканирует список форм.
+
+    Каждая единица работы — корутина, а не поток; одновременно в полёте
+    находится не более max_in_flight запросов и ещё не более timed_lane
+    TIME_BASED запросов в их отдельной полосе.
+
+    Параметры:
+        forms: список словарей, представляющих формы
+        payloads: список объектов Payload
+        rate_limit: минимальный интервал между запросами
+        session: опциональная requests-сессия, из которой берутся cookies
+        max_in_flight: ограничение числа одновременных запросов
+        context: опциональный контекст скана (для получения статистики)
+        timed_lane: ограничение числа одновременных TIME_BASED запросов
+                    (0 — они делят общий семафор)
+
+    Возвращает:
+        Объединённый список уязвимостей в том же порядке, что и scan_forms.
+    """
+    logger.info("Starting async scan of %d forms", len(forms))
+    if context is None:
+        context = ScanContext(rate_limit=rate_limit)
+    forms = _collapse_forms(forms, context)
+    if session is not None:
+        context.session = session
+    context.semaphore = asyncio.Semaphore(max(1, max_in_flight))
+    context.timed_semaphore = asyncio.Semaphore(timed_lane) if timed_lane > 0 else None
+    all_findings: List[Finding] = []
+
+    async with create_async_session(
+        context.session, limit=max_in_flight + max(timed_lane, 0)
+    ) as async_session:
+        context.async_session = async_session
+        try:
+            results = await asyncio.gather(
+                *(scan_form_async(form, payloads, context) for form in forms),
+                return_exceptions=True,
+            )
+        finally:
+            await _cancel_token_tasks(context)
+            context.async_session = None
+
+    for idx, (form, result) in enumerate(zip(forms, results)):
+        form_id = form.get("form_id", f"index_{idx}")
+        if isinstance(result, BaseException):
+            logger.error(
+                "Unexpected error while scanning form",
+                extra={"form_id": form_id, "error": str(result)},
+            )
+            context.mark_failed(form)
+            continue
+        result = _with_copies(context, form, result)
+        all_findings.extend(result)
+        logger.info(
+            "Finished scanning form",
+            extra={
+                "form_id": form_id,
+                "findings_in_form": len(result),
+                "total_findings_so_far": len(all_findings),
+            },
+        )
+
+    logger.info(
+        "Async scan completed",
+        extra={"forms_processed": len(forms), "total_findings": len(all_findings)},
+    )
+    return all_findings
@@ -0,0 +1,161 @@
+"""
+Модуль отслеживает потерю аутентификации во время скана.
+
+Если сессия истекла посреди скана, сервер отвечает страницей входа: такие
+ответы распознаются по перенаправлению на LOGIN_PATH или по индикаторам
+SESSION_LOST_INDICATORS, которых нет в базовом ответе формы. Отказ по
+CSRF-токену потерей сессии не считается (см. CSRF_REJECTION_MARKERS).
+AuthGuard приостанавливает отправку новых запросов, выполняет повторный
+вход через переданную функцию и увеличивает поколение сессии, по которому
+сканер перестраивает базовые ответы форм и повторяет затронутые запросы.
+
+Классы:
+    AuthGuard – пауза запросов и повторный вход, общий для всех единиц работы.
+
+Функции:
+    session_lost – проверяет, является ли ответ признаком потери сессии.
+"""
+
+import asyncio
+from threading import Event, Lock
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+from .models import ResponseSnapshot
+from .detectors import BaselineProfile
+from src.config import (
+    LOGIN_PATH,
+    SESSION_LOST_INDICATORS,
+    AUTH_MAX_REAUTH,
+)
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _is_login_url(url: Optional[str]) -> bool:
+    return urlparse(url or "").path.lower().endswith(LOGIN_PATH)
+
+
+def session_lost(
+    snapshot: Optional[ResponseSnapshot],
+    form: dict,
+    baseline: Optional[BaselineProfile] = None,
+) -> bool:
+    """
+    Проверяет, похож ли ответ на страницу входа вместо страницы формы.
+
+    Параметры:
+        snapshot: ответ на запрос формы
+        form:     форма (формы, отправляемые на саму страницу входа,
+                  не проверяются)
+        baseline: профиль базового ответа формы; без него проверяется
+                  только перенаправление
+
+    Возвращает:
+        True, если ответ перенаправлен на страницу входа или содержит
+        признак страницы входа, отсутствующий в базовом ответе.
+    """
+    if snapshot is None or _is_login_url(form.get("action")):
+        return False
+    if _is_login_url(snapshot.url):
+        return True
+    if baseline is None:
+        return False
+    body = (snapshot.body or "").lower()
+    return any(
+        indicator in body and indicator not in baseline.lower_body
+        for indicator in SESSION_LOST_INDICATORS
+    )
+
+
+class AuthGuard:
+    """
+    Повторный вход при потере сессии, общий для всех единиц работы скана.
+
+    Пока выполняется вход, новые запросы ждут (wait/wait_async). Единица
+    работы, получившая страницу входа, вызывает recover с поколением,
+    которое она видела до отправки запроса: если другая единица уже
+    восстановила сессию, повторный вход не выполняется.
+
+    Параметры:
+        reauth:     функция повторного входа; возвращает True при успехе
+        max_reauth: максимальное число попыток входа за скан
+    """
+
+    def __init__(self, reauth: Callable[[], bool], max_reauth: int = AUTH_MAX_REAUTH):
+        self._reauth = reauth
+        self.max_reauth = max_reauth
+        self.generation = 0
+        self.reauths = 0
+        self.failures = 0
+        self._lock = Lock()
+        self._ready = Event()
+        self._ready.set()
+        self._async_lock = asyncio.Lock()
+        self._async_ready = asyncio.Event()
+        self._async_ready.set()
+
+    def wait(self) -> None:
+        """Дожидается окончания повторного входа, если он выполняется."""
+        self._ready.wait()
+
+    async def wait_async(self) -> None:
+        """Асинхронный аналог wait."""
+        await self._async_ready.wait()
+
+    def _attempt(self) -> bool:
+        """Выполняет повторный вход в пределах бюджета попыток."""
+        if self.reauths + self.failures >= self.max_reauth:
+            return False
+        try:
+            ok = bool(self._reauth())
+        except Exception as e:
+            logger.exception("Re-authentication failed", extra={"error": str(e)})
+            ok = False
+        if ok:
+            self.reauths += 1
+            self.generation += 1
+        else:
+            self.failures += 1
+        message = "re-authenticated" if ok else "re-authentication failed"
+        logger.info(
+            "Session lost during scan, " + message,
+            extra={"generation": self.generation, "reauths": self.reauths},
+        )
+        return ok
+
+    def recover(self, seen: int) -> bool:
+        """
+        Восстанавливает сессию после ответа, полученного в поколении seen.
+
+        Возвращает:
+            True, если сессия восстановлена (этим или другим вызовом).
+        """
+        with self._lock:
+            if self.generation != seen:
+                return True
+            self._ready.clear()
+            try:
+                return self._attempt()
+            finally:
+                self._ready.set()
+
+    async def recover_async(self, seen: int) -> bool:
+        """Асинхронный аналог recover; вход выполняется в отдельном потоке."""
+        async with self._async_lock:
+            if self.generation != seen:
+                return True
+            self._async_ready.clear()
+            try:
+                return await asyncio.to_thread(self._attempt)
+            finally:
+                self._async_ready.set()
+
+    def to_dict(self) -> dict:
+        """Возвращает сведения о повторных входах для сводки скана."""
+        return {
+            "generation": self.generation,
+            "reauths": self.reauths,
+            "failures": self.failures,
+        }
@@ -0,0 +1,903 @@
+"""
+Модуль описывает шаги единиц работы сканера — общую логику синхронного
+и асинхронного путей.
+
+Единица работы (базовый ответ формы, пробный этап поля, payload в поле,
+payload в группу полей) записана один раз — генератором шагов. Генератор
+не выполняет ввод-вывод сам: он выдаёт транспорту операции (Request,
+Recover, Rebuild, Slot) и получает их результат через send. Транспорт
+(scanner.run_steps — потоки, scanner.run_steps_async — asyncio) выполняет
+операции и решает только, как ждать: блокировкой потока или корутиной.
+Исключение операции передаётся в генератор через throw.
+
+Классы:
+    Request – одна отправка формы (с anti-CSRF токеном, если он нужен).
+    Recover – повторный вход после потери сессии.
+    Rebuild – перестроение базового ответа формы после повторного входа.
+    Slot    – выполнение вложенных шагов в месте полосы payload.
+
+Функции:
+    request_steps  - отправка формы с повтором при отклонённом токене
+    checked_steps  - отправка с memo и повторным входом при потере сессии
+    baseline_steps - базовый ответ формы и его профиль
+    plan_steps     - пробный этап и канарейка XSS, отбор payloads для поля
+    timing_steps   - статистическое подтверждение задержки TIME_BASED payload
+    payload_steps  - отправка одного payload в одно поле формы
+    group_steps    - отправка payload в группу полей с делением сработавшей группы
+    evaluate_snapshot - детекторы над ответом на payload и находки
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple, TypeVar
+
+import src.scanner.detectors as detector
+from .types import Payload, MatchType
+from .context import ScanContext
+from .timing import SequentialTimingTest
+from .session_guard import session_lost
+from .csrf import TokenPool
+from .streaming import StreamDetection
+from .grouping import split_group
+from .memo import RequestKey, request_key
+from .incremental import fingerprint_of
+from .probe import (
+    DECISION_FULL,
+    DECISION_SKIP,
+    ProbeResult,
+    classify_canary,
+    classify_probe,
+    fits_reflection,
+    make_probe_values,
+    select_payloads,
+)
+from .models import (
+    Finding,
+    ResponseSnapshot,
+    build_base_line,
+    build_field_data,
+    build_group_data,
+    build_test_data,
+)
+from src.config import AUTH_MAX_RETRIES, CSRF_MAX_RETRIES
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+# генератор шагов: выдаёт операции, получает их результаты, возвращает T
+Steps = Generator[Any, Any, T]
+# отправка, допущенная в месте полосы: (ответ, базовый ответ, проверка тела)
+Sent = Tuple[
+    Optional[ResponseSnapshot],
+    Optional[detector.BaselineProfile],
+    Optional[StreamDetection],
+]
+
+
+@dataclass
+class Request:
+    """
+    Одна отправка формы. Результат — ResponseSnapshot или None.
+
+    Если задан pool, транспорт подставляет в data свежий anti-CSRF токен.
+    """
+
+    form: dict
+    data: dict
+    payload: Optional[Payload] = None
+    sink: Optional[StreamDetection] = None
+    pool: Optional[TokenPool] = None
+
+
+@dataclass
+class Recover:
+    """Повторный вход после потери сессии поколения seen. Результат — bool."""
+
+    seen: int
+
+
+@dataclass
+class Rebuild:
+    """
+    Перестроение базового ответа формы для поколения сессии generation
+    (см. ScanContext.rebuild_baseline). Результат — профиль или None.
+    """
+
+    form: dict
+    generation: int
+    base_data: dict
+
+
+@dataclass
+class Slot:
+    """
+    Выполнение шагов steps в месте полосы payload: в асинхронном пути место
+    семафора (ScanContext.semaphore_for) удерживается, пока шаги не
+    завершатся. Результат — значение, возвращённое steps.
+    """
+
+    payload: Optional[Payload]
+    steps: Steps
+
+
+def request_steps(
+    context: ScanContext,
+    form: dict,
+    data: dict,
+    payload: Optional[Payload] = None,
+    sink: Optional[StreamDetection] = None,
+) -> Steps[Optional[ResponseSnapshot]]:
+    """
+    Отправляет форму в рамках скана.
+
+    Формы с anti-CSRF полями получают для каждого запроса свежий токен
+    (см. TokenPool); запрос, отклонённый из-за токена, повторяется
+    не более CSRF_MAX_RETRIES раз. Ответ, отклонённый и после повторов,
+    не возвращается: единица работы считается невыполненной, а не чистой.
+
+    Параметры:
+        context: контекст скана
+        form:    словарь, представляющий форму
+        data:    данные для отправки
+        payload: payload, если запрос тестовый (None — базовый запрос)
+        sink:    пошаговая проверка тела ответа на payload (потоковый режим)
+    """
+    pool = context.token_pool(form)
+    if pool is None:
+        return (yield Request(form, data, payload, sink))
+
+    for _ in range(CSRF_MAX_RETRIES + 1):
+        snapshot = yield Request(form, data, payload, sink, pool)
+        if not pool.rejected(snapshot):
+            return snapshot
+        context.stats.incr("csrf_rejected")
+    context.stats.incr("csrf_failed")
+    logger.warning(
+        "CSRF token rejected after retries, response discarded",
+        extra={
+            "form_id": form.get("form_id"),
+            "payload_id": payload.payload_id if payload else None,
+        },
+    )
+    return None
+
+
+def fetch_baseline_steps(
+    context: ScanContext, form: dict, base_data: dict
+) -> Steps[Optional[detector.BaselineProfile]]:
+    """Запрашивает базовый ответ формы заново (после повторного входа)."""
+    snapshot = yield from request_steps(context, form, base_data)
+    if snapshot is None or session_lost(snapshot, form):
+        return None
+    context.stats.incr("baselines_rebuilt")
+    return detector.as_profile(snapshot)
+
+
+def checked_steps(
+    context: ScanContext,
+    form: dict,
+    data: dict,
+    base_data: dict,
+    baseline: Optional[detector.BaselineProfile] = None,
+    payload: Optional[Payload] = None,
+    sink: Optional[StreamDetection] = None,
+) -> Steps[Tuple[Optional[ResponseSnapshot], Optional[detector.BaselineProfile]]]:
+    """
+    Отправляет форму, отслеживая потерю сессии.
+
+    Если ответ оказался страницей входа (см. session_lost), выполняется
+    повторный вход через context.auth_guard, базовый ответ формы
+    перестраивается и запрос повторяется (не более AUTH_MAX_RETRIES раз).
+    Ответ на уже выполнявшуюся в скане отправку берётся из context.memo;
+    страницы входа в memo не попадают.
+
+    Параметры:
+        context:   контекст скана
+        form:      словарь, представляющий форму
+        data:      данные для отправки
+        base_data: базовые данные формы (для перестроения базового ответа)
+        baseline:  профиль базового ответа (None — запрашивается сам базовый ответ)
+        payload:   payload, если запрос тестовый
+        sink:      пошаговая проверка тела ответа на payload (потоковый режим)
+
+    Возвращает:
+        Кортеж (ответ или None, если сессию восстановить не удалось;
+        актуальный профиль базового ответа).
+    """
+    guard = context.auth_guard
+    baseline = context.latest_baseline(form, baseline)
+    key, cached = _memo_lookup(context, form, data, payload)
+    if cached is not None:
+        return cached, baseline
+    if guard is None:
+        snapshot = yield from request_steps(context, form, data, payload, sink)
+        _memo_store(context, key, snapshot, sink)
+        return snapshot, baseline
+
+    for attempt in range(AUTH_MAX_RETRIES + 1):
+        seen = guard.generation
+        snapshot = yield from request_steps(context, form, data, payload, sink)
+        if not session_lost(snapshot, form, baseline):
+            _memo_store(context, key, snapshot, sink)
+            return snapshot, baseline
+        context.stats.incr("auth_lost_responses")
+        if attempt == AUTH_MAX_RETRIES or not (yield Recover(seen)):
+            break
+        if baseline is not None:
+            rebuilt = yield Rebuild(form, guard.generation, base_data)
+            if rebuilt is None:
+                break
+            baseline = rebuilt
+        context.stats.incr("auth_retries")
+    _log_session_lost(form, payload)
+    return None, baseline
+
+
+def _admitted_send(
+    context: ScanContext,
+    form: dict,
+    prepare: Callable[[], Optional[dict]],
+    base_data: dict,
+    baseline: Optional[detector.BaselineProfile],
+    payload: Payload,
+) -> Steps[Optional[Sent]]:
+    """
+    Отправляет данные, которые вернул prepare, с проверкой тела по мере
+    чтения. prepare вызывается уже в месте полосы (см. Slot), поэтому
+    учитывает находки, подтверждённые, пока запрос ждал очереди.
+
+    Возвращает:
+        Кортеж Sent или None, если prepare отказался от запроса.
+    """
+    data = prepare()
+    if data is None:
+        return None
+    sink = context.stream_detection(form, baseline, payload)
+    snapshot, baseline = yield from checked_steps(
+        context, form, data, base_data, baseline, payload, sink
+    )
+    return snapshot, baseline, sink
+
+
+def baseline_steps(
+    form: dict, context: ScanContext
+) -> Steps[Optional[Tuple[dict, detector.BaselineProfile]]]:
+    """
+    Строит базовые данные формы, получает базовый ответ и его профиль.
+
+    Профиль строится один раз и передаётся детекторам всех полей и payloads.
+
+    Возвращает:
+        Кортеж (base_data, base_profile) или None, если форму сканировать нельзя.
+    """
+    inputs = form.get("inputs", [])
+    if not inputs:
+        logger.debug(
+            "Form has no inputs, skipping", extra={"form_id": form.get("form_id")}
+        )
+        return None
+
+    base_data = build_base_line(inputs)
+    base_snapshot, _ = yield Slot(
+        None, checked_steps(context, form, base_data, base_data)
+    )
+
+    if not base_snapshot:
+        logger.warning(
+            "Failed to obtain baseline response for form",
+            extra={"form_id": form.get("form_id")},
+        )
+        context.mark_failed(form)
+        return None
+
+    logger.debug(
+        "Baseline created",
+        extra={
+            "form_id": form.get("form_id"),
+            "status": base_snapshot.status_code,
+            "body_len": len(base_snapshot.body),
+            "response_time": base_snapshot.response_time,
+        },
+    )
+    return base_data, detector.as_profile(base_snapshot)
+
+
+def plan_steps(
+    form: dict,
+    field: dict,
+    base_line_snapshot: detector.Baseline,
+    payloads: List[Payload],
+    base_data: dict,
+    context: ScanContext,
+) -> Steps[List[Payload]]:
+    """
+    Выполняет пробный этап поля и возвращает payloads, которые стоит отправить.
+
+    Пробные значения отправляются по одному; второе отправляется только
+    если первое не выявило реакции поля. Первое значение одновременно
+    служит канарейкой XSS: XSS payloads отбираются по контекстам его отражения.
+    """
+    if not (context.probe_fields or context.xss_canary):
+        return list(payloads)
+
+    base_hash = detector.as_profile(base_line_snapshot).body_hash
+    probes = []
+    for value in _probe_values(context):
+        snapshot, rebuilt = yield Slot(
+            None,
+            checked_steps(
+                context,
+                form,
+                build_field_data(base_data, field, value),
+                base_data,
+                base_line_snapshot,
+            ),
+        )
+        if rebuilt is not base_line_snapshot:
+            base_line_snapshot, base_hash = rebuilt, rebuilt.body_hash
+        context.stats.incr("probe_requests")
+        probes.append((value, snapshot))
+        result = _classify_probes(context, base_line_snapshot, base_hash, probes)
+        if result.decision == DECISION_FULL:
+            break
+    return _apply_probe(context, form, field, payloads, result)
+
+
+def timing_steps(
+    form: dict,
+    field: dict,
+    base_line_snapshot: detector.Baseline,
+    payload: Payload,
+    test_data: dict,
+    test_snapshot: Optional[ResponseSnapshot],
+    context: ScanContext,
+) -> Steps[List[Finding]]:
+    """
+    Проверяет задержку ответа на TIME_BASED payload.
+
+    Ответ сравнивается с порогом по окну задержек формы; если он медленный,
+    payload отправляется повторно, пока последовательный тест не примет
+    решение.
+    """
+    if test_snapshot is None:
+        return []
+    window = context.latency_window(form)
+    fallback = base_line_snapshot.response_time
+    test = SequentialTimingTest()
+    decision = test.observe(
+        test_snapshot.response_time, window.slow_threshold(fallback)
+    )
+    while decision is None:
+        snapshot = yield Slot(payload, request_steps(context, form, test_data, payload))
+        if snapshot is None:
+            decision = False
+            break
+        decision = test.observe(snapshot.response_time, window.slow_threshold(fallback))
+    return _timing_findings(
+        context, form, field, payload, test_snapshot, test, decision
+    )
+
+
+def payload_steps(
+    form: dict,
+    field: dict,
+    base_line_snapshot: detector.Baseline,
+    payload: Payload,
+    base_data: dict,
+    context: ScanContext,
+) -> Steps[List[Finding]]:
+    """
+    Отправляет один payload в одно поле формы и запускает детекторы.
+
+    Политика досрочной остановки проверяется в месте полосы payload, чтобы
+    payloads, ожидающие очереди, учитывали уже подтверждённые находки.
+
+    Параметры:
+        form: словарь, представляющий форму
+        field: словарь поля
+        base_line_snapshot: базовый ответ
+        payload: объект Payload
+        base_data: словарь базовых данных для отправки
+        context: контекст скана
+
+    Возвращает:
+        Список обнаруженных уязвимостей (объекты Finding).
+    """
+    try:
+        test_data = build_test_data(base_data, field, payload)
+
+        def prepare() -> Optional[dict]:
+            if _skip_unit(context, form, field, payload):
+                context.stats.incr("requests_skipped_confirmed")
+                return None
+            _log_sending(form, field, payload)
+            return test_data
+
+        sent = yield Slot(
+            payload,
+            _admitted_send(
+                context, form, prepare, base_data, base_line_snapshot, payload
+            ),
+        )
+        if sent is None:
+            return []
+        test_snapshot, base_line_snapshot, sink = sent
+        if test_snapshot is None:
+            _unit_failed(context, form)
+            return []
+        timed = _needs_timing(context, payload)
+        findings = evaluate_snapshot(
+            form,
+            field,
+            base_line_snapshot,
+            payload,
+            test_snapshot,
+            timed=not timed,
+            streamed=sink.detections(base_line_snapshot) if sink else None,
+        )
+        if timed:
+            findings.extend(
+                (
+                    yield from timing_steps(
+                        form,
+                        field,
+                        base_line_snapshot,
+                        payload,
+                        test_data,
+                        test_snapshot,
+                        context,
+                    )
+                )
+            )
+        return _finish_unit(context, form, field, payload, findings)
+    except Exception as e:
+        _log_unit_error(form, field, payload, e)
+        _unit_failed(context, form)
+        return []
+
+
+def group_steps(
+    form: dict,
+    fields: List[dict],
+    base_line_snapshot: detector.Baseline,
+    payload: Payload,
+    base_data: dict,
+    context: ScanContext,
+    known_positive: bool = False,
+) -> Steps[List[Finding]]:
+    """
+    Отправляет один payload сразу в группу полей формы.
+
+    Если детекторы не сработали, поля группы считаются проверенным этим
+    payload. Иначе группа делится пополам (см. split_group): если первая
+    половина чиста, вторая считается сработавшей без отдельного запроса.
+    Отдельное поле проверяется через payload_steps, поэтому находки
+    относятся к конкретному полю.
+
+    Параметры:
+        form: словарь, представляющий форму
+        fields: поля группы
+        base_line_snapshot: базовый ответ
+        payload: объект Payload
+        base_data: словарь базовых данных для отправки
+        context: контекст скана
+        known_positive: группа уже признана сработавшей (запрос не нужен)
+
+    Возвращает:
+        Список обнаруженных уязвимостей (объекты Finding).
+    """
+    if len(fields) > 1 and not known_positive:
+        remaining = fields
+
+        def prepare() -> Optional[dict]:
+            nonlocal remaining
+            remaining = [
+                f for f in remaining if not _skip_unit(context, form, f, payload)
+            ]
+            if len(remaining) <= 1:
+                return None
+            _log_group(form, remaining, payload, False)
+            return build_group_data(base_data, remaining, payload.payload)
+
+        try:
+            sent = yield Slot(
+                payload,
+                _admitted_send(
+                    context, form, prepare, base_data, base_line_snapshot, payload
+                ),
+            )
+        except Exception as e:
+            _log_unit_error(form, remaining[0], payload, e)
+            sent = None
+        fields = remaining
+        if sent is not None:
+            snapshot, base_line_snapshot, sink = sent
+            if _group_cleared(
+                context, form, fields, payload, base_line_snapshot, snapshot, sink
+            ):
+                return []
+    else:
+        fields = [f for f in fields if not _skip_unit(context, form, f, payload)]
+        if len(fields) > 1:
+            _log_group(form, fields, payload, known_positive)
+
+    if len(fields) == 1:
+        return (
+            yield from payload_steps(
+                form, fields[0], base_line_snapshot, payload, base_data, context
+            )
+        )
+    if not fields:
+        # все поля группы уже подтверждены: не отправлен один запрос группы
+        context.stats.incr("requests_skipped_confirmed")
+        return []
+
+    left, right = split_group(fields)
+    findings = yield from group_steps(
+        form, left, base_line_snapshot, payload, base_data, context
+    )
+    findings.extend(
+        (
+            yield from group_steps(
+                form,
+                right,
+                base_line_snapshot,
+                payload,
+                base_data,
+                context,
+                known_positive=not findings,
+            )
+        )
+    )
+    return findings
+
+
+def _log_session_lost(form: dict, payload: Optional[Payload]) -> None:
+    logger.warning(
+        "Session lost and not recovered, response discarded",
+        extra={
+            "form_id": form.get("form_id"),
+            "payload_id": payload.payload_id if payload else None,
+        },
+    )
+
+
+def _memo_lookup(
+    context: ScanContext, form: dict, data: dict, payload: Optional[Payload]
+) -> Tuple[Optional[RequestKey], Optional[ResponseSnapshot]]:
+    """
+    Ищет ответ на такую же отправку в context.memo.
+
+    TIME_BASED payloads не кэшируются: их ответы — замеры задержки.
+
+    Возвращает:
+        Кортеж (ключ запроса или None, если запрос не кэшируется;
+        сохранённый ответ или None).
+    """
+    if not context.request_memo or context.is_timed(payload):
+        return None, None
+    key = request_key(form, data)
+    cached = context.memo.get(key)
+    if cached is not None:
+        context.stats.incr("requests_memoized")
+    return key, cached
+
+
+def _memo_store(
+    context: ScanContext,
+    key: Optional[RequestKey],
+    snapshot: Optional[ResponseSnapshot],
+    sink: Optional[StreamDetection],
+) -> None:
+    """
+    Сохраняет ответ в context.memo. Тело, обрезанное ограничением размера
+    при потоковом чтении, не сохраняется.
+    """
+    if key is None or snapshot is None:
+        return
+    if sink is not None and snapshot.truncated:
+        return
+    context.memo.put(key, snapshot)
+
+
+def evaluate_snapshot(
+    form: dict,
+    field: dict,
+    base_line_snapshot: detector.Baseline,
+    payload: Payload,
+    test_snapshot: Optional[ResponseSnapshot],
+    timed: bool = True,
+    streamed: Optional[Dict] = None,
+) -> List[Finding]:
+    """
+    Запускает детекторы над ответом на payload и формирует находки.
+
+    Общая часть синхронного и асинхронного путей сканирования. При
+    timed=False задержка ответа детекторами не проверяется; streamed —
+    результаты детекторов тела, полученные при потоковом чтении
+    (см. StreamDetection.detections).
+
+    Возвращает:
+        Список обнаруженных уязвимостей (объекты Finding).
+    """
+    findings: List[Finding] = []
+    field_name = field.get("name")
+
+    if not test_snapshot:
+        logger.warning(
+            "No response for payload, skipping",
+            extra={
+                "form_id": form.get("form_id"),
+                "field": field_name,
+                "payload_id": payload.payload_id,
+            },
+        )
+        return findings
+
+    logger.debug(
+        "Test snapshot received",
+        extra={
+            "form_id": form.get("form_id"),
+            "status": test_snapshot.status_code,
+            "body_len": len(test_snapshot.body),
+            "response_time": test_snapshot.response_time,
+        },
+    )
+
+    dets = detector.run_detectors(
+        base_line_snapshot, test_snapshot, payload, timed=timed, streamed=streamed
+    )
+    for d in dets:
+        if d.get("matched"):
+            findings.append(
+                Finding(
+                    form_index=form.get("form_id"),
+                    field_name=field_name,
+                    evidence=d.get("evidence") or "",
+                    payload=payload,
+                    response_time_ms=test_snapshot.response_time * 1000,
+                    body_len=len(test_snapshot.body),
+                    url=test_snapshot.url,
+                    details=_finding_details(d, test_snapshot),
+                )
+            )
+    return findings
+
+
+def _finding_details(result: dict, snapshot: ResponseSnapshot) -> dict:
+    """
+    Данные детектора для Finding.details; для обрезанного тела добавляется
+    body_truncated — body_len тогда отражает только прочитанную часть.
+    """
+    details = {k: v for k, v in result.items() if k not in ("matched", "evidence")}
+    if snapshot.truncated:
+        details["body_truncated"] = True
+    return details
+
+
+def _log_sending(form: dict, field: dict, payload: Payload) -> None:
+    logger.debug(
+        "Sending payload",
+        extra={
+            "form_id": form.get("form_id"),
+            "field": field.get("name"),
+            "payload_id": payload.payload_id,
+            "payload": payload.payload,
+        },
+    )
+
+
+def _log_unit_error(form: dict, field: dict, payload: Payload, e: Exception) -> None:
+    logger.exception(
+        "Error while scanning field with payload",
+        extra={
+            "form_id": form.get("form_id"),
+            "field": field.get("name"),
+            "payload_id": payload.payload_id,
+            "error": str(e),
+        },
+    )
+
+
+def _unit_failed(context: ScanContext, form: dict) -> None:
+    """Учитывает единицу работы без ответа: форма проверена не полностью."""
+    context.stats.incr("units_failed")
+    context.mark_failed(form)
+
+
+def _skip_unit(context: ScanContext, form: dict, field: dict, payload: Payload) -> bool:
+    """
+    Проверяет по политике досрочной остановки, нужно ли пропустить payload
+    в поле. Счётчик requests_skipped_confirmed ведёт вызывающий код: в
+    групповом режиме одно пропущенное поле ещё не означает пропущенный запрос.
+    """
+    if context.field_state(form, field).should_skip(payload):
+        logger.debug(
+            "Skipping payload, field already confirmed vulnerable",
+            extra={
+                "form_id": form.get("form_id"),
+                "field": field.get("name"),
+                "payload_id": payload.payload_id,
+                "vuln_type": payload.vuln_type.name,
+            },
+        )
+        return True
+    return False
+
+
+def _finish_unit(
+    context: ScanContext,
+    form: dict,
+    field: dict,
+    payload: Payload,
+    findings: List[Finding],
+) -> List[Finding]:
+    """
+    Учитывает находки единицы работы в состоянии поля и помечает их
+    отпечатком формы.
+    """
+    context.field_state(form, field).record(payload, findings, context.policy)
+    for finding in findings:
+        finding.form_fingerprint = fingerprint_of(form)
+    return findings
+
+
+def _needs_timing(context: ScanContext, payload: Payload) -> bool:
+    """Проверяет, подтверждается ли задержка payload статистическим тестом."""
+    return context.timing_confirm and payload.match_type == MatchType.TIME_BASED
+
+
+def _timing_findings(
+    context: ScanContext,
+    form: dict,
+    field: dict,
+    payload: Payload,
+    test_snapshot: ResponseSnapshot,
+    test: SequentialTimingTest,
+    confirmed: bool,
+) -> List[Finding]:
+    """Учитывает итог теста задержки и формирует находку при подтверждении."""
+    if test.extra_requests:
+        context.stats.incr("timing_extra_requests", test.extra_requests)
+    if not test.observations[0][1]:
+        return []
+    context.stats.incr("timing_confirmed" if confirmed else "timing_rejected")
+    details = test.to_dict()
+    logger.debug(
+        "Time-based test finished",
+        extra={
+            "form_id": form.get("form_id"),
+            "field": field.get("name"),
+            "payload_id": payload.payload_id,
+            "confirmed": confirmed,
+            **details,
+        },
+    )
+    if not confirmed:
+        return []
+    return [
+        Finding(
+            form_index=form.get("form_id"),
+            field_name=field.get("name"),
+            evidence=(
+                f"Time delay confirmed: {details['slow']}/{len(test.observations)}"
+                f" responses over {details['threshold_ms']:.0f} ms"
+            ),
+            payload=payload,
+            response_time_ms=test_snapshot.response_time * 1000,
+            body_len=len(test_snapshot.body),
+            url=test_snapshot.url,
+            details=_finding_details(details, test_snapshot),
+        )
+    ]
+
+
+def _log_group(
+    form: dict, fields: List[dict], payload: Payload, known_positive: bool
+) -> None:
+    logger.debug(
+        "Bisecting field group" if known_positive else "Sending payload to field group",
+        extra={
+            "form_id": form.get("form_id"),
+            "fields": [f.get("name") for f in fields],
+            "payload_id": payload.payload_id,
+        },
+    )
+
+
+def _group_cleared(
+    context: ScanContext,
+    form: dict,
+    fields: List[dict],
+    payload: Payload,
+    base_line_snapshot: detector.Baseline,
+    snapshot: Optional[ResponseSnapshot],
+    sink: Optional[StreamDetection],
+) -> bool:
+    """
+    Проверяет ответ на групповой запрос.
+
+    Если ни один детектор тела не сработал, поля группы учитываются
+    как проверенные payload. Группа без ответа считается сработавшей —
+    её поля проверяются по отдельности.
+
+    Возвращает:
+        True, если группу делить не нужно.
+    """
+    context.stats.incr("group_requests")
+    if snapshot is not None:
+        streamed = sink.detections(base_line_snapshot) if sink else None
+        if not detector.run_detectors(
+            base_line_snapshot, snapshot, payload, timed=False, streamed=streamed
+        ):
+            for field in fields:
+                _finish_unit(context, form, field, payload, [])
+            context.stats.incr("group_fields_cleared", len(fields))
+            return True
+    context.stats.incr("group_bisections")
+    return False
+
+
+def _apply_probe(
+    context: ScanContext,
+    form: dict,
+    field: dict,
+    payloads: List[Payload],
+    result: ProbeResult,
+) -> List[Payload]:
+    """
+    Записывает решение пробного этапа и идентификаторы отброшенных им
+    payloads в состояние поля и возвращает отобранные payloads.
+    """
+    selected = select_payloads(payloads, result)
+    kept = {id(p) for p in selected}
+    skipped = [p.payload_id for p in payloads if id(p) not in kept]
+    context.field_state(form, field).probe = {
+        **result.to_dict(),
+        "skipped_payloads": skipped,
+    }
+    pruned = len(payloads) - len(selected)
+    canary_pruned = 0
+    if result.decision != DECISION_SKIP:
+        canary_pruned = sum(
+            1 for p in payloads if not fits_reflection(p, result.reflection)
+        )
+    if canary_pruned:
+        context.stats.incr("requests_skipped_canary", canary_pruned)
+    if pruned - canary_pruned:
+        context.stats.incr("requests_skipped_probe", pruned - canary_pruned)
+    logger.debug(
+        "Field probed",
+        extra={
+            "form_id": form.get("form_id"),
+            "field": field.get("name"),
+            "decision": result.decision,
+            "reason": result.reason,
+            "reflection": result.reflection,
+            "payloads": len(selected),
+            "skipped_payloads": skipped,
+        },
+    )
+    return selected
+
+
+def _probe_values(context: ScanContext) -> List[str]:
+    """Возвращает пробные значения; первое из них — канарейка XSS."""
+    values = make_probe_values()
+    return values if context.probe_fields else values[:1]
+
+
+def _classify_probes(
+    context: ScanContext,
+    base_line_snapshot: detector.Baseline,
+    base_hash: str,
+    probes: List[Tuple[str, Optional[ResponseSnapshot]]],
+) -> ProbeResult:
+    """Принимает решение по ответам на пробы с учётом включённых этапов."""
+    if context.probe_fields:
+        result = classify_probe(base_line_snapshot, base_hash, probes)
+    else:
+        result = ProbeResult(DECISION_FULL, "not_probed", len(probes))
+    if context.xss_canary:
+        result.reflection = classify_canary(*probes[0])
+    return result
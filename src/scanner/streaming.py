@@ -0,0 +1,154 @@
+"""
+Модуль проверяет тело ответа на payload по мере его чтения.
+
+В потоковом режиме (STREAM_RESPONSES) тело читается частями и не больше
+RESPONSE_MAX_BYTES байт (см. models.BodyReader). StreamDetection запускает
+детекторы тела над каждой новой частью вместе с хвостом предыдущей:
+перекрытие не короче самой длинной сигнатуры, поэтому совпадение на
+границе частей не теряется. Детекторы SQL-ошибок и сигнатур после первого
+совпадения больше не запускаются; detect_patterns проверяет все части,
+чтобы смещения отражений покрывали всё прочитанное тело (отражение в
+перекрытии учитывается один раз).
+
+Чтение тела досрочно не прекращается: ответ дочитывается до конца или до
+ограничения размера, и соединение, прочитанное до конца, возвращается в
+общий пул (см. src/net/sessions.py).
+
+Классы:
+    StreamDetection – пошаговый запуск детекторов тела для одного ответа.
+"""
+
+from typing import Callable, Dict, List, Optional
+
+from .detectors import (
+    MAX_REFLECTIONS,
+    SQL_ERROR_MATCHER,
+    Baseline,
+    GENERIC_EVIDENCE,
+    BaselineProfile,
+    as_profile,
+    detect_evidence_patterns,
+    detect_patterns,
+    detect_sql_error,
+)
+from .models import ResponseSnapshot
+from .types import Payload
+from src.config import STREAM_OVERLAP
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# детекторы, которым нужно тело ответа (detect_time_delay работает по времени)
+BODY_DETECTORS = (detect_sql_error, detect_patterns, detect_evidence_patterns)
+NO_MATCH = {"matched": False, "evidence": ""}
+
+
+class StreamDetection:
+    """
+    Пошаговый запуск детекторов тела над ответом, читаемым по частям.
+
+    Экземпляр передаётся в send_form_request как sink: start вызывается
+    перед чтением каждого ответа (повторная отправка сбрасывает
+    результаты), feed — для каждой декодированной части.
+
+    Смещения отражений в результате detect_patterns пересчитываются
+    относительно всего тела и собираются со всех частей (не больше
+    MAX_REFLECTIONS); evidence берётся из первого отражения.
+
+    Параметры:
+        base:    базовый ответ формы
+        payload: отправленный payload
+        overlap: минимальное перекрытие соседних частей в символах
+    """
+
+    def __init__(self, base: Baseline, payload: Payload, overlap: int = STREAM_OVERLAP):
+        self.base = as_profile(base)
+        self.payload = payload
+        literals = list(payload.variants) + list(payload.evidence_signatures)
+        self.overlap = max([overlap] + [len(s) for s in literals])
+        self.started = False
+        self.results: Dict[Callable, Dict] = {}
+        self.pending: List[Callable] = []
+        self._tail = ""
+        self._offset = 0
+
+    def _can_match(self, detector: Callable) -> bool:
+        """Может ли детектор найти совпадение при данном базовом ответе."""
+        base, payload = self.base, self.payload
+        if detector is detect_patterns:
+            return not all(base.contains(v) for v in payload.variants)
+        if detector is detect_evidence_patterns:
+            base_hits = base.signature_hits(payload.evidence_matcher)
+            return any(
+                p not in base_hits and p not in GENERIC_EVIDENCE
+                for p in payload.evidence_signatures
+            )
+        return len(base.sql_hits) < len(SQL_ERROR_MATCHER)
+
+    def start(self) -> None:
+        """Начинает проверку нового ответа."""
+        self.started = True
+        self.results = {}
+        self.pending = [d for d in BODY_DETECTORS if self._can_match(d)]
+        self._tail = ""
+        self._offset = 0
+
+    def feed(self, text: str) -> None:
+        """Проверяет очередную часть тела."""
+        window = self._tail + text
+        view = ResponseSnapshot(self.base.url, 0, window, len(window), 0.0)
+        for detector in list(self.pending):
+            try:
+                result = detector(self.base, view, self.payload)
+            except Exception as e:
+                logger.exception(
+                    "Error in streaming detector",
+                    extra={
+                        "detector": detector.__name__,
+                        "payload_id": self.payload.payload_id,
+                        "error": str(e),
+                    },
+                )
+                self.pending.remove(detector)
+                continue
+            if not result.get("matched"):
+                continue
+            if detector is detect_patterns:
+                self._merge_reflections(result)
+            else:
+                self.results[detector] = result
+                self.pending.remove(detector)
+        keep = min(len(window), self.overlap)
+        self._offset += len(window) - keep
+        self._tail = window[len(window) - keep :]
+
+    def _merge_reflections(self, result: Dict) -> None:
+        """Добавляет отражения части к результату detect_patterns."""
+        offsets = [self._offset + o for o in result["offsets"]]
+        found = self.results.get(detect_patterns)
+        if found is None:
+            self.results[detect_patterns] = {**result, "offsets": offsets}
+            return
+        found["offsets"] = sorted(set(found["offsets"]) | set(offsets))[
+            :MAX_REFLECTIONS
+        ]
+        found["variants"] = sorted(set(found["variants"]) | set(result["variants"]))
+
+    def detections(self, base: Optional[Baseline]) -> Optional[Dict[Callable, Dict]]:
+        """
+        Возвращает результаты детекторов тела для run_detectors.
+
+        Параметры:
+            base: базовый ответ, с которым сравнивается итоговый ответ
+
+        Возвращает:
+            Словарь {детектор: результат} или None, если ответ не читался
+            по частям либо базовый ответ сменился (после повторного входа) —
+            тогда детекторы запускаются над прочитанным телом заново.
+        """
+        if not self.started or base is None:
+            return None
+        snapshot = base.snapshot if isinstance(base, BaselineProfile) else base
+        if snapshot is not self.base.snapshot:
+            return None
+        return {d: self.results.get(d, NO_MATCH) for d in BODY_DETECTORS}
@@ -0,0 +1,163 @@
+"""
+Модуль реализует подтверждение time-based уязвимостей.
+
+Задержка ответа сравнивается не с одним базовым замером, а с распределением
+задержек формы, накопленным за время скана (медиана и MAD). Если ответ на
+TIME_BASED payload выглядит медленным, payload отправляется повторно, пока
+последовательный критерий отношения правдоподобия (SPRT) не примет одну
+из гипотез или не будет исчерпан лимит дополнительных запросов. Быстрый
+первый ответ отклоняет гипотезу сразу, без дополнительных запросов.
+
+Классы:
+    LatencyWindow        – скользящее окно задержек одной формы.
+    SequentialTimingTest – SPRT по серии ответов на один payload.
+"""
+
+from collections import deque
+from math import log
+from statistics import median
+from threading import Lock
+from typing import List, Optional, Tuple
+
+from src.config import (
+    TIME_DELAY_THRESHOLD_MS,
+    TIMING_WINDOW_SIZE,
+    TIMING_MIN_SAMPLES,
+    TIMING_MAD_K,
+    TIMING_SPRT_ALPHA,
+    TIMING_SPRT_BETA,
+    TIMING_SPRT_P0,
+    TIMING_SPRT_P1,
+    TIMING_MAX_EXTRA_REQUESTS,
+)
+
+# коэффициент, приводящий MAD к стандартному отклонению нормального распределения
+MAD_SCALE = 1.4826
+
+
+class LatencyWindow:
+    """
+    Скользящее окно задержек ответов одной формы (в секундах).
+
+    Пополняется базовыми, пробными и не TIME_BASED запросами скана.
+    Потокобезопасно.
+    """
+
+    def __init__(self, size: int = TIMING_WINDOW_SIZE):
+        self._samples = deque(maxlen=size)
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def add(self, latency: Optional[float]) -> None:
+        """Добавляет замер задержки."""
+        if latency is None:
+            return
+        with self._lock:
+            self._samples.append(latency)
+
+    def stats(self) -> Tuple[Optional[float], float]:
+        """
+        Возвращает медиану и масштабированный MAD окна.
+
+        Пока замеров меньше TIMING_MIN_SAMPLES, разброс считается нулевым.
+        """
+        with self._lock:
+            samples = list(self._samples)
+        if not samples:
+            return None, 0.0
+        center = median(samples)
+        if len(samples) < TIMING_MIN_SAMPLES:
+            return center, 0.0
+        return center, MAD_SCALE * median(abs(x - center) for x in samples)
+
+    def slow_threshold(self, fallback: float = 0.0) -> float:
+        """
+        Возвращает задержку, начиная с которой ответ считается медленным.
+
+        Параметры:
+            fallback: центр распределения, если замеров ещё нет
+                      (обычно время базового ответа)
+        """
+        center, spread = self.stats()
+        if center is None:
+            center = fallback
+        min_delay = TIME_DELAY_THRESHOLD_MS / 1000
+        return center + max(min_delay, TIMING_MAD_K * spread)
+
+    def to_dict(self) -> dict:
+        center, spread = self.stats()
+        return {
+            "samples": len(self),
+            "median_ms": round(center * 1000, 1) if center is not None else None,
+            "mad_ms": round(spread * 1000, 1),
+        }
+
+
+class SequentialTimingTest:
+    """
+    Последовательный критерий Вальда для серии ответов на один payload.
+
+    Каждое наблюдение — признак «ответ медленнее порога». Гипотеза H1
+    (payload вызывает задержку) предполагает медленный ответ с вероятностью
+    p1, гипотеза H0 — с вероятностью p0. Наблюдения копятся, пока
+    логарифм отношения правдоподобия не выйдет за одну из границ.
+
+    Атрибуты:
+        observations: пары (задержка, медленный ли ответ)
+        llr:          текущий логарифм отношения правдоподобия
+    """
+
+    def __init__(
+        self,
+        alpha: float = TIMING_SPRT_ALPHA,
+        beta: float = TIMING_SPRT_BETA,
+        p0: float = TIMING_SPRT_P0,
+        p1: float = TIMING_SPRT_P1,
+        max_extra: int = TIMING_MAX_EXTRA_REQUESTS,
+    ):
+        self.upper = log((1 - beta) / alpha)
+        self.lower = log(beta / (1 - alpha))
+        self.slow_step = log(p1 / p0)
+        self.fast_step = log((1 - p1) / (1 - p0))
+        self.max_observations = 1 + max_extra
+        self.observations: List[Tuple[float, bool]] = []
+        self.thresholds: List[float] = []
+        self.llr = 0.0
+
+    @property
+    def extra_requests(self) -> int:
+        """Число дополнительных запросов, отправленных ради подтверждения."""
+        return max(len(self.observations) - 1, 0)
+
+    def observe(self, latency: float, threshold: float) -> Optional[bool]:
+        """
+        Учитывает очередной ответ.
+
+        Возвращает:
+            True — задержка подтверждена, False — отклонена,
+            None — нужен ещё один ответ.
+        """
+        slow = latency >= threshold
+        self.observations.append((latency, slow))
+        self.thresholds.append(threshold)
+        if len(self.observations) == 1 and not slow:
+            return False
+        self.llr += self.slow_step if slow else self.fast_step
+        if self.llr >= self.upper:
+            return True
+        if self.llr <= self.lower or len(self.observations) >= self.max_observations:
+            return False
+        return None
+
+    def to_dict(self) -> dict:
+        """Возвращает сведения о тесте для деталей находки."""
+        return {
+            "latencies_ms": [round(lat * 1000, 1) for lat, _ in self.observations],
+            "threshold_ms": round(self.thresholds[-1] * 1000, 1),
+            "slow": sum(1 for _, slow in self.observations if slow),
+            "llr": round(self.llr, 3),
+            "extra_requests": self.extra_requests,
+        }
@@ -2,19 +2,28 @@
 Модуль предоставляет класс Payload (абстракция полезной нагрузки)
 
 Классы:
-    Payload   – полезная нагрузка с метаинформацией.
-    Severity  – уровень опасности.
-    VulnType  – тип уязвимости.
-    MatchType – способ срабатывания.
+    Payload    – полезная нагрузка с метаинформацией.
+    PayloadSet – скомпилированный набор payloads с индексами.
+    Severity   – уровень опасности.
+    VulnType   – тип уязвимости.
+    MatchType  – способ срабатывания.
 
 Функции:
-    load_payloads() – десериализация списка Payload из JSON-файла.
+    generate_payload_variants() – варианты строки payload для поиска отражения.
+    load_payloads()      – десериализация списка Payload из JSON-файла.
+    load_payload_set()   – загрузка payloads в PayloadSet.
+    parse_payload_filter() – разбор фильтра payloads из параметров запроса.
 """
 
+import re
+import html
 import json
+import urllib.parse
 from enum import Enum
-from typing import List, Any, Dict
-from dataclasses import dataclass, asdict
+from typing import List, Any, Dict, FrozenSet, Iterator, Optional, Tuple
+from dataclasses import dataclass, asdict, field
+from .matching import SignatureMatcher
+from src.config import EVIDENCE_MATCH_TYPES, EVIDENCE_MIN_PATTERN_LEN
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -29,6 +38,11 @@ class Severity(Enum):
     HIGH = "HIGH"
     CRITICAL = "CRITICAL"
 
+    @property
+    def rank(self) -> int:
+        """Порядковый номер уровня: INFO — 0, CRITICAL — 4."""
+        return list(Severity).index(self)
+
 
 class VulnType(Enum):
     """Тип уязвимости."""
@@ -50,7 +64,21 @@ class MatchType(Enum):
     ERROR_BASED = "ERROR_BASED"
 
 
-@dataclass
+def generate_payload_variants(payload: str) -> FrozenSet[str]:
+    """Возвращает набор вариантов payload для поиска отражения."""
+    variants = {payload}
+    try:
+        variants.add(html.escape(payload))
+        variants.add(urllib.parse.quote_plus(payload))
+    except Exception:
+        pass
+    variants.add(re.sub(r"\s+", "", payload))
+    variants.add(re.sub(r"\W+", "", payload))
+    variants.discard("")
+    return frozenset(variants)
+
+
+@dataclass(slots=True)
 class Payload:
     """
     Полезная нагрузка с метаданными.
@@ -70,6 +98,63 @@ class Payload:
     severity: Severity
     match_type: MatchType
     evidence_patterns: List[str]
+    _variants: Optional[FrozenSet[str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _evidence: Optional[Tuple[str, ...]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _evidence_matcher: Optional[SignatureMatcher] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def variants(self) -> FrozenSet[str]:
+        """Варианты строки payload для поиска отражения (вычисляются один раз)."""
+        if self._variants is None:
+            self._variants = generate_payload_variants(self.payload)
+        return self._variants
+
+    @property
+    def evidence_signatures(self) -> Tuple[str, ...]:
+        """
+        Evidence-паттерны в нижнем регистре, пригодные для поиска в ответе.
+
+        Пусты для способов срабатывания вне EVIDENCE_MATCH_TYPES; короткие
+        паттерны и паттерны, содержащиеся в тексте самого payload (они
+        появились бы в ответе при простом отражении), отбрасываются.
+        """
+        if self._evidence is None:
+            text = self.payload.lower()
+            patterns = []
+            if self.match_type.value in EVIDENCE_MATCH_TYPES:
+                patterns = [
+                    p.lower()
+                    for p in self.evidence_patterns
+                    if len(p) >= EVIDENCE_MIN_PATTERN_LEN and p.lower() not in text
+                ]
+            self._evidence = tuple(dict.fromkeys(patterns))
+        return self._evidence
+
+    @property
+    def evidence_matcher(self) -> SignatureMatcher:
+        """
+        Сопоставитель evidence-паттернов: общий для PayloadSet, в который
+        входит payload, либо построенный по паттернам самого payload.
+        """
+        if self._evidence_matcher is None:
+            self._evidence_matcher = SignatureMatcher(list(self.evidence_signatures))
+        return self._evidence_matcher
+
+    def precompute(self, evidence_matcher: Optional[SignatureMatcher] = None) -> None:
+        """
+        Заранее вычисляет варианты payload и задаёт сопоставитель
+        evidence-паттернов (например, общий для PayloadSet).
+        """
+        if self._variants is None:
+            self._variants = generate_payload_variants(self.payload)
+        if evidence_matcher is not None:
+            self._evidence_matcher = evidence_matcher
 
     def to_dict(self) -> dict:
         return {
@@ -119,3 +204,138 @@ def load_payloads(path: str) -> List[Payload]:
 
     logger.info("Payloads loaded", extra={"path": path, "count": len(out)})
     return out
+
+
+class PayloadSet:
+    """
+    Набор payloads, скомпилированный один раз при запуске.
+
+    Варианты отражения всех payloads вычисляются при построении, а их
+    evidence-паттерны компилируются в один общий сопоставитель; payloads
+    проиндексированы по VulnType, MatchType и Severity. Выборки по фильтру
+    кэшируются и сохраняют исходный порядок payloads. Набор ведёт себя как
+    последовательность и может передаваться сканеру вместо списка.
+    """
+
+    __slots__ = (
+        "payloads",
+        "by_vuln_type",
+        "by_match_type",
+        "by_severity",
+        "evidence_matcher",
+        "_cache",
+    )
+
+    def __init__(self, payloads: List[Payload]):
+        self.payloads: Tuple[Payload, ...] = tuple(payloads)
+        self.by_vuln_type: Dict[VulnType, FrozenSet[int]] = {}
+        self.by_match_type: Dict[MatchType, FrozenSet[int]] = {}
+        self.by_severity: Dict[Severity, FrozenSet[int]] = {}
+        self._cache: Dict[tuple, Tuple[Payload, ...]] = {}
+
+        for index_name, key in (
+            ("by_vuln_type", "vuln_type"),
+            ("by_match_type", "match_type"),
+            ("by_severity", "severity"),
+        ):
+            groups: Dict[Any, set] = {}
+            for pos, payload in enumerate(self.payloads):
+                groups.setdefault(getattr(payload, key), set()).add(pos)
+            setattr(self, index_name, {k: frozenset(v) for k, v in groups.items()})
+
+        self.evidence_matcher = SignatureMatcher(
+            [sig for p in self.payloads for sig in p.evidence_signatures]
+        )
+        for payload in self.payloads:
+            payload.precompute(self.evidence_matcher)
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    def __iter__(self) -> Iterator[Payload]:
+        return iter(self.payloads)
+
+    def __getitem__(self, index):
+        return self.payloads[index]
+
+    def select(
+        self,
+        vuln_types: Optional[FrozenSet[VulnType]] = None,
+        match_types: Optional[FrozenSet[MatchType]] = None,
+        min_severity: Optional[Severity] = None,
+    ) -> Tuple[Payload, ...]:
+        """
+        Возвращает payloads, удовлетворяющие фильтру, в исходном порядке.
+
+        Параметры:
+            vuln_types:   допустимые типы уязвимостей (None — любые)
+            match_types:  допустимые способы срабатывания (None — любые)
+            min_severity: минимальный уровень опасности (None — любой)
+        """
+        key = (
+            frozenset(vuln_types) if vuln_types else None,
+            frozenset(match_types) if match_types else None,
+            min_severity,
+        )
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        positions = set(range(len(self.payloads)))
+        if key[0] is not None:
+            positions &= self._union(self.by_vuln_type, key[0])
+        if key[1] is not None:
+            positions &= self._union(self.by_match_type, key[1])
+        if min_severity is not None:
+            allowed = [s for s in Severity if s.rank >= min_severity.rank]
+            positions &= self._union(self.by_severity, allowed)
+
+        selected = tuple(self.payloads[pos] for pos in sorted(positions))
+        self._cache[key] = selected
+        return selected
+
+    @staticmethod
+    def _union(index: Dict[Any, FrozenSet[int]], keys) -> set:
+        out: set = set()
+        for key in keys:
+            out |= index.get(key, frozenset())
+        return out
+
+
+def load_payload_set(path: str) -> PayloadSet:
+    """Загружает payloads из JSON-файла и компилирует их в PayloadSet."""
+    return PayloadSet(load_payloads(path))
+
+
+def parse_payload_filter(
+    types: Optional[str] = None,
+    match: Optional[str] = None,
+    severity: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Разбирает фильтр payloads из параметров запроса.
+
+    Параметры:
+        types:    типы уязвимостей через запятую (например, "SQLI,XSS")
+        match:    способы срабатывания через запятую (например, "ERROR_BASED")
+        severity: минимальный уровень опасности (например, "HIGH")
+
+    Возвращает:
+        Именованные аргументы для PayloadSet.select().
+
+    Исключения:
+        ValueError – при неизвестном значении.
+    """
+
+    def parse_list(value: Optional[str], enum_cls):
+        if not value:
+            return None
+        return frozenset(
+            enum_cls(v.strip().upper()) for v in value.split(",") if v.strip()
+        )
+
+    return {
+        "vuln_types": parse_list(types, VulnType),
+        "match_types": parse_list(match, MatchType),
+        "min_severity": Severity(severity.strip().upper()) if severity else None,
+    }
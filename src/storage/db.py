@@ -9,12 +9,23 @@
     count           - количество находок
     status_code     - статус ответа
     response_size   - размер ответа в символах
+
+Таблица `scan_forms` хранит отпечатки форм скана (для инкрементальных
+повторных сканов, см. src/scanner/incremental.py):
+    scan_id         - идентификатор записи в scans
+    fingerprint     - отпечаток формы
+    form_id         - значение атрибута id формы
+    action          - адрес отправки формы
+    payloads_digest - отпечаток набора payloads скана
+    status          - "scanned" или "failed" (форма проверена не полностью)
+    findings_json   - находки формы в JSON
 """
 
+import json
 import sqlite3
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Iterator, Dict, Any
+from typing import Optional, Iterator, Dict, Any, List, Tuple
 from contextlib import contextmanager
 from src.config import DEFAULT_DB_PATH
 from src.logger import get_logger
@@ -65,14 +76,13 @@ def db_connect(path: Optional[str] = None) -> Iterator[sqlite3.Cursor]:
 
 def init_db(path: Optional[str] = None):
     """
-    Создаёт таблицу scans, если она ещё не существует.
+    Создаёт таблицы scans и scan_forms, если они ещё не существуют.
 
     Параметры:
         path: путь к БД (если None, используется DEFAULT_DB_PATH).
     """
     with db_connect(path) as cursor:
-        cursor.execute(
-            """
+        cursor.execute("""
             CREATE TABLE IF NOT EXISTS scans(
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 target TEXT NOT NULL,
@@ -82,7 +92,28 @@ def init_db(path: Optional[str] = None):
                 status_code INTEGER,
                 response_size INTEGER
             )
-            """
+            """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scan_forms(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scan_id INTEGER NOT NULL REFERENCES scans(id),
+                fingerprint TEXT NOT NULL,
+                form_id TEXT,
+                action TEXT,
+                payloads_digest TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'scanned',
+                findings_json TEXT NOT NULL
+            )
+            """)
+        cursor.execute("PRAGMA table_info(scan_forms)")
+        if "status" not in {row["name"] for row in cursor.fetchall()}:
+            # БД, созданная до появления статуса формы
+            cursor.execute(
+                "ALTER TABLE scan_forms "
+                "ADD COLUMN status TEXT NOT NULL DEFAULT 'scanned'"
+            )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_scan_forms_scan ON scan_forms(scan_id)"
         )
         logger.info("Database initialized", extra={"path": path})
 
@@ -150,3 +181,91 @@ def get_scan(scan_id: int, path: Optional[str] = None) -> Optional[Dict[str, Any
         cursor.execute("SELECT * FROM scans WHERE id = ?", (scan_id,))
         row = cursor.fetchone()
     return dict(row) if row else None
+
+
+def save_scan_forms(
+    scan_id: int,
+    forms: List[Dict[str, Any]],
+    payloads_digest: str,
+    path: Optional[str] = None,
+) -> None:
+    """
+    Сохраняет отпечатки и находки форм скана.
+
+    Параметры:
+        scan_id: идентификатор записи скана.
+        forms: словари с ключами fingerprint, form_id, action, status
+               и findings (см. incremental.form_results).
+        payloads_digest: отпечаток набора payloads скана.
+        path: путь к БД (если None, используется DEFAULT_DB_PATH).
+    """
+    rows = [
+        (
+            scan_id,
+            form["fingerprint"],
+            form.get("form_id"),
+            form.get("action"),
+            payloads_digest,
+            form.get("status", "scanned"),
+            json.dumps(form.get("findings", [])),
+        )
+        for form in forms
+    ]
+    with db_connect(path) as cursor:
+        cursor.executemany(
+            """
+            INSERT INTO scan_forms
+                (scan_id, fingerprint, form_id, action, payloads_digest, status,
+                 findings_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    logger.info("scan forms saved", extra={"scan_id": scan_id, "forms": len(rows)})
+
+
+def get_latest_scan_forms(
+    target: str, payloads_digest: str, path: Optional[str] = None
+) -> Optional[Tuple[int, Dict[str, List[Dict[str, Any]]]]]:
+    """
+    Возвращает находки форм последнего скана цели с тем же набором payloads.
+
+    Формы, проверенные в этом скане не полностью (статус "failed"), не
+    возвращаются: повторный скан считает их новыми и сканирует заново.
+
+    Параметры:
+        target: URL цели.
+        payloads_digest: отпечаток набора payloads.
+        path: путь к БД (если None, используется DEFAULT_DB_PATH).
+
+    Возвращает:
+        Кортеж (scan_id, {отпечаток формы: находки}) или None, если
+        подходящего скана нет.
+    """
+    with db_connect(path) as cursor:
+        cursor.execute(
+            """
+            SELECT MAX(scans.id) FROM scans
+            JOIN scan_forms ON scan_forms.scan_id = scans.id
+            WHERE scans.target = ? AND scan_forms.payloads_digest = ?
+            """,
+            (target, payloads_digest),
+        )
+        scan_id = cursor.fetchone()[0]
+        if scan_id is None:
+            return None
+        cursor.execute(
+            "SELECT fingerprint, status, findings_json FROM scan_forms "
+            "WHERE scan_id = ?",
+            (scan_id,),
+        )
+        rows = cursor.fetchall()
+    failed = {row["fingerprint"] for row in rows if row["status"] == "failed"}
+    forms: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        if row["fingerprint"] in failed:
+            continue
+        forms.setdefault(row["fingerprint"], []).extend(
+            json.loads(row["findings_json"])
+        )
+    return scan_id, forms
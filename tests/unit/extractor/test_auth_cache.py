@@ -0,0 +1,178 @@
+from dataclasses import replace
+import requests
+from src.extractor.auth import LOGIN_FLOWS, fingerprint_target, try_login_bwapp
+from src.config import FINGERPRINT_MAX_BYTES
+from src.extractor.auth_cache import AuthSessionCache, app_root
+
+
+def fake_login(calls, success=True):
+    def login(session, target_url, timeout=8, **credentials):
+        calls.append(credentials)
+        if success:
+            session.cookies.set("PHPSESSID", f"s{len(calls)}", path="/")
+        return success
+
+    return login
+
+
+def test_cached_login_reuses_cookies_without_requests():
+    cache = AuthSessionCache(ttl=100, verify_interval=100)
+    calls = []
+
+    assert cache.login(requests.Session(), "http://t/a", "dvwa", fake_login(calls))
+    second = requests.Session()
+    assert cache.login(second, "http://t/b", "dvwa", fake_login(calls))
+
+    assert len(calls) == 1
+    assert second.cookies.get("PHPSESSID") == "s1"
+    assert cache.to_dict()["hits"] == 1
+
+
+def test_stale_entry_is_verified_and_relogged_when_expired(monkeypatch):
+    cache = AuthSessionCache(ttl=100, verify_interval=0)
+    calls = []
+    verdicts = [True, False]
+    monkeypatch.setattr(
+        "src.extractor.auth_cache.verify_login_success",
+        lambda *a: verdicts.pop(0),
+    )
+
+    for _ in range(3):
+        assert cache.login(requests.Session(), "http://t", "dvwa", fake_login(calls))
+
+    # первая проверка подтвердила сессию, вторая показала её истечение
+    assert len(calls) == 2
+    assert cache.to_dict()["verifications"] == 2
+
+
+def test_failed_login_is_remembered_per_credentials():
+    cache = AuthSessionCache(failure_ttl=100)
+    calls = []
+    login = fake_login(calls, success=False)
+
+    assert not cache.login(requests.Session(), "http://t", "dvwa", login, username="a")
+    assert not cache.login(requests.Session(), "http://t", "dvwa", login, username="a")
+    assert not cache.login(requests.Session(), "http://t", "dvwa", login, username="b")
+
+    assert calls == [{"username": "a"}, {"username": "b"}]
+
+
+def test_expired_ttl_and_invalidate_force_login():
+    cache = AuthSessionCache(ttl=-1, verify_interval=100)
+    calls = []
+
+    cache.login(requests.Session(), "http://t", "dvwa", fake_login(calls))
+    cache.login(requests.Session(), "http://t", "dvwa", fake_login(calls))
+    assert len(calls) == 2
+
+    cache.ttl = 100
+    assert cache.invalidate("http://t/x") == 1
+    cache.login(requests.Session(), "http://t", "dvwa", fake_login(calls))
+    assert len(calls) == 3
+
+
+class FakeResponse:
+    def __init__(self, url, text, history=()):
+        self.url = url
+        self.content = text.encode()
+        self.headers = {"content-type": "text/html; charset=utf-8"}
+        self.history = list(history)
+        self.cookies = requests.cookies.RequestsCookieJar()
+        self.read = 0
+        self.closed = False
+
+    def iter_content(self, size):
+        for start in range(0, len(self.content), size):
+            self.read += size
+            yield self.content[start : start + size]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+        self.cookies = requests.cookies.RequestsCookieJar()
+
+    def get(self, url, timeout=None, stream=False):
+        assert stream
+        self.requested.append(url)
+        return self.pages[url]
+
+
+def test_fingerprint_by_title_after_redirect():
+    redirect = FakeResponse("http://t/vulnerabilities/sqli/", "")
+    page = FakeResponse(
+        "http://t/login.php",
+        "<html><title>Login :: Damn Vulnerable Web Application (DVWA)</title>",
+        history=[redirect],
+    )
+    session = FakeSession({"http://t/vulnerabilities/sqli/": page})
+
+    assert fingerprint_target(session, "http://t/vulnerabilities/sqli/").name == "dvwa"
+
+
+def test_fingerprint_reads_at_most_fingerprint_max_bytes():
+    page = FakeResponse(
+        "http://t/login.php",
+        "<title>Damn Vulnerable Web Application</title>"
+        + "x" * (FINGERPRINT_MAX_BYTES * 4),
+    )
+    session = FakeSession({"http://t/": page})
+
+    assert fingerprint_target(session, "http://t/").name == "dvwa"
+    assert page.read <= FINGERPRINT_MAX_BYTES and page.closed
+
+
+def test_identify_is_cached_per_app_root_and_skips_unknown_targets(monkeypatch):
+    cache = AuthSessionCache()
+    pages = {
+        "http://h/bWAPP/sqli_1.php": FakeResponse("u", "<title>bWAPP - SQL</title>"),
+        "http://h/shop/item.php": FakeResponse("u", "<title>Shop</title>"),
+    }
+    session = FakeSession(pages)
+    logins = []
+    monkeypatch.setitem(
+        LOGIN_FLOWS,
+        "bwapp",
+        replace(LOGIN_FLOWS["bwapp"], login=lambda *a, **k: logins.append(a) or True),
+    )
+
+    for _ in range(2):
+        assert cache.authenticate(session, "http://h/bWAPP/sqli_1.php") == "bwapp"
+        assert cache.authenticate(session, "http://h/shop/item.php") is None
+
+    assert session.requested == list(pages)
+    assert len(logins) == 1
+
+
+def test_app_root_treats_last_segment_without_extension_as_directory():
+    assert app_root("http://localhost/DVWA") == "http://localhost/DVWA"
+    assert app_root("http://localhost/DVWA/") == "http://localhost/DVWA"
+    assert app_root("http://localhost/DVWA/vulnerabilities/sqli/") == (
+        "http://localhost/DVWA"
+    )
+    assert app_root("http://localhost/bWAPP/sqli_1.php") == "http://localhost/bWAPP"
+    assert app_root("http://localhost/index.php") == "http://localhost"
+    assert app_root("http://localhost") == "http://localhost"
+
+
+def test_login_flow_matches_path_and_cookie():
+    flow = LOGIN_FLOWS["bwapp"]
+
+    assert flow.matches("", ["http://h/bWAPP/portal.php"], [])
+    assert flow.matches("", ["http://h/"], ["security_level"])
+    assert not flow.matches("shop", ["http://h/"], ["PHPSESSID"])
+
+
+def test_bwapp_login_page_is_relative_to_target(monkeypatch):
+    urls = []
+    monkeypatch.setattr(
+        "src.extractor.auth.fetch_login_page", lambda s, url, t: urls.append(url)
+    )
+
+    try_login_bwapp(requests.Session(), "http://h/bWAPP/sqli_1.php")
+
+    assert urls == ["http://h/bWAPP/login.php"]
@@ -63,3 +63,63 @@ def test_empty_html():
 def test_no_forms():
     html = "<div></div>"
     assert extract_forms(html, "url") == []
+
+
+PAGE = """<?xml version="1.0" encoding="utf-8"?>
+<html><head><script>var x = 1;</script></head><body>
+<form action="/login" method="POST" id="login">
+  <input name="user" required placeholder="Логин">
+  <input type="password" name="pass">
+  <input type="submit" value="go"><input type="image" src="b.png">
+  <textarea name="note">привет</textarea>
+</form>
+<table><tr><td><form action="#"><input name="q"></form></td></tr></table>
+<form action="/empty"><button>ok</button></form>
+</body></html>"""
+
+
+def test_engines_return_identical_forms():
+    lxml_forms = extract_forms(PAGE, "https://host/a/", engine="lxml")
+    soup_forms = extract_forms(PAGE, "https://host/a/", engine="bs4")
+
+    assert [f.to_dict() for f in lxml_forms] == [f.to_dict() for f in soup_forms]
+    assert [f.meta["likely_js"] for f in lxml_forms] == [False, False, True]
+    assert [i.name for i in lxml_forms[0].inputs] == ["user", "pass", None, "note"]
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        extract_forms("<form></form>", "url", engine="regex")
+    assert extract_forms("   ", "url", engine="lxml") == []
+
+
+PARITY_PAGES = {
+    "nested": (
+        '<form action="/a"><input name="x">'
+        '<form action="/b"><input name="y"></form>'
+        '<input name="z"></form><script></script>'
+    ),
+    "textarea": (
+        '<form action="/a"><textarea name="t">hi &amp; <b>x</b></textarea>'
+        '<textarea name="e">1 &lt; 2</textarea></form>'
+    ),
+}
+
+
+@pytest.mark.parametrize("page", sorted(PARITY_PAGES))
+@pytest.mark.parametrize("engine", ["lxml", "stream"])
+def test_engines_match_soup_on_markup_lxml_repairs(page, engine):
+    html = PARITY_PAGES[page]
+    expected = [f.to_dict() for f in extract_forms(html, "https://h/", engine="bs4")]
+
+    forms = extract_forms(html, "https://h/", engine=engine)
+
+    assert [f.to_dict() for f in forms] == expected
+
+
+def test_parity_fixtures_keep_soup_structure():
+    nested = extract_forms(PARITY_PAGES["nested"], "https://h/", engine="bs4")
+    textarea = extract_forms(PARITY_PAGES["textarea"], "https://h/", engine="bs4")
+
+    assert [[i.name for i in f.inputs] for f in nested] == [["x", "y", "z"], ["y"]]
+    assert [i.value for i in textarea[0].inputs] == ["hi & x", "1 < 2"]
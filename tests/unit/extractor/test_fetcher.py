@@ -60,3 +60,37 @@ def test_http_requests(monkeypatch, status, ok, length):
     assert r["ok"] is ok
     if length is not None:
         assert r["length"] == length
+
+
+def test_fetch_chunks_sets_timeout_and_headers():
+    from src.config import DEFAULT_HEADER, REQUEST_TIMEOUT
+    from src.extractor.fetcher import fetch_chunks
+
+    calls = []
+
+    class MockStream:
+        url = "http://example.com/"
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, size):
+            return [b"<form>", b"</form>"]
+
+    class MockSession:
+        def get(self, url, **kwargs):
+            calls.append(kwargs)
+            return MockStream()
+
+    assert "".join(fetch_chunks("http://example.com/", MockSession())) == (
+        "<form></form>"
+    )
+    assert calls[0]["timeout"] == REQUEST_TIMEOUT
+    assert calls[0]["headers"] == DEFAULT_HEADER
@@ -0,0 +1,59 @@
+from src.extractor.extractor import extract_forms, load_forms, stream_forms
+from src.extractor.streaming import StreamingFormParser
+
+PAGE = """<html><body><form action="/login" method="POST" id="login">
+<input name="user" required><input type="submit" value="go">
+<textarea name="note">a &amp; <b>b</b><input name="in"></textarea></form>
+<form action="/outer"><input name="o"><form action="/inner"><input name="i">
+</form></form><form action="/empty"></form><script></script></body></html>"""
+
+
+def test_stream_engine_matches_soup_for_any_chunking():
+    expected = [f.to_dict() for f in extract_forms(PAGE, "https://h/", engine="bs4")]
+
+    for size in (1, 7, len(PAGE)):
+        parser = StreamingFormParser("https://h/")
+        forms = []
+        for start in range(0, len(PAGE), size):
+            forms += parser.push(PAGE[start : start + size])
+        forms += parser.finish()
+        assert [f.to_dict() for f in forms] == expected
+    assert [i["name"] for i in expected[0]["inputs"]] == ["user", None, "note", "in"]
+
+
+def test_empty_form_is_held_until_js_hint_is_known():
+    parser = StreamingFormParser("https://h/")
+
+    first = parser.push('<form action="/b"><input name="x"></form><form action="/a">')
+    assert [f.action for f in first] == ["https://h/b"]
+
+    assert parser.push('</form><form action="/c"><input name="y"></form>') == []
+    rest = parser.push("<script></script>") + parser.finish()
+    assert [(f.action, f.meta["likely_js"]) for f in rest] == [
+        ("https://h/a", True),
+        ("https://h/c", False),
+    ]
+
+
+def test_load_forms_keeps_late_js_hint(monkeypatch):
+    chunks = ['<form action="/a"></form><p>x</p>', "<script>1</script>"]
+    monkeypatch.setattr(
+        "src.extractor.extractor.fetch_chunks", lambda url, session: iter(chunks)
+    )
+
+    forms = load_forms("https://h/", engine="stream")
+
+    assert [f.to_dict()["meta"]["likely_js"] for f in forms] == [True]
+
+
+def test_stream_forms_reads_local_file_in_chunks(tmp_path):
+    page = tmp_path / "big.html"
+    page.write_text(
+        "<p>filler</p>" * 10000
+        + '<form action="http://h/x"><textarea name="t">v</textarea>',
+        encoding="utf-8",
+    )
+
+    forms = list(stream_forms(f"file://{page.as_posix()}"))
+
+    assert [(f.action, f.inputs[0].value) for f in forms] == [("http://h/x", "v")]
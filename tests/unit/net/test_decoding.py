@@ -0,0 +1,55 @@
+from src.net.decoding import BodyDecoder, header_charset, sniff_encoding
+
+CP1251_PAGE = '<meta charset="windows-1251"><p>Привет</p>'.encode("cp1251")
+
+
+def test_header_charset_and_sniffing():
+    assert header_charset("text/html; charset=UTF-8") == "utf-8"
+    assert header_charset("text/html") is None
+    assert sniff_encoding(CP1251_PAGE) == "cp1251"
+    assert sniff_encoding("<p>héllo</p>".encode("utf-8")) == "utf-8"
+
+
+def test_encoding_is_sniffed_once_per_endpoint(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "src.net.decoding.sniff_encoding",
+        lambda content: calls.append(1) or "cp1251",
+    )
+    decoder = BodyDecoder()
+
+    first = decoder.decode("http://t/a?q=1", CP1251_PAGE, "text/html")
+    later = decoder.decode("http://t/a?q=2", "<p>Пока</p>".encode("cp1251"), None)
+
+    assert "Привет" in first and later == "<p>Пока</p>"
+    assert len(calls) == 1
+    stats = decoder.to_dict()
+    assert stats["sniffed"] == 1 and stats["cached"] == 1
+    assert stats["decode_ms"] >= 0
+
+
+def test_ascii_bodies_and_header_charset_do_not_touch_cache():
+    decoder = BodyDecoder()
+
+    assert decoder.decode("http://t/a", b"<p>ok</p>", None) == "<p>ok</p>"
+    body = "<p>Ü</p>".encode("latin-1")
+    assert (
+        decoder.decode("http://t/a", body, "text/html; charset=latin-1") == "<p>Ü</p>"
+    )
+    # первый не-ASCII ответ без charset определяет кодировку адреса
+    assert decoder.decode("http://t/a", CP1251_PAGE, None).endswith("Привет</p>")
+
+    stats = decoder.to_dict()
+    assert (stats["ascii"], stats["header"], stats["sniffed"]) == (1, 1, 1)
+
+
+def test_encoding_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr("src.net.decoding.sniff_encoding", lambda content: "cp1251")
+    decoder = BodyDecoder(max_entries=2)
+
+    for url in ("http://a/x", "http://b/x", "http://a/x", "http://c/x"):
+        decoder.decode(url, CP1251_PAGE, None)
+
+    assert list(decoder._by_endpoint) == ["http://a/x", "http://c/x"]
+    assert list(decoder._by_origin) == ["http://b", "http://c"]
+    assert decoder.to_dict()["sniffed"] == 3
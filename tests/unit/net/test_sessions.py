@@ -0,0 +1,91 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from src.net.sessions import SessionPool
+from src.scanner.scanner import scan_forms
+from src.scanner.context import ScanContext
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def _reply(self, body=b"ok"):
+        Handler.connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply()
+
+    def do_HEAD(self):
+        self._reply()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    Handler.connections = set()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_sessions_share_adapter_and_connections(server):
+    pool = SessionPool(maxsize=4)
+
+    with pool.session(server + "/a") as first:
+        first.get(server + "/a")
+        adapter = first.get_adapter(server + "/a")
+    assert pool.to_dict()[server]["in_use"] == 0
+
+    with pool.session(server + "/b") as second:
+        assert second.get_adapter(server + "/b") is adapter
+        second.get(server + "/b")
+
+    # keep-alive соединение первой сессии переиспользовано второй
+    assert len(Handler.connections) == 1
+
+
+def test_prewarm_opens_connections_once_per_use(server):
+    pool = SessionPool(maxsize=4)
+
+    with pool.session(server) as session:
+        assert pool.prewarm(session, server, connections=3) == 3
+        assert pool.prewarm(session, server, connections=3) == 0
+    assert pool.to_dict()[server]["warmed"] == 0
+
+
+def test_evict_idle_skips_entries_in_use(server):
+    pool = SessionPool(maxsize=2, idle_timeout=1)
+    busy = pool.session(server)
+    idle = pool.session("http://idle.example/x")
+    idle.close()
+
+    evicted = pool.evict_idle(now=10**9)
+
+    assert evicted == ["http://idle.example"]
+    assert list(pool.to_dict()) == [server]
+    busy.close()
+
+
+def test_scan_forms_keeps_caller_session(monkeypatch):
+    pool = SessionPool(maxsize=2)
+    session = pool.session("http://ex/a")
+    closed = []
+    monkeypatch.setattr(session, "close", lambda: closed.append(True))
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", lambda *a, **k: None)
+
+    form = {"form_id": "f", "action": "http://ex/a", "inputs": [{"name": "q"}]}
+    scan_forms([form], [], 0, session, 1, context=ScanContext())
+
+    assert closed == []
@@ -0,0 +1,5 @@
+from src.net.urls import origin_of
+
+
+def test_origin_of():
+    assert origin_of("HTTP://Host:8080/a?b=1") == "http://host:8080"
@@ -0,0 +1,215 @@
+import asyncio
+import itertools
+import threading
+from types import SimpleNamespace
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.scanner.csrf import TokenPool, parse_tokens, token_fields
+from src.scanner.scanner import fetch_token, scan_forms, scan_forms_async
+from src.scanner.models import ResponseSnapshot
+from src.scanner.context import ScanContext
+from src.scanner.types import Payload, VulnType, Severity, MatchType
+
+
+def make_form(action="http://t/vuln/", page_url="http://t/vuln/"):
+    return {
+        "form_id": "f",
+        "action": action,
+        "method": "get",
+        "inputs": [
+            {"name": "q", "field_type": "text"},
+            {"name": "user_token", "field_type": "hidden", "value": "stale"},
+        ],
+        "meta": {"page_url": page_url},
+    }
+
+
+def make_payloads(n):
+    return [
+        Payload(
+            payload_id=f"p{i}",
+            payload=f"<b>x{i}</b>",
+            vuln_type=VulnType.XSS,
+            severity=Severity.MEDIUM,
+            match_type=MatchType.REFLECTED,
+            evidence_patterns=[],
+        )
+        for i in range(n)
+    ]
+
+
+class TokenServer:
+    """Выдаёт токен на каждый GET страницы; single — действителен только последний."""
+
+    def __init__(self, single=False):
+        self.single = single
+        self.counter = itertools.count()
+        self.issued = set()
+        self.lock = threading.Lock()
+
+    def page(self):
+        with self.lock:
+            token = f"t{next(self.counter)}"
+            if self.single:
+                self.issued.clear()
+            self.issued.add(token)
+        return f"<form><input type='hidden' name='user_token' value='{token}'></form>"
+
+    def submit(self, data):
+        with self.lock:
+            if data.get("user_token") not in self.issued:
+                return "CSRF token is incorrect"
+            self.issued.discard(data["user_token"])
+        return f"<p>{data['q']}</p>"
+
+
+def run_sync_scan(monkeypatch, server, payloads):
+    def page(url, timeout=None):
+        return SimpleNamespace(
+            url=url, status_code=200, content=server.page().encode(), headers={}
+        )
+
+    session = SimpleNamespace(get=page)
+
+    def fake_send(form, data, *a, **k):
+        body = server.submit(data)
+        return ResponseSnapshot(form["action"], 200, body, len(body), 0.01)
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    context = ScanContext(adaptive_rate=False, probe_fields=False, xss_canary=False)
+    findings = scan_forms([make_form()], payloads, 0, session, 4, context=context)
+    return findings, context
+
+
+def test_parse_tokens_and_token_fields():
+    html = (
+        '<input type="hidden" value="a&amp;b" name="user_token">'
+        "<input name=csrf value=c1>"
+    )
+
+    assert parse_tokens(html, ["user_token", "csrf"]) == {
+        "user_token": "a&b",
+        "csrf": "c1",
+    }
+    assert parse_tokens(html, ["nonce"]) is None
+    assert token_fields(make_form()) == ["user_token"]
+
+
+def test_pool_reserves_up_to_size_and_turns_serial_on_rejection():
+    pool = TokenPool("http://t/", ["user_token"], size=2)
+
+    assert pool.reserve() == 2 and pool.reserve() == 0
+    pool.add({"user_token": "a"})
+    pool.add(None)
+    assert pool.take() == {"user_token": "a"} and pool.take() is None
+
+    rejected = ResponseSnapshot("u", 200, "CSRF token is incorrect", 23, 0.01)
+    assert pool.rejected(rejected)
+    assert pool.serial and pool.reserve() == 0
+
+
+def test_session_scoped_tokens_serialize_every_form_of_the_origin():
+    context = ScanContext()
+    first = context.token_pool(make_form(page_url="http://t/a/"))
+    second = context.token_pool(make_form(page_url="http://t/b/"))
+    other = context.token_pool(make_form(page_url="http://other/a/"))
+    second.add({"user_token": "early"})
+
+    rejected = ResponseSnapshot("u", 200, "CSRF token is incorrect", 23, 0.01)
+    assert first.rejected(rejected)
+
+    assert second.serial and second.serial_lock is first.serial_lock
+    assert second.take() is None
+    assert not other.serial and other.serial_lock is not first.serial_lock
+
+
+def test_token_rejected_after_retries_fails_the_unit(monkeypatch):
+    def fake_send(form, data, *a, **k):
+        body = "CSRF token is incorrect" if data["q"].startswith("<") else "ok"
+        return ResponseSnapshot(form["action"], 200, body, len(body), 0.01)
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    monkeypatch.setattr(
+        "src.scanner.detectors.run_detectors",
+        lambda *a, **k: [{"matched": True, "evidence": "rejection page"}],
+    )
+    page = SimpleNamespace(
+        url="http://t/vuln/", status_code=200, content=b"", headers={}
+    )
+    session = SimpleNamespace(get=lambda url, timeout=None: page)
+    form = make_form()
+    form["meta"]["fingerprint"] = "fp"
+    context = ScanContext(adaptive_rate=False, probe_fields=False, xss_canary=False)
+
+    assert scan_forms([form], make_payloads(2), 0, session, 1, context=context) == []
+    assert context.stats.get("csrf_failed") == 2
+    assert context.stats.get("units_failed") == 2
+    assert context.report()["failed_forms"] == ["fp"]
+
+
+def test_token_page_throttling_backs_off_rate_controller():
+    page = SimpleNamespace(
+        url="http://t/vuln/",
+        status_code=429,
+        content=b"",
+        headers={"Retry-After": "1"},
+    )
+    context = ScanContext(session=SimpleNamespace(get=lambda url, timeout: page))
+    pool = TokenPool("http://t/vuln/", ["user_token"])
+    controller = context.rate_controller(pool.page_url)
+    rate = controller.rate
+
+    assert fetch_token(context, pool) is None
+    assert controller.rate < rate
+    assert controller.events[-1]["retry_after"] == 1.0
+
+
+def test_each_request_gets_its_own_token(monkeypatch):
+    server = TokenServer()
+    findings, context = run_sync_scan(monkeypatch, server, make_payloads(10))
+
+    assert [f.payload.payload_id for f in findings] == [f"p{i}" for i in range(10)]
+    csrf = context.report()["csrf"][0]
+    assert csrf["rejected"] == 0 and not csrf["serial"]
+    assert csrf["used"] > 0
+
+
+def test_single_token_server_falls_back_to_serial_fetching(monkeypatch):
+    server = TokenServer(single=True)
+    findings, context = run_sync_scan(monkeypatch, server, make_payloads(10))
+
+    assert [f.payload.payload_id for f in findings] == [f"p{i}" for i in range(10)]
+    assert context.report()["csrf"][0]["serial"]
+
+
+def test_async_scan_uses_fresh_tokens():
+    server = TokenServer()
+
+    async def handler(request):
+        if "q" not in request.query:
+            return web.Response(text=server.page())
+        return web.Response(text=server.submit(dict(request.query)))
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/vuln/", handler)
+        async with TestServer(app) as test_server:
+            url = str(test_server.make_url("/vuln/"))
+            context = ScanContext(
+                adaptive_rate=False, probe_fields=False, xss_canary=False
+            )
+            findings = await scan_forms_async(
+                [make_form(url, url)],
+                make_payloads(6),
+                0,
+                None,
+                max_in_flight=3,
+                context=context,
+            )
+            return findings, context.report()
+
+    findings, report = asyncio.run(run())
+
+    assert [f.payload.payload_id for f in findings] == [f"p{i}" for i in range(6)]
+    assert report["csrf"][0]["rejected"] == 0
@@ -1,22 +1,28 @@
 import pytest
 from src.scanner.detectors import (
+    BaselineProfile,
+    as_profile,
     detect_sql_error,
     detect_patterns,
     detect_time_delay,
+    detect_evidence_patterns,
+    payload_contexts,
+    reflection_contexts,
     run_detectors,
     SQL_ERROR_LIST,
 )
+from src.scanner.matching import SignatureMatcher
 from src.scanner.scanner import ResponseSnapshot
-from src.scanner.types import Payload, MatchType, VulnType, Severity
+from src.scanner.types import Payload, PayloadSet, MatchType, VulnType, Severity
 
 
-def snap(body: str, time_ms=100):
+def snap(body: str, response_time=0.1):
     return ResponseSnapshot(
         url="http://t",
         status_code=200,
         body=body,
         body_len=len(body),
-        response_time=time_ms,
+        response_time=response_time,
     )
 
 
@@ -69,8 +75,8 @@ def test_detect_patterns(base_body, inj_body, expected):
 @pytest.mark.parametrize(
     "base_time,inj_time,expected",
     [
-        (100, 2600, True),
-        (100, 900, False),
+        (0.1, 2.6, True),
+        (0.1, 0.9, False),
     ],
 )
 def test_detect_time_delay(base_time, inj_time, expected):
@@ -81,6 +87,11 @@ def test_detect_time_delay(base_time, inj_time, expected):
     assert res["matched"] == expected
 
 
+def test_detect_time_delay_ignores_other_match_types():
+    res = detect_time_delay(snap("ok", 0.1), snap("ok", 5.0), payload("x"))
+    assert not res["matched"]
+
+
 def test_run_detectors_aggregates(monkeypatch):
     def d1(*a, **k):
         return {"matched": False}
@@ -96,3 +107,150 @@ def test_run_detectors_aggregates(monkeypatch):
     res = run_detectors(snap("b"), snap("i"), payload("x"))
     assert len(res) == 1
     assert res[0]["evidence"] == "hit"
+
+
+@pytest.mark.parametrize(
+    "body,expected",
+    [
+        ("<p>nothing here</p>", set()),
+        ("<p>hello MARK</p>", {"text"}),
+        ('<input value="mark">', {"attribute"}),
+        ('<script>var q = "MARK";</script>', {"script"}),
+        ('<a title="MARK">MARK</a>', {"attribute", "text"}),
+    ],
+)
+def test_reflection_contexts(body, expected):
+    assert reflection_contexts(body, "mark") == expected
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("<img src=x onerror=alert(1)>", {"text"}),
+        ('" onmouseover="alert(1)" x="', {"attribute"}),
+        ("';alert(1);'", {"attribute", "script"}),
+        ("alert(1)", {"text", "attribute", "script"}),
+    ],
+)
+def test_payload_contexts(value, expected):
+    assert payload_contexts(value) == expected
+
+
+def test_sql_matcher_finds_overlapping_and_escaped_signatures():
+    matcher = SignatureMatcher(["mysql", "mysql_fetch", "(x)", "sql syntax.*near"])
+    body = "Warning: MYSQL_FETCH failed; SQL syntax error near '1'"
+
+    hits = matcher.hits(body)
+
+    assert set(hits) == {"mysql", "mysql_fetch", "sql syntax.*near"}
+    assert body[slice(*hits["mysql_fetch"])] == "MYSQL_FETCH"
+    assert matcher.hits("value (x) here") == {"(x)": (6, 9)}
+
+
+def test_sql_matcher_wildcard_stays_within_line():
+    matcher = SignatureMatcher(["sql syntax.*near"])
+    assert matcher.hits("sql syntax\nnear") == {}
+
+
+def test_detect_sql_error_ignores_signatures_present_in_baseline():
+    base = snap("mysql_fetch_array() expects")
+    inj = snap("mysql_fetch_array() expects; ORA-00933")
+
+    res = detect_sql_error(base, inj, payload("'"))
+
+    assert res["matched"] and res["signatures"] == ["ora-", "ora-00933"]
+    assert not detect_sql_error(base, base, payload("'"))["matched"]
+
+
+def test_baseline_profile_is_reused_by_detectors(monkeypatch):
+    base = snap("Welcome <b>User</b>; mysql_fetch_array() expects")
+    profile = BaselineProfile.from_snapshot(base)
+
+    assert "mysql_fetch_array" in profile.sql_hits
+    assert {"welcome", "user"} <= profile.tokens
+    assert as_profile(profile) is profile
+
+    calls = []
+    monkeypatch.setattr(
+        "src.scanner.detectors.SQL_ERROR_MATCHER.hits",
+        lambda body: calls.append(body) or {},
+    )
+    for _ in range(3):
+        detect_sql_error(profile, snap("ok"), payload("'"))
+        detect_patterns(profile, snap("<b>User</b>"), payload("<b>User</b>"))
+    assert calls == ["ok"] * 3
+    assert profile._contains == {"<b>User</b>": True}
+
+
+def test_detect_patterns_reports_every_reflection_offset():
+    body = "<p><b>x</b></p><i>&lt;b&gt;x&lt;/b&gt;</i><b>x</b>"
+    res = detect_patterns(snap("plain"), snap(body), payload("<b>x</b>"))
+
+    assert res["matched"]
+    assert res["offsets"] == [3, 18, 42]
+    assert res["variants"] == ["&lt;b&gt;x&lt;/b&gt;", "<b>x</b>"]
+
+
+def test_detect_patterns_skips_variants_present_in_baseline():
+    base = snap("static bxb text")
+    res = detect_patterns(base, snap("bxb and <b>x</b>"), payload("<b>x</b>"))
+
+    assert res["offsets"] == [8] and res["variants"] == ["<b>x</b>"]
+
+
+def test_detect_evidence_patterns_reports_new_patterns_only():
+    p = Payload(
+        "u1",
+        "' UNION SELECT username, pwd FROM users--",
+        VulnType.SQLI,
+        Severity.HIGH,
+        MatchType.UNION,
+        ["admin", "Users Table", "password", "pwd"],
+    )
+    PayloadSet([p])
+    base = BaselineProfile.from_snapshot(snap("login as admin"))
+
+    res = detect_evidence_patterns(base, snap("admin / password / users table"), p)
+
+    assert res["matched"] and res["patterns"] == ["password", "users table"]
+    assert base.signature_hits(p.evidence_matcher) == {"admin"}
+
+
+def test_detect_evidence_patterns_ignores_generic_words_on_benign_page():
+    p = Payload(
+        "e1",
+        "' AND extractvalue(1, concat(0x7e, version()))--",
+        VulnType.SQLI,
+        Severity.HIGH,
+        MatchType.ERROR_BASED,
+        ["error", "password", "SQL syntax"],
+    )
+    PayloadSet([p])
+    base = BaselineProfile.from_snapshot(snap("<form>login</form>"))
+    benign = snap("Login error: wrong password, try again")
+
+    assert not detect_evidence_patterns(base, benign, p)["matched"]
+
+    res = detect_evidence_patterns(base, snap("error in your SQL syntax"), p)
+    assert res["matched"] and res["patterns"] == ["error", "sql syntax"]
+
+    in_base = BaselineProfile.from_snapshot(snap("docs: SQL syntax"))
+    assert not detect_evidence_patterns(in_base, snap("SQL syntax error"), p)["matched"]
+
+
+def test_evidence_signatures_drop_patterns_from_payload_text():
+    p = Payload(
+        "b1",
+        "' OR 1=1 -- bypass",
+        VulnType.SQLI,
+        Severity.HIGH,
+        MatchType.BOOLEAN,
+        ["Bypass", "1=1", "Welcome Admin"],
+    )
+    xss = Payload(
+        "x1", "<b>", VulnType.XSS, Severity.LOW, MatchType.REFLECTED, ["alert"]
+    )
+
+    assert p.evidence_signatures == ("welcome admin",)
+    assert xss.evidence_signatures == ()
+    assert not detect_evidence_patterns(snap(""), snap("alert"), xss)["matched"]
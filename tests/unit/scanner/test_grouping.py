@@ -0,0 +1,119 @@
+import asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.scanner.grouping import group_units, split_group
+from src.scanner.scanner import scan_forms, scan_forms_async
+from src.scanner.models import ResponseSnapshot
+from src.scanner.context import ScanContext
+from src.scanner.types import Payload, VulnType, Severity, MatchType
+
+FIELDS = [{"name": f"f{i}", "field_type": "text"} for i in range(8)]
+
+
+def make_payload(i, match_type=MatchType.REFLECTED):
+    return Payload(
+        payload_id=f"p{i}",
+        payload=f"<b>x{i}</b>",
+        vuln_type=VulnType.XSS,
+        severity=Severity.MEDIUM,
+        match_type=match_type,
+        evidence_patterns=[],
+    )
+
+
+def make_context():
+    return ScanContext(
+        adaptive_rate=False, probe_fields=False, xss_canary=False, group_testing=True
+    )
+
+
+def test_group_units_chunks_fields_per_payload():
+    fast, timed = make_payload(0), make_payload(1, MatchType.TIME_BASED)
+    selected = [(f, [fast, timed] if f is not FIELDS[2] else [timed]) for f in FIELDS]
+
+    units = group_units(selected, 3, lambda p: p is timed)
+
+    assert [(p.payload_id, [f["name"] for f in fields]) for p, fields in units] == [
+        ("p0", ["f0", "f1", "f3"]),
+        ("p0", ["f4", "f5", "f6"]),
+        ("p0", ["f7"]),
+    ] + [("p1", [f"f{i}"]) for i in range(8)]
+    assert split_group(FIELDS[:3]) == (FIELDS[:2], FIELDS[2:3])
+
+
+def test_scan_forms_bisects_to_the_reflecting_field(monkeypatch):
+    sent = []
+
+    def fake_send(form, data, *a, **k):
+        sent.append(data)
+        body = f"<p>{data['f5']}</p>"
+        return ResponseSnapshot(form["action"], 200, body, len(body), 0.01)
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    form = {"form_id": "f", "action": "http://t/", "inputs": FIELDS}
+    context = make_context()
+
+    findings = scan_forms(
+        [form], [make_payload(i) for i in range(3)], 0, None, 4, context
+    )
+
+    assert sorted((f.field_name, f.payload.payload_id) for f in findings) == [
+        ("f5", "p0"),
+        ("f5", "p1"),
+        ("f5", "p2"),
+    ]
+    # базовый запрос и по 6 запросов на payload вместо 8
+    assert len(sent) == 1 + 6 * 3
+    assert context.report()["counters"]["group_fields_cleared"] == 6 * 3
+
+
+def test_confirmed_group_counts_one_skipped_request_not_one_per_field(monkeypatch):
+    sent = []
+
+    def fake_send(form, data, *a, **k):
+        sent.append(data)
+        body = f"<p>{data['f0']}{data['f1']}</p>"
+        return ResponseSnapshot(form["action"], 200, body, len(body), 0.01)
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    form = {"form_id": "f", "action": "http://t/", "inputs": FIELDS[:2]}
+    payloads = [make_payload(i) for i in range(3)]
+    for payload in payloads:
+        payload.severity = Severity.HIGH
+    context = make_context()
+
+    findings = scan_forms([form], payloads, 0, None, 1, context)
+
+    assert [(f.field_name, f.payload.payload_id) for f in findings] == [
+        ("f0", "p0"),
+        ("f1", "p0"),
+    ]
+    # базовый запрос, групповой запрос p0 и по запросу к f0 и f1 при делении
+    assert len(sent) == 4
+    assert context.stats.get("requests_skipped_confirmed") == 2
+
+
+def test_scan_forms_async_reports_every_vulnerable_field():
+    async def handler(request):
+        reflected = request.query.get("f1", "") + request.query.get("f6", "")
+        return web.Response(text=f"<p>{reflected}</p>")
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/", handler)
+        async with TestServer(app) as server:
+            form = {
+                "form_id": "f",
+                "action": str(server.make_url("/")),
+                "inputs": FIELDS,
+            }
+            context = make_context()
+            findings = await scan_forms_async(
+                [form], [make_payload(0)], 0, None, context=context
+            )
+            return findings, context.report()
+
+    findings, report = asyncio.run(run())
+
+    assert sorted(f.field_name for f in findings) == ["f1", "f6"]
+    assert report["counters"]["group_bisections"] >= 1
@@ -0,0 +1,66 @@
+from src.scanner.incremental import (
+    fingerprint_forms,
+    fingerprint_of,
+    form_fingerprint,
+    form_results,
+    payloads_digest,
+    split_forms,
+)
+from src.scanner.types import MatchType, Payload, Severity, VulnType
+
+
+def make_form(form_id, action="http://t/search", token="a"):
+    return {
+        "form_id": form_id,
+        "action": action,
+        "method": "get",
+        "inputs": [
+            {"name": "q", "type": "text"},
+            {"name": "csrf", "type": "hidden", "value": token},
+        ],
+    }
+
+
+def test_fingerprint_ignores_values_and_url_noise():
+    base = make_form("a", "http://t/search?b=2&a=1")
+    same = make_form("b", "HTTP://T:80/search?a=1&b=2#top", token="b")
+    other = make_form("c", "http://t/search?a=1&b=2")
+    other["inputs"].append({"name": "page", "type": "number"})
+
+    assert form_fingerprint(base) == form_fingerprint(same)
+    assert form_fingerprint(base) != form_fingerprint(other)
+
+
+def test_split_forms_reuses_unchanged_findings_once():
+    forms = [make_form("a"), make_form("b"), make_form("c", "http://t/new")]
+    fingerprint_forms(forms)
+    fp = fingerprint_of(forms[0])
+    finding = {"form_index": "a", "form_fingerprint": fp, "details": {}}
+    chained = {**finding, "details": {"reused_from_scan": 1}}
+
+    changed, reused = split_forms(forms, {fp: [finding, chained]}, 7)
+
+    assert changed == [forms[2]]
+    assert [f["details"]["reused_from_scan"] for f in reused] == [7, 1]
+    results = form_results(forms, reused)
+    assert [(r["form_id"], len(r["findings"])) for r in results] == [("a", 2), ("c", 0)]
+
+
+def test_payloads_digest_tracks_payload_content():
+    p = Payload("s1", "' OR 1=1--", VulnType.SQLI, Severity.HIGH, MatchType.BOOLEAN, [])
+    edited = Payload(
+        "s1", "' OR 2=2--", VulnType.SQLI, Severity.HIGH, MatchType.BOOLEAN, []
+    )
+    other = Payload("s2", "<b>", VulnType.XSS, Severity.LOW, MatchType.REFLECTED, [])
+
+    assert payloads_digest([p, other]) == payloads_digest([other, p])
+    assert payloads_digest([p, other]) != payloads_digest([edited, other])
+
+
+def test_form_results_record_failed_forms():
+    forms = [make_form("a"), make_form("c", "http://t/new")]
+    fingerprint_forms(forms)
+
+    results = form_results(forms, [], failed=[fingerprint_of(forms[1])])
+
+    assert [r["status"] for r in results] == ["scanned", "failed"]
@@ -0,0 +1,73 @@
+from src.scanner.memo import RequestMemo, collapse_forms, request_key
+from src.scanner.scanner import scan_forms
+from src.scanner.models import ResponseSnapshot
+from src.scanner.context import ScanContext
+from src.scanner.types import Payload, VulnType, Severity, MatchType
+
+
+def make_form(form_id, action="http://t/search"):
+    return {"form_id": form_id, "action": action, "inputs": [{"name": "q"}]}
+
+
+def make_payload(payload_id, text):
+    return Payload(
+        payload_id=payload_id,
+        payload=text,
+        vuln_type=VulnType.XSS,
+        severity=Severity.MEDIUM,
+        match_type=MatchType.REFLECTED,
+        evidence_patterns=[],
+    )
+
+
+def snap(body):
+    return ResponseSnapshot("http://t/search", 200, body, len(body), 0.01)
+
+
+def test_request_key_ignores_data_order_and_memo_evicts_oldest():
+    form = make_form("a")
+    assert request_key(form, {"a": 1, "b": "2"}) == request_key(form, {"b": 2, "a": 1})
+
+    memo = RequestMemo(max_entries=1)
+    memo.put(("GET", "u", ()), snap("one"))
+    memo.put(("GET", "v", ()), snap("two"))
+
+    assert memo.get(("GET", "u", ())) is None
+    assert memo.get(("GET", "v", ())).body == "two"
+    assert memo.to_dict() == {"hits": 1, "misses": 1, "stored": 2, "entries": 1}
+
+
+def test_collapse_forms_keeps_first_copy_in_order():
+    forms = [make_form("a"), make_form("b", "http://t/other"), make_form("c")]
+
+    unique, copies = collapse_forms(forms)
+
+    assert unique == forms[:2]
+    assert copies == {id(forms[0]): [forms[2]]}
+
+
+def test_scan_forms_sends_duplicates_once_and_attributes_findings(monkeypatch):
+    sent = []
+
+    def fake_send(form, data, *a, **k):
+        sent.append(data["q"])
+        return snap(f"<p>{data['q']}</p>")
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    forms = [make_form("header"), make_form("footer")]
+    payloads = [make_payload("p1", "<b>x</b>"), make_payload("p2", "<b>x</b>")]
+    context = ScanContext(adaptive_rate=False, probe_fields=False, xss_canary=False)
+
+    findings = scan_forms(forms, payloads, 0, None, 1, context=context)
+
+    assert sorted(sent) == ["<b>x</b>", "q"]
+    assert [(f.form_index, f.payload.payload_id) for f in findings] == [
+        ("header", "p1"),
+        ("header", "p2"),
+        ("footer", "p1"),
+        ("footer", "p2"),
+    ]
+    assert findings[2].details["reused_from_form"] == "header"
+    report = context.report()
+    assert report["counters"]["forms_collapsed"] == 1
+    assert report["memo"]["hits"] == 1
@@ -1,8 +1,13 @@
+import asyncio
 import requests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from src.scanner.models import (
     build_base_line,
     build_test_data,
+    create_async_session,
     send_form_request,
+    send_form_request_async,
 )
 from src.scanner.types import Payload, VulnType, Severity, MatchType
 
@@ -29,6 +34,8 @@ class MockResp:
         self.url = "http://example/"
         self.status_code = 200
         self.text = "OK" * 100
+        self.content = self.text.encode()
+        self.headers = {"Content-Type": "text/html"}
 
 
 def test_send_form_request_success(monkeypatch):
@@ -46,3 +53,41 @@ def test_send_form_request_handles_exception(monkeypatch):
     assert not send_form_request(
         {"action": "http://bad"}, {}, session=requests.Session()
     )
+
+
+def test_send_form_request_async_returns_snapshot():
+    async def handler(request):
+        data = await request.post()
+        return web.Response(text=f"got {data['q']}", status=201)
+
+    async def run():
+        app = web.Application()
+        app.router.add_post("/form", handler)
+        async with TestServer(app) as server:
+            form = {"action": str(server.make_url("/form")), "method": "POST"}
+            async with create_async_session() as session:
+                return await send_form_request_async(form, {"q": "v"}, session)
+
+    snap = asyncio.run(run())
+    assert snap.status_code == 201 and snap.body == "got v"
+    assert snap.body_len == 5 and snap.response_time >= 0
+
+
+def test_async_response_time_excludes_connection_queueing():
+    async def handler(request):
+        await asyncio.sleep(0.2)
+        return web.Response(text="ok")
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/slow", handler)
+        async with TestServer(app) as server:
+            form = {"action": str(server.make_url("/slow")), "method": "GET"}
+            async with create_async_session(limit=1) as session:
+                return await asyncio.gather(
+                    send_form_request_async(form, {}, session),
+                    send_form_request_async(form, {}, session),
+                )
+
+    first, second = asyncio.run(run())
+    assert first.response_time < 0.35 and second.response_time < 0.35
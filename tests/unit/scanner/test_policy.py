@@ -0,0 +1,49 @@
+import pytest
+from src.scanner.policy import ConfirmationPolicy, FieldState
+from src.scanner.types import Payload, VulnType, Severity, MatchType
+
+
+def make_payload(vuln=VulnType.SQLI, severity=Severity.HIGH):
+    return Payload(
+        payload_id="p",
+        payload="x",
+        vuln_type=vuln,
+        severity=severity,
+        match_type=MatchType.BOOLEAN,
+        evidence_patterns=[],
+    )
+
+
+@pytest.mark.parametrize(
+    "policy,severity,hits_before_stop",
+    [
+        (ConfirmationPolicy(max_confirmed=1), Severity.HIGH, 1),
+        (ConfirmationPolicy(max_confirmed=3, stop_on_critical=False), Severity.HIGH, 3),
+        (ConfirmationPolicy(max_confirmed=3), Severity.CRITICAL, 1),
+    ],
+)
+def test_field_stops_after_confirmations(policy, severity, hits_before_stop):
+    state = FieldState("f", "q")
+    p = make_payload(severity=severity)
+    for _ in range(hits_before_stop):
+        assert not state.should_skip(p)
+        state.record(p, ["finding"], policy)
+    assert state.should_skip(p)
+    assert not state.should_skip(make_payload(vuln=VulnType.XSS))
+    assert state.to_dict()["skipped_requests"] == 1
+
+
+def test_low_severity_and_empty_findings_do_not_confirm():
+    policy = ConfirmationPolicy(max_confirmed=1)
+    state = FieldState("f", "q")
+    state.record(make_payload(severity=Severity.MEDIUM), ["finding"], policy)
+    state.record(make_payload(), [], policy)
+    assert not state.should_skip(make_payload())
+
+
+def test_disabled_policy_never_stops():
+    policy = ConfirmationPolicy(max_confirmed=0, stop_on_critical=False)
+    state = FieldState("f", "q")
+    for _ in range(5):
+        state.record(make_payload(severity=Severity.CRITICAL), ["finding"], policy)
+    assert not state.should_skip(make_payload())
@@ -0,0 +1,62 @@
+import pytest
+from src.scanner.models import ResponseSnapshot, normalized_body_hash
+from src.scanner.probe import classify_probe, select_payloads, make_probe_values
+from src.scanner.types import Payload, VulnType, Severity, MatchType
+
+
+def snap(body, status=200):
+    return ResponseSnapshot("u", status, body, len(body), 0.01)
+
+
+BASE = snap("<p>Hello</p> token=0123456789abcdef0123")
+BASE_HASH = normalized_body_hash(BASE.body)
+
+
+@pytest.mark.parametrize(
+    "responses,decision,reason",
+    [
+        (["<p>Hello</p> token=ffffffffffffffffffff"], "reduced", "insensitive"),
+        (["<p>Hello zqMARKx</p>"], "full", "reflected"),
+        (["<p>No results</p>"], "full", "changed"),
+        ([None], "full", "probe_failed"),
+    ],
+)
+def test_classify_probe(responses, decision, reason):
+    probes = [("zqMARKx", snap(r) if r is not None else None) for r in responses]
+    result = classify_probe(BASE, BASE_HASH, probes)
+    assert (result.decision, result.reason) == (decision, reason)
+
+
+def test_classify_probe_status_change_is_sensitive():
+    result = classify_probe(BASE, BASE_HASH, [("v", snap(BASE.body, status=500))])
+    assert result.decision == "full"
+
+
+def test_classify_probe_skip_action():
+    result = classify_probe(BASE, BASE_HASH, [("v", BASE)], insensitive_action="skip")
+    assert result.decision == "skip"
+    assert select_payloads([object()], result) == []
+
+
+def test_select_payloads_reduced_keeps_every_sqli_match_type():
+    def p(match, vuln=VulnType.SQLI):
+        return Payload("p", "x", vuln, Severity.HIGH, match, [])
+
+    payloads = [
+        p(MatchType.BOOLEAN),
+        p(MatchType.UNION),
+        p(MatchType.TIME_BASED),
+        p(MatchType.ERROR_BASED),
+        p(MatchType.POLYGLOT, VulnType.XSS),
+    ]
+    result = classify_probe(BASE, BASE_HASH, [("v", BASE)])
+    assert [x.match_type for x in select_payloads(payloads, result)] == [
+        MatchType.BOOLEAN,
+        MatchType.UNION,
+        MatchType.TIME_BASED,
+        MatchType.ERROR_BASED,
+    ]
+
+
+def test_probe_values_are_unique():
+    assert make_probe_values()[0] != make_probe_values()[0]
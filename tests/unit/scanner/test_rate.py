@@ -0,0 +1,72 @@
+import pytest
+from src.scanner.rate import RateController, parse_retry_after
+
+
+def test_rate_increases_while_healthy():
+    rc = RateController("http://t", initial_rps=5, min_rps=1, max_rps=6)
+    for _ in range(5):
+        rc.record(200, 0.05)
+    assert rc.rate == 6 and rc.backoffs == 0
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_backoff_on_overload_status_honors_retry_after(status):
+    rc = RateController("http://t", initial_rps=10, min_rps=1, max_rps=100)
+    rc.record(status, 0.05, retry_after=2.0)
+
+    assert rc.rate == 5
+    assert rc.events[-1]["reason"] == "status"
+    assert rc.events[-1]["retry_after"] == 2.0
+    assert rc.reserve() > 1.5
+
+
+def test_latency_spike_backs_off_unless_delay_expected():
+    rc = RateController("http://t", initial_rps=10, min_rps=1, max_rps=100)
+    rc.record(200, 0.1)
+    rate = rc.rate
+
+    rc.record(200, 3.0, expect_delay=True)
+    assert rc.rate == rate
+
+    rc.record(200, 3.0)
+    assert rc.rate == rate / 2 and rc.events[-1]["reason"] == "latency"
+
+
+def test_in_flight_overload_responses_back_off_once():
+    rc = RateController("http://t", initial_rps=1000, min_rps=1, max_rps=1000)
+    in_flight = [rc.acquire() for _ in range(8)]
+
+    for slot in in_flight:
+        rc.record(429, 0.05, slot=slot)
+    assert rc.rate == 500 and rc.backoffs == 1
+
+    rc.record(429, 0.05, slot=rc.acquire())
+    assert rc.rate == 250 and rc.backoffs == 2
+
+
+def test_permanent_latency_shift_becomes_new_baseline():
+    rc = RateController("http://t", initial_rps=10, min_rps=1, max_rps=100)
+    rc.record(200, 0.1)
+
+    for _ in range(20):
+        rc.record(200, 2.0)
+
+    assert rc.backoffs < 5
+    rate = rc.rate
+    rc.record(200, 2.0)
+    assert rc.rate > rate > rc.min_rps
+
+
+def test_reserve_spaces_requests_by_rate():
+    rc = RateController("http://t", initial_rps=10, min_rps=1, max_rps=10)
+    delays = [rc.reserve() for _ in range(3)]
+    assert delays[0] == 0
+    assert delays[2] == pytest.approx(0.2, abs=0.02)
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [("3", 3.0), ("1000", 60.0), ("garbage", None), (None, None)],
+)
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
@@ -1,5 +1,10 @@
-from src.scanner.scanner import scan_form, scan_field
+import asyncio
+import threading
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.scanner.scanner import scan_form, scan_field, scan_forms, scan_forms_async
 from src.scanner.models import ResponseSnapshot
+from src.scanner.context import ScanContext
 from src.scanner.types import Payload, VulnType, Severity, MatchType
 
 
@@ -16,12 +21,15 @@ def make_payload(payload="X", match=MatchType.REFLECTED):
 
 def test_scan_field_happy_path(monkeypatch):
     base = ResponseSnapshot("u", 200, "base", 4, 100)
-    inj = ResponseSnapshot("u", 200, "alert(1)", 8, 120)
 
-    monkeypatch.setattr("src.scanner.scanner.send_form_request", lambda *a, **k: inj)
+    def fake_send(form, data, *a, **k):
+        body = f"<p>{data['q']}</p>"
+        return ResponseSnapshot("u", 200, body, len(body), 120)
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
     monkeypatch.setattr(
         "src.scanner.detectors.run_detectors",
-        lambda *a, **k: [{"matched": True, "evidence": "alert"}],
+        lambda *a, **k: [{"matched": True, "evidence": "alert", "offsets": [3]}],
     )
 
     findings = scan_field(
@@ -33,9 +41,353 @@ def test_scan_field_happy_path(monkeypatch):
         rate_limit=0,
     )
     assert len(findings) == 1 and findings[0].field_name == "q"
+    assert findings[0].details == {"offsets": [3]}
 
 
 def test_scan_form_baseline_missing(monkeypatch):
     monkeypatch.setattr("src.scanner.scanner.send_form_request", lambda *a, **k: None)
     form = {"form_id": "f", "action": "http://ex", "inputs": [{"name": "q"}]}
     assert scan_form(form, [make_payload("x")], rate_limit=0) == []
+
+
+def test_scan_reports_forms_without_responses_as_failed(monkeypatch):
+    def fake_send(form, data, *a, **k):
+        if form["action"] == "http://ex/down" or data["q"] == "x":
+            return None
+        return ResponseSnapshot(form["action"], 200, "ok", 2, 0.01)
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    forms = [
+        {
+            "form_id": name,
+            "action": f"http://ex/{name}",
+            "inputs": [{"name": "q", "type": "text"}],
+            "meta": {"fingerprint": name},
+        }
+        for name in ("down", "flaky")
+    ]
+    context = ScanContext(probe_fields=False, xss_canary=False)
+
+    assert scan_forms(forms, [make_payload("x")], 0, None, context=context) == []
+    assert context.report()["failed_forms"] == ["down", "flaky"]
+    assert context.stats.get("units_failed") == 1
+
+
+def test_scan_forms_concurrent_keeps_order(monkeypatch):
+    def fake_send(form, data, *a, **k):
+        body = " ".join(f"{k}={v}" for k, v in data.items())
+        return ResponseSnapshot(form["action"], 200, body, len(body), 0.01)
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    monkeypatch.setattr(
+        "src.scanner.detectors.run_detectors",
+        lambda base, inj, p, **k: [{"matched": True, "evidence": inj.body}],
+    )
+
+    forms = [
+        {
+            "form_id": f"f{i}",
+            "action": f"http://ex/{i}",
+            "inputs": [{"name": "a", "type": "text"}, {"name": "b", "type": "text"}],
+        }
+        for i in range(3)
+    ]
+    payloads = [make_payload(f"x{i}") for i in range(5)]
+
+    serial = scan_forms(
+        forms,
+        payloads,
+        0,
+        None,
+        max_workers=1,
+        context=ScanContext(adaptive_rate=False),
+    )
+    concurrent = scan_forms(
+        forms,
+        payloads,
+        0,
+        None,
+        max_workers=4,
+        context=ScanContext(adaptive_rate=False),
+    )
+
+    assert len(serial) == 3 * 2 * 5
+    assert [(f.form_index, f.field_name, f.evidence) for f in concurrent] == [
+        (f.form_index, f.field_name, f.evidence) for f in serial
+    ]
+
+
+def test_scan_forms_async_against_local_server():
+    state = {"in_flight": 0, "peak": 0}
+
+    async def handler(request):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        return web.Response(text=f"<p>{request.query.get('q', '')}</p>")
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/search", handler)
+        async with TestServer(app) as server:
+            form = {
+                "form_id": "f",
+                "action": str(server.make_url("/search")),
+                "method": "get",
+                "inputs": [{"name": "q", "type": "text"}],
+            }
+            payloads = [make_payload(f"<b>x{i}</b>") for i in range(6)]
+            context = ScanContext(adaptive_rate=False)
+            return await scan_forms_async(
+                [form], payloads, 0, None, max_in_flight=2, context=context
+            )
+
+    findings = asyncio.run(run())
+
+    assert [f.payload.payload for f in findings] == [f"<b>x{i}</b>" for i in range(6)]
+    assert 1 < state["peak"] <= 2
+
+
+def test_scan_report_exposes_rate_backoffs(monkeypatch):
+    throttled = ResponseSnapshot("u", 429, "slow down", 9, 0.01, {"retry-after": "0"})
+    monkeypatch.setattr(
+        "src.scanner.scanner.send_form_request", lambda *a, **k: throttled
+    )
+    monkeypatch.setattr("src.scanner.detectors.run_detectors", lambda *a, **k: [])
+
+    context = ScanContext(probe_fields=False)
+    form = {"form_id": "f", "action": "http://ex/a", "inputs": [{"name": "q"}]}
+    scan_form(form, [make_payload("x")], context=context)
+
+    report = context.report()
+    assert report["counters"]["requests_sent"] == 2
+    assert report["rate_control"][0]["origin"] == "http://ex"
+    assert report["rate_control"][0]["backoffs"] == 2
+
+
+def test_scan_field_stops_after_confirmed_finding(monkeypatch):
+    sent = []
+
+    def fake_send(form, data, *a, **k):
+        sent.append(data["q"])
+        return ResponseSnapshot("u", 200, "error", 5, 0.01)
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    monkeypatch.setattr(
+        "src.scanner.detectors.run_detectors",
+        lambda *a, **k: [{"matched": True, "evidence": "sql"}],
+    )
+    payloads = [
+        Payload(f"s{i}", f"'{i}", VulnType.SQLI, Severity.HIGH, MatchType.BOOLEAN, [])
+        for i in range(5)
+    ]
+    context = ScanContext(adaptive_rate=False, probe_fields=False, xss_canary=False)
+
+    findings = scan_field(
+        form={"form_id": "f", "action": "http://ex"},
+        field={"name": "q", "type": "text"},
+        base_line_snapshot=ResponseSnapshot("u", 200, "base", 4, 0.01),
+        payloads=payloads,
+        base_data={"q": ""},
+        context=context,
+    )
+
+    assert sent == ["'0"] and len(findings) == 1
+    assert context.stats.get("requests_skipped_confirmed") == 4
+    assert context.report()["fields"][0]["skipped_requests"] == 4
+
+
+def test_insensitive_field_gets_reduced_payload_set(monkeypatch):
+    sent = []
+
+    def fake_send(form, data, *a, **k):
+        sent.append(data["q"])
+        return ResponseSnapshot("u", 200, "same page", 9, 0.01)
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    monkeypatch.setattr("src.scanner.detectors.run_detectors", lambda *a, **k: [])
+    payloads = [
+        make_payload("<b>x</b>"),
+        make_payload("' OR '1'='1", MatchType.BOOLEAN),
+        make_payload("' AND SLEEP(2)--", MatchType.TIME_BASED),
+    ]
+    payloads[0].payload_id = "xss"
+    context = ScanContext(adaptive_rate=False, xss_canary=False)
+
+    scan_field(
+        form={"form_id": "f", "action": "http://ex"},
+        field={"name": "q", "type": "text"},
+        base_line_snapshot=ResponseSnapshot("u", 200, "same  PAGE", 10, 0.01),
+        payloads=payloads,
+        base_data={"q": "q"},
+        context=context,
+    )
+
+    assert sent[2:] == ["' OR '1'='1", "' AND SLEEP(2)--"]
+    assert context.stats.get("requests_skipped_probe") == 1
+    probe = context.report()["fields"][0]["probe"]
+    assert probe == {
+        "decision": "reduced",
+        "reason": "insensitive",
+        "probes": 2,
+        "reflection": None,
+        "skipped_payloads": ["xss"],
+    }
+
+
+def test_xss_canary_gates_payloads_by_reflection_context(monkeypatch):
+    sent = []
+
+    def fake_send(form, data, *a, **k):
+        sent.append(data["q"])
+        body = f'<input value="{data["q"]}">'
+        return ResponseSnapshot("u", 200, body, len(body), 0.01)
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    monkeypatch.setattr("src.scanner.detectors.run_detectors", lambda *a, **k: [])
+    payloads = [
+        make_payload("<img src=x onerror=alert(1)>"),
+        make_payload('" onmouseover="alert(1)" x="'),
+    ]
+    context = ScanContext(adaptive_rate=False)
+
+    scan_field(
+        form={"form_id": "f", "action": "http://ex"},
+        field={"name": "q", "type": "text"},
+        base_line_snapshot=ResponseSnapshot("u", 200, "<input>", 7, 0.01),
+        payloads=payloads,
+        base_data={"q": ""},
+        context=context,
+    )
+
+    assert len(sent) == 2 and sent[-1] == payloads[1].payload
+    assert context.stats.get("requests_skipped_canary") == 1
+    assert context.report()["fields"][0]["probe"]["reflection"] == ["attribute"]
+
+
+def test_xss_canary_skips_xss_for_unreflected_field(monkeypatch):
+    sent = []
+
+    def fake_send(form, data, *a, **k):
+        sent.append(data["q"])
+        return ResponseSnapshot("u", 200, f"len={len(data['q'])}", 6, 0.01)
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    monkeypatch.setattr("src.scanner.detectors.run_detectors", lambda *a, **k: [])
+    payloads = [make_payload("<script>alert(1)</script>") for _ in range(3)]
+    context = ScanContext(adaptive_rate=False, probe_fields=False)
+
+    scan_field(
+        form={"form_id": "f", "action": "http://ex"},
+        field={"name": "q", "type": "text"},
+        base_line_snapshot=ResponseSnapshot("u", 200, "len=0", 5, 0.01),
+        payloads=payloads,
+        base_data={"q": ""},
+        context=context,
+    )
+
+    assert len(sent) == 1
+    assert context.stats.get("requests_skipped_canary") == 3
+
+
+def test_time_based_payload_confirmed_with_one_extra_request(monkeypatch):
+    sent = []
+
+    def fake_send(form, data, *a, **k):
+        sent.append(data["q"])
+        delay = 2.6 if "SLEEP" in data["q"] else 0.05
+        return ResponseSnapshot("u", 200, "page", 4, delay)
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    sleepy = Payload(
+        "t1",
+        "' AND SLEEP(2.5)--",
+        VulnType.SQLI,
+        Severity.HIGH,
+        MatchType.TIME_BASED,
+        [],
+    )
+    form = {
+        "form_id": "f",
+        "action": "http://ex",
+        "inputs": [{"name": "q", "type": "text"}],
+    }
+    context = ScanContext(adaptive_rate=False, probe_fields=False, xss_canary=False)
+
+    findings = scan_form(form, [sleepy], context=context)
+
+    assert sent.count(sleepy.payload) == 2
+    assert len(findings) == 1 and findings[0].details["slow"] == 2
+    assert context.stats.get("timing_confirmed") == 1
+    assert context.report()["latency"][0]["samples"] == 1
+
+
+def test_time_based_payload_rejected_when_delay_does_not_repeat(monkeypatch):
+    delays = iter([0.05, 2.6, 0.05, 0.05, 0.05])
+
+    def fake_send(form, data, *a, **k):
+        return ResponseSnapshot("u", 200, "page", 4, next(delays))
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    sleepy = Payload(
+        "t1",
+        "' AND SLEEP(2.5)--",
+        VulnType.SQLI,
+        Severity.HIGH,
+        MatchType.TIME_BASED,
+        [],
+    )
+    form = {
+        "form_id": "f",
+        "action": "http://ex",
+        "inputs": [{"name": "q", "type": "text"}],
+    }
+    context = ScanContext(adaptive_rate=False, probe_fields=False, xss_canary=False)
+
+    assert scan_form(form, [sleepy], context=context) == []
+    assert context.stats.get("timing_rejected") == 1
+    assert context.stats.get("timing_extra_requests") == 3
+
+
+def test_time_based_payloads_overlap_in_their_lane(monkeypatch):
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0}
+    overlapped = threading.Event()
+
+    def fake_send(form, data, *a, **k):
+        if "SLEEP" in data["q"]:
+            with lock:
+                running["now"] += 1
+                running["max"] = max(running["max"], running["now"])
+                if running["now"] > 1:
+                    overlapped.set()
+            # ждём второй TIME_BASED запрос; в последовательной полосе его не будет
+            overlapped.wait(timeout=5)
+            with lock:
+                running["now"] -= 1
+        return ResponseSnapshot("u", 200, "page", 4, 0.01)
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    sleepy = [
+        Payload(
+            f"t{i}",
+            f"' AND SLEEP({i})--",
+            VulnType.SQLI,
+            Severity.HIGH,
+            MatchType.TIME_BASED,
+            [],
+        )
+        for i in range(4)
+    ]
+    form = {
+        "form_id": "f",
+        "action": "http://ex",
+        "inputs": [{"name": "q", "type": "text"}],
+    }
+    context = ScanContext(adaptive_rate=False, probe_fields=False, xss_canary=False)
+
+    scan_forms([form], sleepy + [make_payload("x")], 0, None, 1, context=context)
+
+    assert running["max"] > 1
+    assert context.stats.get("requests_sent") == 6
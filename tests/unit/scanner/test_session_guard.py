@@ -0,0 +1,131 @@
+import asyncio
+import requests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.scanner.session_guard import AuthGuard, session_lost
+from src.scanner.detectors import as_profile
+from src.scanner.scanner import scan_forms, scan_forms_async
+from src.scanner.models import ResponseSnapshot
+from src.scanner.context import ScanContext
+from src.scanner.types import Payload, VulnType, Severity, MatchType
+
+FORM = {"form_id": "f", "action": "http://t/vuln/", "inputs": [{"name": "q"}]}
+LOGIN_PAGE = '<form action="login.php"><input name="username"></form>'
+
+
+def snap(body, url="http://t/vuln/"):
+    return ResponseSnapshot(url, 200, body, len(body), 0.01)
+
+
+def make_payload(i):
+    return Payload(
+        payload_id=f"p{i}",
+        payload=f"<b>x{i}</b>",
+        vuln_type=VulnType.XSS,
+        severity=Severity.MEDIUM,
+        match_type=MatchType.REFLECTED,
+        evidence_patterns=[],
+    )
+
+
+def test_session_lost_by_redirect_or_new_indicator():
+    base = as_profile(snap("<p>welcome</p>"))
+
+    assert session_lost(snap("", url="http://t/login.php"), FORM)
+    assert session_lost(snap(LOGIN_PAGE), FORM, base)
+    assert not session_lost(snap("<p>welcome x</p>"), FORM, base)
+    # отказ по CSRF-токену — не потеря сессии
+    assert not session_lost(snap("<p>CSRF token is incorrect</p>"), FORM, base)
+    # индикатор, присутствующий в базовом ответе, не считается потерей сессии
+    assert not session_lost(snap(LOGIN_PAGE), FORM, as_profile(snap(LOGIN_PAGE)))
+    login_form = {**FORM, "action": "http://t/login.php"}
+    assert not session_lost(snap("", url="http://t/login.php"), login_form)
+
+
+def test_guard_reauths_once_per_generation_and_respects_budget():
+    calls = []
+    guard = AuthGuard(lambda: calls.append(1) or True, max_reauth=2)
+
+    assert guard.recover(0) and guard.recover(0)
+    assert len(calls) == 1 and guard.generation == 1
+
+    assert guard.recover(1)
+    assert not guard.recover(2)
+    assert guard.to_dict() == {"generation": 2, "reauths": 2, "failures": 0}
+
+
+def test_scan_forms_relogs_and_retries_lost_units(monkeypatch):
+    state = {"sent": 0, "valid": True}
+
+    def fake_send(form, data, *a, **k):
+        state["sent"] += 1
+        if state["sent"] == 5:
+            state["valid"] = False
+        if not state["valid"]:
+            return snap("<title>Login</title>", url="http://t/login.php")
+        return snap(f"<p>{data['q']}</p>")
+
+    def reauth():
+        state["valid"] = True
+        return True
+
+    monkeypatch.setattr("src.scanner.scanner.send_form_request", fake_send)
+    payloads = [make_payload(i) for i in range(8)]
+    context = ScanContext(
+        adaptive_rate=False,
+        probe_fields=False,
+        xss_canary=False,
+        auth_guard=AuthGuard(reauth),
+    )
+
+    findings = scan_forms([FORM], payloads, 0, None, 4, context=context)
+
+    assert sorted(f.payload.payload_id for f in findings) == [f"p{i}" for i in range(8)]
+    report = context.report()
+    assert report["auth"]["reauths"] == 1
+    assert report["counters"]["baselines_rebuilt"] == 1
+
+
+def test_scan_forms_async_refreshes_cookies_after_relogin():
+    state = {"token": "old", "sent": 0}
+
+    async def handler(request):
+        state["sent"] += 1
+        if state["sent"] == 4:
+            state["token"] = "new"
+        if request.cookies.get("sid") != state["token"]:
+            raise web.HTTPFound("/login.php")
+        return web.Response(text=f"<p>{request.query.get('q', '')}</p>")
+
+    async def login_page(request):
+        return web.Response(text=LOGIN_PAGE)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/vuln/", handler)
+        app.router.add_get("/login.php", login_page)
+        async with TestServer(app) as server:
+            session = requests.Session()
+            session.cookies.set("sid", "old")
+
+            def reauth():
+                session.cookies.set("sid", state["token"])
+                return True
+
+            form = {**FORM, "action": str(server.make_url("/vuln/"))}
+            context = ScanContext(
+                adaptive_rate=False,
+                probe_fields=False,
+                xss_canary=False,
+                auth_guard=AuthGuard(reauth),
+            )
+            payloads = [make_payload(i) for i in range(6)]
+            findings = await scan_forms_async(
+                [form], payloads, 0, session, max_in_flight=2, context=context
+            )
+            return findings, context.report()
+
+    findings, report = asyncio.run(run())
+
+    assert [f.payload.payload_id for f in findings] == [f"p{i}" for i in range(6)]
+    assert report["auth"]["reauths"] == 1
@@ -0,0 +1,96 @@
+import asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.net.decoding import BodyDecoder
+from src.scanner.detectors import as_profile, detect_patterns, detect_sql_error
+from src.scanner.models import BodyReader, ResponseSnapshot
+from src.scanner.scanner import scan_forms_async
+from src.scanner.streaming import StreamDetection
+from src.scanner.context import ScanContext
+from src.scanner.types import Payload, VulnType, Severity, MatchType
+from src.config import RESPONSE_MAX_BYTES
+
+SQL_ERROR = "You have an error in your SQL syntax"
+
+
+def make_payload(text="<b>xyz</b>"):
+    return Payload(
+        payload_id="p",
+        payload=text,
+        vuln_type=VulnType.XSS,
+        severity=Severity.MEDIUM,
+        match_type=MatchType.REFLECTED,
+        evidence_patterns=[],
+    )
+
+
+def make_base(body="<p>hello</p>"):
+    return as_profile(ResponseSnapshot("http://t/", 200, body, len(body), 0.01))
+
+
+def test_reflection_split_across_chunks_is_found_with_body_offset():
+    sink = StreamDetection(make_base(), make_payload(), overlap=0)
+    sink.start()
+
+    sink.feed("a" * 100 + "<b>x")
+    sink.feed("yz</b>" + "b" * 100)
+    result = sink.detections(sink.base)[detect_patterns]
+
+    assert result["matched"] and result["offsets"] == [100]
+    # базовый ответ сменился (повторный вход) — детекторы запускаются заново
+    assert sink.detections(make_base()) is None
+
+
+def test_reflection_offsets_cover_every_chunk():
+    sink = StreamDetection(make_base(), make_payload(), overlap=20)
+    reader = BodyReader("http://t/", "text/html", BodyDecoder(), sink, max_bytes=10**6)
+
+    assert not reader.push(b"<b>xyz</b>" + b"a" * 5)
+    assert not reader.push(SQL_ERROR.encode())
+    assert not reader.push(b"<b>xyz</b>")
+    body = reader.finish()
+    detections = sink.detections(sink.base)
+
+    assert detections[detect_patterns]["offsets"] == [0, len(body) - 10]
+    assert detections[detect_sql_error]["matched"]
+
+
+def test_body_reader_caps_size_and_decodes_split_characters():
+    reader = BodyReader("http://t/", "text/html; charset=utf-8", BodyDecoder(), None, 7)
+    data = "aéb".encode() + b"0123456789"
+
+    assert not reader.push(data[:2])
+    assert reader.push(data[2:])
+    assert reader.finish() == "aéb012" and reader.truncated
+
+
+def test_async_scan_streams_capped_bodies():
+    async def handler(request):
+        q = request.query.get("q", "")
+        error = SQL_ERROR if "<" in q else ""
+        return web.Response(text=f"<p>{q}</p>{error}" + "x" * RESPONSE_MAX_BYTES)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/vuln/", handler)
+        async with TestServer(app) as server:
+            form = {
+                "form_id": "f",
+                "action": str(server.make_url("/vuln/")),
+                "inputs": [{"name": "q"}],
+            }
+            context = ScanContext(
+                adaptive_rate=False, probe_fields=False, xss_canary=False
+            )
+            findings = await scan_forms_async(
+                [form], [make_payload()], 0, None, context=context
+            )
+            return findings, context.report()
+
+    findings, report = asyncio.run(run())
+
+    assert len(findings) == 2
+    assert all(f.details["body_truncated"] for f in findings)
+    assert all(f.body_len == RESPONSE_MAX_BYTES for f in findings)
+    # базовый ответ и ответ на payload обрезаны по RESPONSE_MAX_BYTES
+    assert report["counters"]["responses_truncated"] == 2
@@ -0,0 +1,38 @@
+import pytest
+
+from src.scanner.timing import LatencyWindow, SequentialTimingTest
+
+
+def test_latency_window_threshold_uses_median_and_mad():
+    window = LatencyWindow()
+    for latency in (0.10, 0.12, 0.11, 0.50, 0.10):
+        window.add(latency)
+
+    center, spread = window.stats()
+    assert center == pytest.approx(0.11)
+    assert window.slow_threshold() == pytest.approx(0.11 + 2.0)
+
+
+def test_latency_window_falls_back_without_samples():
+    assert LatencyWindow().slow_threshold(fallback=0.3) == pytest.approx(2.3)
+
+
+def test_fast_first_response_is_rejected_without_extra_requests():
+    test = SequentialTimingTest()
+    assert test.observe(0.2, threshold=2.0) is False
+    assert test.extra_requests == 0
+
+
+def test_two_slow_responses_confirm():
+    test = SequentialTimingTest()
+    assert test.observe(2.6, threshold=2.0) is None
+    assert test.observe(2.7, threshold=2.0) is True
+    assert test.to_dict()["extra_requests"] == 1
+
+
+def test_slow_then_fast_responses_reject():
+    test = SequentialTimingTest()
+    assert test.observe(2.6, threshold=2.0) is None
+    assert test.observe(0.2, threshold=2.0) is None
+    assert test.observe(0.2, threshold=2.0) is None
+    assert test.observe(0.2, threshold=2.0) is False
@@ -1,4 +1,12 @@
-from src.scanner.types import Payload, VulnType, Severity, MatchType
+import pytest
+from src.scanner.types import (
+    Payload,
+    PayloadSet,
+    VulnType,
+    Severity,
+    MatchType,
+    parse_payload_filter,
+)
 
 
 def test_payload_to_dict():
@@ -19,3 +27,44 @@ def test_payload_to_dict():
     assert d["severity"] == "HIGH"
     assert d["match_type"] == "REFLECTED"
     assert d["evidence_patterns"] == ["x"]
+
+
+def make(pid, vuln, severity, match):
+    return Payload(pid, f"<{pid}> x", vuln, severity, match, [])
+
+
+PAYLOADS = PayloadSet(
+    [
+        make("s1", VulnType.SQLI, Severity.HIGH, MatchType.ERROR_BASED),
+        make("x1", VulnType.XSS, Severity.MEDIUM, MatchType.REFLECTED),
+        make("s2", VulnType.SQLI, Severity.CRITICAL, MatchType.TIME_BASED),
+        make("s3", VulnType.SQLI, Severity.LOW, MatchType.BOOLEAN),
+    ]
+)
+
+
+def test_payload_set_select_keeps_order_and_caches():
+    selected = PAYLOADS.select(vuln_types={VulnType.SQLI}, min_severity=Severity.HIGH)
+
+    assert [p.payload_id for p in selected] == ["s1", "s2"]
+    assert PAYLOADS.select({VulnType.SQLI}, None, Severity.HIGH) is selected
+    assert list(PAYLOADS.select()) == list(PAYLOADS)
+
+
+def test_payload_set_precomputes_variants():
+    payload = PAYLOADS[1]
+    assert payload._variants is not None
+    assert {"<x1> x", "&lt;x1&gt; x", "x1x"} <= payload.variants
+    assert payload.evidence_matcher is PAYLOADS.evidence_matcher
+
+
+def test_parse_payload_filter():
+    parsed = parse_payload_filter("sqli, XSS", "ERROR_BASED", "high")
+    assert parsed == {
+        "vuln_types": {VulnType.SQLI, VulnType.XSS},
+        "match_types": {MatchType.ERROR_BASED},
+        "min_severity": Severity.HIGH,
+    }
+    assert [p.payload_id for p in PAYLOADS.select(**parsed)] == ["s1"]
+    with pytest.raises(ValueError):
+        parse_payload_filter(severity="urgent")
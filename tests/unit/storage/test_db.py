@@ -1,5 +1,12 @@
 import json
-from src.storage.db import init_db, save_scan, get_scan
+import sqlite3
+from src.storage.db import (
+    init_db,
+    save_scan,
+    get_scan,
+    save_scan_forms,
+    get_latest_scan_forms,
+)
 
 
 def test_save_and_get_scan(tmp_path):
@@ -37,3 +44,47 @@ def test_get_nonexistent_scan(tmp_path):
     db_path = tmp_path / "empty.db"
     init_db(str(db_path))
     assert get_scan(999999, str(db_path)) is None
+
+
+def test_latest_scan_forms_match_target_and_payloads(tmp_path):
+    """Берётся последний скан цели с тем же отпечатком payloads."""
+    db_path = str(tmp_path / "forms.db")
+    init_db(db_path)
+    finding = {"form_index": "search", "details": {}}
+    for digest, findings in (("d1", []), ("d1", [finding]), ("d2", [])):
+        scan_id = save_scan("http://t", "{}", path=db_path)
+        forms = [{"fingerprint": "fp", "form_id": "search", "findings": findings}]
+        save_scan_forms(scan_id, forms, digest, db_path)
+
+    assert get_latest_scan_forms("http://t", "d1", db_path) == (2, {"fp": [finding]})
+    assert get_latest_scan_forms("http://other", "d1", db_path) is None
+
+
+def test_failed_forms_are_not_reused(tmp_path):
+    """Не полностью проверенная форма не считается чистой в следующем скане."""
+    db_path = str(tmp_path / "forms.db")
+    init_db(db_path)
+    scan_id = save_scan("http://t", "{}", path=db_path)
+    forms = [
+        {"fingerprint": "ok", "status": "scanned", "findings": []},
+        {"fingerprint": "broken", "status": "failed", "findings": []},
+    ]
+    save_scan_forms(scan_id, forms, "d1", db_path)
+
+    assert get_latest_scan_forms("http://t", "d1", db_path) == (scan_id, {"ok": []})
+
+
+def test_init_db_adds_status_to_existing_scan_forms(tmp_path):
+    """Таблица scan_forms, созданная без статуса, получает его при init_db."""
+    db_path = str(tmp_path / "old.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE scan_forms(id INTEGER PRIMARY KEY, scan_id INTEGER, "
+            "fingerprint TEXT, form_id TEXT, action TEXT, "
+            "payloads_digest TEXT NOT NULL, findings_json TEXT NOT NULL)"
+        )
+    init_db(db_path)
+    scan_id = save_scan("http://t", "{}", path=db_path)
+    save_scan_forms(scan_id, [{"fingerprint": "fp", "findings": []}], "d", db_path)
+
+    assert get_latest_scan_forms("http://t", "d", db_path) == (scan_id, {"fp": []})